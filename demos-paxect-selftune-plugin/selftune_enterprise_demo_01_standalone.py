@@ -11,13 +11,10 @@ parameters, maintains persistent state, and provides lightweight
 observability endpoints.
 """
 
-import json
 import random
 import time
 import tempfile
-import threading
-from http.server import BaseHTTPRequestHandler, HTTPServer
-from paxect_selftune_plugin import Autotune
+from paxect_selftune_plugin import Autotune, serve_metrics
 
 # Configuration
 STATE_PATH = tempfile.gettempdir() + "/paxect_selftune_enterprise_state.json"
@@ -28,48 +25,12 @@ PORT = 8090
 tuner = Autotune(state_path=STATE_PATH, log_path=LOG_PATH, mode="learn")
 stats = {"ok": 0, "err": 0, "cycle": 0}
 
-
-# Observability handler
-class PAXECTHandler(BaseHTTPRequestHandler):
-    def do_GET(self):
-        if self.path == "/ping":
-            self._send(200, {"status": "pong", "timestamp": int(time.time())})
-        elif self.path == "/ready":
-            self._send(200, {"ready": True})
-        elif self.path == "/metrics":
-            text = (
-                f"paxect_selftune_ok {stats['ok']}\n"
-                f"paxect_selftune_err {stats['err']}\n"
-                f"paxect_selftune_epsilon {tuner.epsilon:.3f}\n"
-            )
-            self._send(200, text, ctype="text/plain")
-        elif self.path == "/state":
-            self._send(200, tuner._stats)
-        else:
-            self._send(404, {"error": "unknown endpoint"})
-
-    def _send(self, code, data, ctype="application/json"):
-        self.send_response(code)
-        self.send_header("Content-Type", ctype)
-        self.end_headers()
-        if isinstance(data, str):
-            self.wfile.write(data.encode())
-        else:
-            self.wfile.write(json.dumps(data).encode())
-
-    def log_message(self, *args):
-        return
-
-
-# Start observability service in background
-threading.Thread(
-    target=lambda: HTTPServer(("127.0.0.1", PORT), PAXECTHandler).serve_forever(),
-    daemon=True,
-).start()
+# Start the packaged observability server in background
+server = serve_metrics(tuner, port=PORT, extra=lambda: {"ok": stats["ok"], "err": stats["err"]})
 
 # Adaptive control loop
 print("=== PAXECT SelfTune Enterprise Demo 01 – Stand-alone Adaptive Controller ===")
-print(f"Observability available at http://127.0.0.1:{PORT}/[ping|ready|metrics|state]\n")
+print(f"Observability available at http://127.0.0.1:{PORT}/[ping|ready|metrics|state|last]\n")
 
 for i in range(1, 151):
     stats["cycle"] = i
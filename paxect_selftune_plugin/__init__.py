@@ -11,15 +11,34 @@ PAXECT SelfTune 5-in-1 Hybrid Plugin — Universal Edition
 
 Modes:
  - off        → disabled
- - auto       → static profile map
+ - auto       → calibrated decision table (static profile map without one)
  - learn      → adaptive learning (with or without NumPy)
  - manual     → developer control
- - short_run  → time-based throttling
+ - short_run  → time-based throttling (legacy 5m/30m timers)
 
 Features:
  - EMA learning per bucket/profile
- - Persistent JSON state
- - Fail-safe throttle (overhead > 75%)
+ - Per-byte cost model (time ≈ a + b·bytes, RLS with forgetting) per bucket/arm
+ - Tail-latency objective: P² quantile / mean + k·stddev sketches, confidence-aware exploration
+ - Optional peak-memory objective (weighted or hard budget) per bucket/profile
+ - Fast startup: lazy NumPy import, history loaded on demand
+ - Persistent binary (or JSON) state, keyed by host fingerprint (nearest-host warm start)
+ - Fail-safe throttle (overhead > 75%) with hysteresis and stepped recovery (25→50→75→100)
+ - Pressure-aware throttle from Linux PSI stall time (loadavg fallback)
+ - cgroup v1/v2 aware worker counts, chunk sizes and buffer memory
+ - Measured spans: wall exec time vs the tuner's own time; CPU/wait split from process_time/getrusage
+ - Indexed, streaming queries over the JSONL decision log
+ - Minute/hour/day rollups per bucket/label, persisted with the state
+ - Mergeable log-linear latency histograms (p50/p95/p99, Prometheus export)
+ - Consistent copy-on-write snapshot() for observers
+ - Optional fleet coordinator: batched feedback deltas, fleet-wide best arms
+ - Multi-key sliding-window rate limiters scaled by the throttle percent
+ - Channel groups: per-channel tuners sharing one overhead budget by priority/weight
+ - Streaming file I/O: pooled readinto buffers, memoryview chunks, os.writev batches
+ - Integrity hash selection per bucket (cheapest digest meeting the level, zero-copy)
+ - decide(): fast path with shared immutable decisions, deferred history/log formatting
+ - Decision lifecycle hooks + Chrome trace / Perfetto span emitter
+ - Built-in /metrics, /ready, /state, /last server (pre-rendered payloads)
  - NumPy + I/O benchmarking (if available)
  - Compatible with Linux, macOS, Windows, BSD, Android, iOS
 
@@ -27,23 +46,60 @@ Author: PAXECT Systems (2025)
 License: Apache 2.0
 """
 
-import os, json, time, random, tempfile, pathlib
+import os, json, time, random, tempfile, threading
 from dataclasses import dataclass, field
-from typing import Dict, Any, Optional, List
+from typing import Dict, Any, Optional, List, Tuple, TYPE_CHECKING
 from math import inf
-from datetime import datetime, timezone, timedelta
+from types import MappingProxyType
+from .fingerprint import host_fingerprint, fingerprint_id, nearest_host, calibration_scale
+from .state import load_state, save_state, STATE_VERSION
+from .rollup import RollupEngine
+from .histogram import HistogramSet
+from .hooks import Hooks
+from .pressure import PressureMonitor
+from .cgroup import CgroupLimits
+from .costmodel import CostModels
+from .fastpath import Decision, DecisionRing
+from .throttle import ThrottleController, DEFAULT_SCHEDULE
 
-# ---------------- NumPy Detection ----------------
-try:
-    import numpy as np
-    HAS_NUMPY = True
-except ImportError:
-    HAS_NUMPY = False
+if TYPE_CHECKING:  # loaded on first use: snapshots, measured spans and tail objectives are optional
+    from .snapshot import TunerSnapshot
+    from .measure import Measurement
+    from .tail import TailSketches
+
+# ---------------- NumPy Detection (lazy) ----------------
+# NumPy costs 100+ ms to import; it is loaded only when a benchmark or a
+# vectorized path asks for it. `HAS_NUMPY` / `np` resolve on first access.
+_np = None
+_numpy_checked = False
+
+def _numpy():
+    global _np, _numpy_checked
+    if not _numpy_checked:
+        try:
+            import numpy
+            _np = numpy
+        except ImportError:
+            _np = None
+        _numpy_checked = True
+    return _np
+
+def __getattr__(name: str):
+    if name == "HAS_NUMPY":
+        return _numpy() is not None
+    if name == "np":
+        return _numpy()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 # ---------------- Buckets & Profiles ----------------
 BUCKET_SMALL_THRESHOLD = 128 * 1024
 BUCKET_MEDIUM_THRESHOLD = 4 * 1024 * 1024
 PROFILES = ("baseline", "compress", "parallel")
+_BUCKETS = ("small", "medium", "large")
+_STATIC_MAP = {"small": "baseline", "medium": "compress", "large": "parallel"}
+_BUCKET_IX = {b: i for i, b in enumerate(_BUCKETS)}
+_PROFILE_IX = {p: i for i, p in enumerate(PROFILES)}
+SNAPSHOT_RETRIES = 3  # lock-free copy attempts before snapshot() copies under the lock
 
 def get_bucket(n_bytes: int) -> str:
     if n_bytes >= BUCKET_MEDIUM_THRESHOLD:
@@ -56,10 +112,14 @@ def get_default_blocksize(bucket: str) -> int:
     return {"small": 8192, "medium": 16384, "large": 32768}[bucket]
 
 def utc_now_str() -> str:
-    return datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC")
+    return time.strftime("%Y-%m-%d %H:%M:%S UTC", time.gmtime())
 
 # ---------------- Paths ----------------
 def get_default_state_path() -> str:
+    return os.path.join(tempfile.gettempdir(), "autotune_state.pxst")
+
+def get_legacy_state_path() -> str:
+    """The JSON default before .pxst; still loaded while the new default is missing."""
     return os.path.join(tempfile.gettempdir(), "autotune_state.json")
 
 def get_default_log_path() -> str:
@@ -67,7 +127,8 @@ def get_default_log_path() -> str:
 
 # ---------------- Optional Benchmarks ----------------
 def matrix_benchmark(size: int = 128) -> float:
-    if not HAS_NUMPY:
+    np = _numpy()
+    if np is None:
         return 0.0001  # fallback dummy
     np.random.seed(42)
     A = np.random.rand(size, size)
@@ -88,6 +149,24 @@ def io_benchmark(size_kb: int = 256) -> float:
     os.remove(tmp.name)
     return round(end - start, 6)
 
+def cpu_benchmark(n: int = 200_000) -> float:
+    """Pure-Python integer loop; available on every host, NumPy or not."""
+    start = time.perf_counter()
+    acc = 0
+    for i in range(n):
+        acc = (acc + i * i) & 0xFFFFFFFF
+    return round(time.perf_counter() - start, 6)
+
+def calibration_benchmarks(matrix: Optional[bool] = None) -> Dict[str, float]:
+    """cpu + io timings; matrix only when NumPy is already imported (or matrix=True)."""
+    cal = {"cpu": min(cpu_benchmark() for _ in range(3)), "io": io_benchmark(256)}
+    if matrix is None:
+        import sys
+        matrix = "numpy" in sys.modules
+    if matrix and _numpy() is not None:
+        cal["matrix"] = matrix_benchmark(128)
+    return cal
+
 # ---------------- Core Engine ----------------
 @dataclass
 class Autotune:
@@ -103,112 +182,243 @@ class Autotune:
     state_path: Optional[str] = None
     log_path: Optional[str] = None
     log_to_file: bool = True
+    state_format: str = "auto"  # binary | json | auto (json only for *.json paths)
+    rollups_enabled: bool = True
+    histograms_enabled: bool = True
+    host_keyed: bool = True
+    max_hosts: int = 16
+    hooks: Hooks = field(default_factory=Hooks, repr=False, compare=False)
+    overhead_source: str = "caller"  # caller | measured (work between consecutive tune() calls)
+    measure_scope: str = "process"   # process | thread
+    measure_min_span: float = 1e-4   # seconds; shorter measured spans report no overhead
+    memory_source: str = "off"       # off | rss | tracemalloc (peak memory of measured spans)
+    memory_weight: float = 0.0       # seconds added per MiB of peak memory EMA
+    memory_budget: Optional[int] = None  # bytes; arms whose peak memory EMA exceeds it are not chosen
+    cost_model: bool = True          # rank arms by predicted time for last_bytes (EMA until fitted)
+    cost_forgetting: float = 0.98
+    objective: str = "mean"          # mean (EMA / cost model) | quantile | mean_std (tail-latency SLOs)
+    objective_quantile: float = 0.99
+    objective_k: float = 3.0         # mean_std: mean + k · stddev
+    objective_alpha: float = 0.05    # weight of new samples in the tail sketches' mean/variance
+    decision_table: Optional[str] = None  # signed table from `calibrate sweep`, served by mode "auto"
+    throttle_policy: str = "pressure"  # pressure | timer (legacy 5m/30m; implied by mode short_run) | off
+    pressure_interval: float = 5.0
+    throttle_release: Optional[float] = None  # fail-safe ends below this ratio (default 0.8 · max_overhead_ratio)
+    throttle_schedule: Tuple[int, ...] = DEFAULT_SCHEDULE
+    throttle_hold: float = 60.0      # seconds at schedule[0] after a trip
+    throttle_step: float = 30.0      # healthy seconds per recovery step
+    cgroup_aware: bool = True
+    limits_interval: float = 30.0
+    ring_capacity: int = 1024        # decide() rows buffered before history/rollups/log are written
+    coordinator: Optional[str] = None  # "unix:/path" or "host:port" of a `coordinator serve` process
+    coordinator_interval: float = 2.0
+    clock: Any = field(default=time.monotonic, repr=False, compare=False)  # throttle timers; simulations inject one
 
     _stats: Dict[str, Dict[str, Dict[str, float]]] = field(default_factory=dict)
     _best: Dict[str, str] = field(default_factory=dict)
     _history: List[Dict[str, Any]] = field(default_factory=list)
     _step: int = 0
-    _last_choice: Optional[Dict[str, str]] = None
+    _last_choice: Optional[Dict[str, str]] = None  # shared per (bucket, label), never mutated
+    _last_bytes: int = 0
     _overhead_hist: List[float] = field(default_factory=list)
-    _logfile: Optional[pathlib.Path] = None
+    _logfile: Optional[str] = None
     _current_percent: int = 100
-    _throttle_until: Optional[datetime] = None
-    _next_5m: Optional[datetime] = None
-    _next_30m: Optional[datetime] = None
+    _policy_percent: int = 100  # before the channel group cap
+    _budget_cap: Tuple[bool, int] = (False, 100)  # (fail_safe, percent) set by a ChannelGroup
+    _throttle: Optional[ThrottleController] = None
+    _next_5m: Optional[float] = None  # clock() deadlines (timer policy)
+    _next_30m: Optional[float] = None
     _manual_throttle: Optional[Dict[str, Any]] = None
     _short_run_triggered: bool = False
+    _fingerprint: Dict[str, Any] = field(default_factory=dict)
+    _host_id: str = ""
+    _hosts: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    _calibration: Optional[Dict[str, float]] = None
+    _warm_start: Optional[Dict[str, Any]] = None
+    _history_loader: Optional[Any] = None
+    _rollups: Optional[RollupEngine] = None
+    _rollups_loader: Optional[Any] = None
+    _hists: Optional[HistogramSet] = None
+    _hists_loader: Optional[Any] = None
+    _fail_safe: bool = False
+    _avg_overhead: float = 0.0
+    _last_decision: Optional[Dict[str, Any]] = None
+    _lock: Any = field(default_factory=threading.Lock, repr=False, compare=False)
+    _calib_lock: Any = field(default_factory=threading.Lock, repr=False, compare=False)
+    _generation: int = 0
+    _snapshot: Optional["TunerSnapshot"] = field(default=None, repr=False, compare=False)
+    _measured: Optional[Dict[str, Any]] = None
+    _own_time: float = 0.0  # seconds the last measured tune()/decide() spent (the next span's overhead)
+    _usage_mark: Optional[Any] = None
+    _mem_mark: Optional[Any] = None
+    _mem_stats: Dict[str, Dict[str, Dict[str, float]]] = field(default_factory=dict)
+    _costs: Optional[CostModels] = None
+    _tails: Optional["TailSketches"] = None
+    _table: Optional[Any] = None
+    _pressure: Optional[PressureMonitor] = None
+    _limits: Optional[CgroupLimits] = None
+    _choices: Dict[str, Dict[str, Dict[str, str]]] = field(default_factory=dict)
+    _decisions: Dict[int, Decision] = field(default_factory=dict)
+    _decisions_for: Optional[Any] = None  # limits dict the cached Decisions were sized for
+    _decisions_mode: str = ""
+    _ring: Optional[DecisionRing] = None
+    _coord: Optional[Any] = None
+    _limiters: List[Any] = field(default_factory=list)
 
     def __post_init__(self):
+        default_path = not self.state_path
         self.state_path = self.state_path or get_default_state_path()
         self.log_path = self.log_path or get_default_log_path()
-        self._logfile = pathlib.Path(self.log_path)
+        self._logfile = self.log_path
+        self._fingerprint = host_fingerprint()
+        self._host_id = fingerprint_id(self._fingerprint)
+        self._rollups = RollupEngine() if self.rollups_enabled else None
+        self._hists = HistogramSet() if self.histograms_enabled else None
+        self._costs = CostModels(self.cost_forgetting) if self.cost_model else None
+        if self.objective != "mean":
+            from .tail import TailSketches, OBJECTIVES
+            if self.objective not in OBJECTIVES:
+                raise ValueError(f"objective must be one of {OBJECTIVES}")
+            self._tails = TailSketches(self.objective_quantile, self.objective_alpha)
+        self._throttle = ThrottleController(self.max_overhead_ratio, self.throttle_release, self.throttle_schedule,
+                                            self.throttle_hold, self.throttle_step)
+        if self.decision_table:
+            from .calibrate import load_table
+            self._table = load_table(self.decision_table)  # refuses unsigned/tampered tables
+        if self.coordinator:
+            from .coordinator import CoordinatorClient
+            self._coord = CoordinatorClient(self.coordinator, self.coordinator_interval)
 
         # Load existing state
-        if os.path.isfile(self.state_path):
+        load_path = self.state_path
+        if default_path and not os.path.isfile(load_path) and os.path.isfile(get_legacy_state_path()):
+            load_path = get_legacy_state_path()  # migrated to .pxst by the next save
+        if os.path.isfile(load_path):
             try:
-                with open(self.state_path, "r", encoding="utf-8") as f:
-                    data = json.load(f)
-                self._stats = data.get("stats", {})
-                self._best = data.get("best", {})
+                data, self._history_loader = load_state(load_path)
                 self._step = data.get("step", 0)
                 self.epsilon = data.get("epsilon", self.epsilon)
-                self._history = data.get("history", [])
+                self._load_host_stats(data)
+                self._mem_stats = data.get("memory") or {}
+                if self._costs is not None and data.get("cost_models"):
+                    self._costs = CostModels.from_dict(data["cost_models"], self.cost_forgetting)
+                if self._tails is not None and data.get("tails"):
+                    self._tails = type(self._tails).from_dict(data["tails"], self.objective_quantile,
+                                                         self.objective_alpha)
+                if self._rollups is not None and data.get("rollups"):
+                    pending = data["rollups"]
+                    self._rollups_loader = pending if callable(pending) else (lambda: pending)
+                if self._hists is not None and data.get("histograms"):
+                    stored = data["histograms"]
+                    self._hists_loader = stored if callable(stored) else (lambda: stored)
             except Exception:
                 pass
 
         # Init missing
-        for bucket in ("small", "medium", "large"):
+        for bucket in _BUCKETS:
             self._stats.setdefault(bucket, {})
             for profile in PROFILES:
                 self._stats[bucket].setdefault(profile, {"ema": inf, "count": 0.0})
             self._best.setdefault(bucket, "baseline")
 
-        now = datetime.utcnow()
-        self._next_5m = now + timedelta(minutes=5)
-        self._next_30m = now + timedelta(minutes=30)
+        self._choices = {b: {p: {"bucket": b, "label": p} for p in PROFILES} for b in _BUCKETS}
+        now = self.clock()
+        self._next_5m = now + 300.0
+        self._next_30m = now + 1800.0
+
+    def calibrate(self, force: bool = False) -> Optional[Dict[str, float]]:
+        """Run the host calibration benchmarks once (again with `force`); the result is saved
+        with this host's stats and scales later warm starts of similar hosts."""
+        with self._calib_lock:
+            if self._calibration is None or force:
+                try:
+                    self._calibration = calibration_benchmarks()
+                except Exception:
+                    pass
+            return self._calibration
 
     # Main tuning logic
-    def tune(self, *, exec_time: float = None, overhead: float = None,
+    def tune(self, *, exec_time: float = None, overhead: float = None, memory: Optional[int] = None,
              last_bytes: int = 0, runtime_minutes: Optional[int] = None,
              run_benchmarks: bool = False) -> Dict[str, Any]:
 
         bucket = get_bucket(last_bytes)
         matrix_time, io_time = None, None
+        hooks = self.hooks
+        if hooks.active:
+            t_start = time.time()
+            hooks.emit("pre_decision", {"ts": t_start, "bucket": bucket, "last_bytes": last_bytes,
+                                        "step": self._step, "mode": self.mode})
 
+        usage = None
+        t_call = time.perf_counter() if self._measuring() else None
         # If NumPy is available and allowed → run real benchmarks
-        if run_benchmarks and HAS_NUMPY:
+        if run_benchmarks and _numpy() is not None:
             matrix_time = matrix_benchmark(128)
             io_time = io_benchmark(256)
             exec_time = matrix_time
             overhead = io_time
         else:
-            # fallback synthetic simulation
-            exec_time = exec_time or random.uniform(0.00005, 0.001)
-            overhead = overhead or random.uniform(0.0001, 0.0004)
+            if exec_time is None and overhead is None:
+                usage = self._consume_usage()
+            if usage is not None:
+                # measured: wall seconds of the work vs the tuner's own time around it
+                exec_time, overhead = usage["exec_time"], usage["overhead"]
+                memory = usage.get("mem_peak", memory)
+            else:
+                # fallback synthetic simulation
+                exec_time = exec_time or random.uniform(0.00005, 0.001)
+                overhead = overhead or random.uniform(0.0001, 0.0004)
 
+        if self._ring is not None and self._ring.n:
+            self._fast_flush()  # keep history in decision order after decide() calls
+        # State changes happen under the lock (see snapshot()); file I/O stays outside
+        events = [] if hooks.active else None
+        with self._lock:
+            result, decision, avg_overhead, save_due = self._tune_locked(bucket, exec_time, overhead,
+                                                                         matrix_time, io_time, events, memory,
+                                                                         last_bytes)
+        if events is not None:
+            for event, info in events:
+                hooks.emit(event, info)
+            hooks.emit("post_decision", {"start": t_start, "end": time.time(), "bucket": bucket,
+                                         "step": self._step, "decision": result, "avg_overhead": avg_overhead})
+        if save_due:
+            self._save_state()
+        self._log_decision(decision, exec_time, overhead, avg_overhead, result["fail_safe"],
+                           result["throttle_percent"], matrix_time, io_time, usage)
+        if t_call is not None:
+            self._own_time = time.perf_counter() - t_call
+        if self.overhead_source == "measured":
+            # The next span starts after our own save/log work
+            self._mark_span()
+        return result
+
+    def _tune_locked(self, bucket, exec_time, overhead, matrix_time, io_time, events=None, memory=None,
+                     n_bytes=0):
         # Compute averages
-        overhead_ratio = float(overhead) / max(1e-6, exec_time + overhead)
-        self._overhead_hist.append(overhead_ratio)
-        if len(self._overhead_hist) > self.overhead_window:
-            self._overhead_hist = self._overhead_hist[-self.overhead_window:]
-        avg_overhead = sum(self._overhead_hist) / len(self._overhead_hist)
-        fail_safe = avg_overhead >= self.max_overhead_ratio
-        now = datetime.utcnow()
-
-        # Throttling
-        if fail_safe:
-            self._current_percent = 25
-            self._throttle_until = now + timedelta(seconds=60)
-        elif self._next_30m and now >= self._next_30m:
-            self._current_percent = 25
-            self._next_30m = now + timedelta(minutes=30)
-        elif self._next_5m and now >= self._next_5m:
-            self._current_percent = 50
-            self._next_5m = now + timedelta(minutes=5)
-        elif self._throttle_until and now >= self._throttle_until:
-            self._current_percent = 100
-            self._throttle_until = None
+        avg_overhead = self._push_overhead(float(overhead) / max(1e-6, exec_time + overhead))
+        fail_safe = self._update_throttle(avg_overhead)
+        if events is not None and fail_safe != self._fail_safe:
+            events.append(("fail_safe_enter" if fail_safe else "fail_safe_exit",
+                           {"ts": time.time(), "avg_overhead": avg_overhead, "bucket": bucket}))
 
         # Feedback update
+        prev_choice = self._last_choice
         if self.mode == "learn" and exec_time and self._last_choice:
-            self._apply_feedback(exec_time)
+            self._apply_feedback(exec_time, overhead, events, memory)
 
         # Decision logic
-        if self.mode == "off" or fail_safe:
-            label = "baseline"
-        elif self.mode == "auto":
-            label = {"small": "baseline", "medium": "compress", "large": "parallel"}[bucket]
-        else:
-            label = self._choose_label(bucket)
-
-        self._last_choice = {"bucket": bucket, "label": label}
-        decision = self._profile_cfg(label, bucket, self.mode)
+        label, row = self._select(bucket, n_bytes, fail_safe)
+        self._last_choice, self._last_bytes = self._choices[bucket][label], n_bytes
+        decision = self._profile_cfg(label, bucket, self.mode, row)
         self._step += 1
         self.epsilon = max(self.epsilon_min, self.epsilon * self.epsilon_decay)
 
         # Store history
+        ts = time.time()
         self._history.append({
-            "timestamp": time.time(),
+            "timestamp": ts,
             "bucket": bucket,
             "label": label,
             "exec_time": exec_time,
@@ -222,51 +432,607 @@ class Autotune:
         })
         if len(self._history) > self.max_history:
             self._history = self._history[-self.max_history:]
-        if self._step % self.save_interval == 0:
+        if self._rollups is not None:
+            # exec_time/overhead measure the previous decision's arm
+            src = prev_choice or self._last_choice
+            self._rollups.record(ts, src["bucket"], src["label"], exec_time, overhead,
+                                 fail_safe, self._current_percent)
+        result = dict(decision, fail_safe=fail_safe, throttle_percent=self._current_percent,
+                      matrix_time=matrix_time, io_time=io_time)
+        self._fail_safe, self._avg_overhead, self._last_decision = fail_safe, avg_overhead, result
+        self._generation += 1
+        return result, decision, avg_overhead, self._step % self.save_interval == 0
+
+    # Fast path
+    def decide(self, n_bytes: int = 0, exec_time: Optional[float] = None,
+               overhead: Optional[float] = None) -> Decision:
+        """Like tune(last_bytes=n_bytes), but returns a shared immutable Decision and defers
+        history, rollups and the JSON log to a ring buffer (nothing is printed).
+
+        exec_time/overhead are feedback for the previous decision; without them (and without
+        a measured span) the call only decides."""
+        hooks = self.hooks
+        if hooks.active:
+            t_start = time.time()
+            hooks.emit("pre_decision", {"ts": t_start, "bucket": get_bucket(n_bytes), "last_bytes": n_bytes,
+                                        "step": self._step, "mode": self.mode})
+        memory = None
+        t_call = None
+        if exec_time is None and self._measuring():
+            t_call = time.perf_counter()
+            usage = self._consume_usage()
+            if usage is not None:
+                exec_time, overhead, memory = usage["exec_time"], usage["overhead"], usage.get("mem_peak")
+        events = [] if hooks.active else None
+        with self._lock:
+            d, avg_overhead, full = self._decide_locked(n_bytes, exec_time, overhead, memory, events)
+            save_due = self._step % self.save_interval == 0
+        if events is not None:
+            for event, info in events:
+                hooks.emit(event, info)
+            hooks.emit("post_decision", {"start": t_start, "end": time.time(), "bucket": get_bucket(n_bytes),
+                                         "step": self._step, "decision": d._asdict(), "avg_overhead": avg_overhead})
+        if save_due:
             self._save_state()
+        elif full:
+            self._fast_flush()
+        if t_call is not None:
+            self._own_time = time.perf_counter() - t_call
+        if self.overhead_source == "measured":
+            self._mark_span()
+        return d
+
+    def _decide_locked(self, n_bytes, exec_time, overhead, memory, events):
+        bucket = get_bucket(n_bytes)
+        prev = self._last_choice
+        if exec_time is not None:
+            overhead = overhead or 0.0
+            avg_overhead = self._push_overhead(overhead / max(1e-6, exec_time + overhead))
+        else:
+            avg_overhead = self._avg_overhead
+        fail_safe = self._update_throttle(avg_overhead)
+        if events is not None and fail_safe != self._fail_safe:
+            events.append(("fail_safe_enter" if fail_safe else "fail_safe_exit",
+                           {"ts": time.time(), "avg_overhead": avg_overhead, "bucket": bucket}))
+        if self.mode == "learn" and exec_time and prev:
+            self._apply_feedback(exec_time, overhead, events, memory, None, False)  # histograms: _fast_flush
 
-        self._log_decision(decision, exec_time, overhead, avg_overhead, fail_safe, self._current_percent, matrix_time, io_time)
-        decision["fail_safe"] = fail_safe
-        decision["throttle_percent"] = self._current_percent
-        decision["matrix_time"] = matrix_time
-        decision["io_time"] = io_time
-        return decision
+        label, row = self._select(bucket, n_bytes, fail_safe)
+        lim = self.limits().get() if self.cgroup_aware else None
+        if lim is not self._decisions_for:
+            if lim != self._decisions_for:  # a refresh returns a new dict, usually with the same values
+                self._decisions.clear()
+            self._decisions_for = lim
+        if self.mode != self._decisions_mode:
+            self._decisions.clear()
+            self._decisions_mode = self.mode
+        cls = 3 + row.size_class if row is not None else _BUCKET_IX[bucket]
+        key = ((cls * 3 + _PROFILE_IX[label]) * 2 + fail_safe) * 128 + self._current_percent
+        d = self._decisions.get(key)
+        if d is None:
+            cfg = self._profile_cfg(label, bucket, self.mode, row)
+            d = self._decisions[key] = Decision(label, self.mode, cfg["blocksize"], cfg["parallel"],
+                                                cfg["compress"], cfg.get("workers"), cfg.get("max_buffer_bytes"),
+                                                fail_safe, self._current_percent)
 
-    def _apply_feedback(self, exec_time: float):
+        self._last_choice, self._last_bytes = self._choices[bucket][label], n_bytes
+        self._step += 1
+        self.epsilon = max(self.epsilon_min, self.epsilon * self.epsilon_decay)
+        ring = self._ring
+        if ring is None:
+            ring = self._ring = DecisionRing(self.ring_capacity)
+        none = DecisionRing.NONE
+        full = ring.push(time.monotonic_ns(), _BUCKET_IX[bucket],
+                         _BUCKET_IX[prev["bucket"]] if prev else DecisionRing.NO_ARM,
+                         _PROFILE_IX[prev["label"]] if prev else DecisionRing.NO_ARM,
+                         none if exec_time is None else exec_time, none if overhead is None else overhead,
+                         avg_overhead, n_bytes, d)
+        self._fail_safe, self._avg_overhead, self._last_decision = fail_safe, avg_overhead, d
+        self._generation += 1
+        return d, avg_overhead, full
+
+    def _fast_flush(self):
+        """Turn buffered decide() rows into history entries, rollup and histogram samples and log lines."""
+        lines = [] if self.log_to_file else None
+        hists = self._hists
+        with self._lock:
+            ring = self._ring
+            if ring is None or not ring.n:
+                return
+            sec, utc = None, ""
+            for ts, b, fb_b, fb_l, ex, ov, avg, nb, d in list(ring.drain()):
+                bucket = _BUCKETS[b]
+                if int(ts) != sec:  # format once per wall-clock second
+                    sec = int(ts)
+                    utc = time.strftime("%Y-%m-%d %H:%M:%S UTC", time.gmtime(sec))
+                self._history.append({"timestamp": ts, "bucket": bucket, "label": d.label, "exec_time": ex,
+                                      "overhead": ov, "matrix_time": None, "io_time": None, "avg_overhead": avg,
+                                      "fail_safe": d.fail_safe, "throttle_percent": d.throttle_percent, "utc": utc})
+                if ex is not None:
+                    fed = fb_b != DecisionRing.NO_ARM
+                    src_b, src_l = (_BUCKETS[fb_b], PROFILES[fb_l]) if fed else (bucket, d.label)
+                    if self._rollups is not None:
+                        self._rollups.record(ts, src_b, src_l, ex, ov or 0.0, d.fail_safe, d.throttle_percent)
+                    if hists is not None and fed and ex and d.policy == "learn":  # as _apply_feedback would
+                        hists.record(src_b, src_l, ex, ov)
+                if lines is not None:
+                    decision = d._asdict()
+                    del decision["fail_safe"], decision["throttle_percent"]
+                    lines.append(json.dumps({"datetime_utc": utc, "ts": round(ts, 6), "bucket": bucket, "bytes": nb,
+                                             "decision": decision, "exec_time": ex, "overhead": ov,
+                                             "matrix_time": None, "io_time": None, "avg_overhead": avg,
+                                             "fail_safe": d.fail_safe, "throttle_percent": d.throttle_percent}))
+            if len(self._history) > self.max_history:
+                self._history = self._history[-self.max_history:]
+            self._generation += 1
+        if lines:
+            try:
+                with open(self._logfile, "a", encoding="utf-8") as f:
+                    f.write("\n".join(lines) + "\n")
+            except Exception:
+                pass
+
+    def _push_overhead(self, ratio: float) -> float:
+        hist = self._overhead_hist
+        hist.append(ratio)
+        while len(hist) > self.overhead_window:
+            del hist[0]
+        return sum(hist) / len(hist)
+
+    def _update_throttle(self, avg_overhead: float) -> bool:
+        """Advance the fail-safe controller, then apply the throttle policy; returns fail_safe."""
+        now = self.clock()
+        ctl = self._throttle
+        was_normal = ctl.state == "normal"
+        fail_safe, percent = ctl.update(avg_overhead, now)
+        policy = self._throttle_policy()
+        if ctl.state == "normal":
+            if policy == "timer":
+                if self._next_30m and now >= self._next_30m:
+                    percent, self._next_30m = 25, now + 1800.0
+                elif self._next_5m and now >= self._next_5m:
+                    percent, self._next_5m = 50, now + 300.0
+                elif was_normal:
+                    percent = self._policy_percent  # legacy timer levels persist until a recovery
+            elif policy == "pressure":
+                percent = self.pressure().throttle_percent()
+        elif policy == "pressure":
+            percent = min(percent, self.pressure().throttle_percent())
+        self._policy_percent = percent
+        cap_fail_safe, cap = self._budget_cap
+        if cap < percent:
+            percent = cap
+        fail_safe = fail_safe or cap_fail_safe
+        if percent != self._current_percent:
+            for limiter in self._limiters:
+                limiter.set_scale(percent / 100.0)
+        self._current_percent = percent
+        return fail_safe
+
+    def rate_limiter(self, windows=((1.0, 100),), buckets: int = 10, max_keys: int = 100_000,
+                     path: Optional[str] = None):
+        """RateLimiter whose limits follow this tuner's throttle percent; with `path`, restored
+        from and saved alongside the tuner state."""
+        from .ratelimit import RateLimiter
+        limiter = None
+        if path and os.path.isfile(path):
+            try:
+                limiter = RateLimiter.load(path, max_keys=max_keys)
+                if limiter.windows != tuple((float(w), int(l)) for w, l in windows) or limiter.buckets != buckets:
+                    limiter = None  # configuration changed: start empty
+            except (OSError, ValueError):
+                limiter = None
+        if limiter is None:
+            limiter = RateLimiter(windows, buckets, max_keys)
+        limiter.path = path
+        limiter.set_scale(self._current_percent / 100.0)
+        with self._lock:
+            self._limiters.append(limiter)
+        return limiter
+
+    def _select(self, bucket: str, n_bytes: int, fail_safe: bool):
+        """(label, decision-table row or None) for the next decision."""
+        if self.mode == "off" or fail_safe:
+            return "baseline", None
+        if self.mode == "auto":
+            row = self._table.lookup(n_bytes) if self._table is not None else None
+            return (row.label if row else _STATIC_MAP[bucket]), row
+        return self._choose_label(bucket, n_bytes), None
+
+    def _apply_feedback(self, exec_time: float, overhead: Optional[float] = None, events=None,
+                        memory: Optional[int] = None, n_bytes: Optional[int] = None, histogram: bool = True):
         bucket = self._last_choice["bucket"]
         label = self._last_choice["label"]
+        n_bytes = n_bytes or self._last_bytes
+        if self._costs is not None and n_bytes:
+            self._costs.update(bucket, label, n_bytes, exec_time)
+        if histogram and self._hists is not None:
+            self._hists.record(bucket, label, exec_time, overhead)
+        if self._tails is not None:
+            self._tails.update(bucket, label, exec_time)
+        if self._coord is not None:
+            self._coord.record(bucket, label, exec_time)
         rec = self._stats[bucket][label]
         rec["ema"] = exec_time if rec["count"] <= 0 else self.ema_alpha * exec_time + (1 - self.ema_alpha) * rec["ema"]
         rec["count"] += 1
-        self._best[bucket] = min(self._stats[bucket].items(), key=lambda kv: kv[1]["ema"])[0]
+        if memory is not None:
+            mrec = self._mem_stats.setdefault(bucket, {}).setdefault(label, {"ema": 0.0, "count": 0.0})
+            mrec["ema"] = memory if mrec["count"] <= 0 else self.ema_alpha * memory + (1 - self.ema_alpha) * mrec["ema"]
+            mrec["count"] += 1
+        self._best[bucket] = self._rank(bucket)
+        if events is not None:
+            events.append(("feedback", {"ts": time.time(), "bucket": bucket, "label": label, "exec_time": exec_time,
+                                        "overhead": overhead, "ema": rec["ema"], "best": self._best[bucket]}))
+
+    def report(self, n_bytes: int, exec_time: float, overhead: float = 0.0, memory: Optional[int] = None):
+        """Feedback for the last decision without making a new one."""
+        if self._last_choice is None:
+            return
+        events = [] if self.hooks.active else None
+        with self._lock:
+            self._apply_feedback(exec_time, overhead or None, events, memory, n_bytes)
+            self._generation += 1
+        for event, info in events or ():
+            self.hooks.emit(event, info)
+
+    # System pressure
+    def _throttle_policy(self) -> str:
+        return "timer" if self.mode == "short_run" else self.throttle_policy
+
+    def pressure(self) -> PressureMonitor:
+        if self._pressure is None:
+            self._pressure = PressureMonitor(self.pressure_interval)
+        return self._pressure
+
+    # Measured overhead
+    def measure(self, scope: Optional[str] = None) -> "Measurement":
+        """with tuner.measure(): work() — the next tune() without exec_time/overhead uses it."""
+        from .measure import Measurement
+        return Measurement(scope or self.measure_scope, sink=lambda usage: setattr(self, "_measured", usage),
+                           memory=self.memory_source)
+
+    def _measuring(self) -> bool:
+        return self._measured is not None or self.overhead_source == "measured"
+
+    def _mark_span(self):
+        from .measure import take, mem_mark
+        self._mem_mark = mem_mark(self.memory_source)
+        self._usage_mark = take(self.measure_scope)
+
+    def _consume_usage(self) -> Optional[Dict[str, Any]]:
+        """Measured span: exec_time = its wall time, overhead = the tuner's own time in the
+        previous tune()/decide() (decision, save, log); cpu/wait stay informational.
+
+        Spans shorter than measure_min_span (back-to-back calls, empty work) carry no overhead:
+        against next to no work the tuner's own time would read as ~100% and trip the fail-safe.
+        """
+        usage, self._measured = self._measured, None
+        if usage is None and self.overhead_source == "measured" and self._usage_mark is not None:
+            from .measure import take, delta, mem_peak
+            usage = delta(self._usage_mark, take(self.measure_scope))
+            if self._mem_mark is not None:
+                usage["mem_peak"] = mem_peak(self.memory_source, self._mem_mark)
+        if usage is not None:
+            own, self._own_time = self._own_time, 0.0
+            usage["overhead"] = own if usage["exec_time"] >= self.measure_min_span else 0.0
+        return usage
 
-    def _choose_label(self, bucket: str) -> str:
+    def _choose_label(self, bucket: str, n_bytes: int = 0) -> str:
         if random.random() < self.epsilon:
-            return random.choice(PROFILES)
+            if self._tails is not None:
+                return self._explore_tail(bucket)
+            return random.choice(self._allowed(bucket))
         stats_b = self._stats[bucket]
-        if not any(v["count"] > 0 for v in stats_b.values()):
-            return "baseline"
-        return min(stats_b.items(), key=lambda kv: kv[1]["ema"])[0]
+        for p in PROFILES:
+            if stats_b[p]["count"] > 0:
+                return self._rank(bucket, n_bytes)
+        fleet_best = self._coord.fleet_best(bucket) if self._coord is not None else None
+        return fleet_best if fleet_best in self._allowed(bucket) else "baseline"
 
-    def _profile_cfg(self, label: str, bucket: str, policy: str) -> Dict[str, Any]:
-        cfg = {"blocksize": get_default_blocksize(bucket), "parallel": False, "compress": False}
+    # Memory objective
+    def _allowed(self, bucket: str):
+        """Arms not known to exceed memory_budget (the leanest one if none fits)."""
+        if self.memory_budget is None:
+            return PROFILES
+        mem_b = self._mem_stats.get(bucket, {})
+        within = [p for p in PROFILES if mem_b.get(p, {}).get("ema", 0.0) <= self.memory_budget]
+        return within or [min(PROFILES, key=lambda p: mem_b.get(p, {}).get("ema", inf))]
+
+    def _rank(self, bucket: str, n_bytes: int = 0) -> str:
+        """Fastest allowed arm (predicted time for n_bytes once fitted, else EMA);
+        with memory_weight, time + weight · peak MiB."""
+        if self._tails is not None:
+            return self._rank_tail(bucket)
+        stats_b, mem_b = self._stats[bucket], self._mem_stats.get(bucket)
+        costs = self._costs if n_bytes else None
+        fleet = self._coord.fleet_stats(bucket) if self._coord is not None else None
+        best, best_s = None, inf
+        for p in self._allowed(bucket):
+            s = costs.predict(bucket, p, n_bytes) if costs is not None else inf
+            if s == inf and fleet and p in fleet and stats_b[p]["count"] < 3:
+                s = fleet[p][1]  # too few local samples: fleet-wide mean
+            if s == inf:
+                s = stats_b[p]["ema"] if p in stats_b else inf
+            if self.memory_weight and mem_b and p in mem_b:
+                s += self.memory_weight * mem_b[p]["ema"] / 2 ** 20
+            if best is None or s < best_s:
+                best, best_s = p, s
+        return best
+
+    def _explore_tail(self, bucket: str) -> str:
+        """Explore where the sketch is least trustworthy; uniformly once all are confident."""
+        allowed = self._allowed(bucket)
+        conf = {p: self._tails.confidence(bucket, p, self.objective) for p in allowed}
+        low = min(conf.values())
+        if low >= 1.0:
+            return random.choice(allowed)
+        return random.choice([p for p in allowed if conf[p] == low])
+
+    def _rank_tail(self, bucket: str) -> str:
+        """Lowest tail score (quantile or mean + k·stddev) among arms whose sketch is confident;
+        among all measured arms while none is. Mean-based cost model and fleet stats are not used."""
+        tails, mem_b = self._tails, self._mem_stats.get(bucket)
+        best = None
+        best_key = (True, inf)
+        for p in self._allowed(bucket):
+            s = tails.score(bucket, p, self.objective, self.objective_k)
+            if self.memory_weight and mem_b and p in mem_b:
+                s += self.memory_weight * mem_b[p]["ema"] / 2 ** 20
+            key = (tails.confidence(bucket, p, self.objective) < 1.0, s)
+            if best is None or key < best_key:
+                best, best_key = p, key
+        return best
+
+    def _profile_cfg(self, label: str, bucket: str, policy: str, row=None) -> Dict[str, Any]:
+        cfg = {"blocksize": row.blocksize if row else get_default_blocksize(bucket), "parallel": False, "compress": False}
         if label == "compress": cfg["compress"] = True
         elif label == "parallel": cfg["parallel"] = True
+        if self.cgroup_aware:
+            cfg.update(self.limits().size(cfg["blocksize"], cfg["parallel"]))
+            if row is not None and cfg["parallel"]:
+                cfg["workers"] = min(cfg["workers"], row.workers)
+        elif row is not None:
+            cfg["workers"] = row.workers
         return {"label": label, "policy": policy, **cfg}
 
+    def limits(self) -> CgroupLimits:
+        """Effective container CPU/memory limits (refreshed every limits_interval seconds)."""
+        if self._limits is None:
+            self._limits = CgroupLimits(self.limits_interval)
+        return self._limits
+
+    # Deferred history: stats load eagerly, history only when first needed
+    def _load_history(self) -> List[Dict[str, Any]]:
+        if self._history_loader is not None:
+            loader, self._history_loader = self._history_loader, None
+            try:
+                stored = loader()
+            except Exception:
+                stored = []
+            self._history = (stored + self._history)[-self.max_history:]
+        return self._history
+
+    @property
+    def history(self) -> List[Dict[str, Any]]:
+        if self._ring is not None and self._ring.n:
+            self._fast_flush()
+        return self._load_history()
+
+    # Host-keyed state
+    def _load_host_stats(self, data: Dict[str, Any]):
+        hosts = data.get("hosts")
+        if hosts is None:
+            # Legacy (paxect-hybrid-1.0) file: stats of unknown origin, adopt as-is
+            self._stats = data.get("stats", {})
+            self._best = data.get("best", {})
+            return
+        self._hosts = hosts
+        if self._host_id in hosts:
+            entry = hosts[self._host_id]
+            self._calibration = entry.get("calibration")
+        elif not self.host_keyed:
+            entry = hosts.get(data.get("host", ""), {})
+        else:
+            entry = self._warm_start_entry()
+        self._stats = entry.get("stats", {})
+        self._best = entry.get("best", {})
+
+    def _warm_start_entry(self) -> Dict[str, Any]:
+        """Seed an unseen host from the most similar stored one, scaled by calibration."""
+        found = nearest_host(self._fingerprint, self._hosts)
+        if found is None:
+            return {}
+        source_id, score = found
+        source = self._hosts[source_id]
+        scale = 1.0
+        if source.get("calibration"):  # nothing to scale against otherwise
+            scale = calibration_scale(self.calibrate() or {}, source["calibration"])
+        stats = {}
+        for bucket, profiles in source.get("stats", {}).items():
+            stats[bucket] = {}
+            for profile, rec in profiles.items():
+                seen = rec.get("count", 0) > 0
+                stats[bucket][profile] = {"ema": rec["ema"] * scale if seen else inf,
+                                          "count": 1.0 if seen else 0.0}
+        self._warm_start = {"source": source_id, "similarity": score, "scale": round(scale, 6)}
+        return {"stats": stats, "best": dict(source.get("best", {}))}
+
+    def host_info(self) -> Dict[str, Any]:
+        return {"host": self._host_id, "fingerprint": dict(self._fingerprint),
+                "calibration": self._calibration, "warm_start": self._warm_start,
+                "decision_table": ({"path": self.decision_table, "host": self._table.host,
+                                    "matches_host": self._table.host == self._host_id}
+                                   if self._table is not None else None),
+                "coordinator": self._coord.to_dict() if self._coord is not None else None,
+                "known_hosts": sorted(set(self._hosts) | {self._host_id})}
+
     def _save_state(self):
         try:
-            data = {"stats": self._stats, "best": self._best, "history": self._history, "step": self._step,
-                    "epsilon": self.epsilon, "version": "paxect-hybrid-1.0"}
-            with open(self.state_path, "w", encoding="utf-8") as f:
-                json.dump(data, f, indent=2)
+            if self._ring is not None and self._ring.n:
+                self._fast_flush()
+            with self._lock:
+                hosts = dict(self._hosts)
+                hosts[self._host_id] = {"fingerprint": self._fingerprint, "calibration": self._calibration,
+                                        "stats": {b: {p: dict(r) for p, r in ps.items()} for b, ps in self._stats.items()},
+                                        "best": dict(self._best), "updated": time.time()}
+                if len(hosts) > self.max_hosts:
+                    keep = sorted(hosts, key=lambda h: hosts[h].get("updated", 0.0), reverse=True)[:self.max_hosts]
+                    hosts = {h: hosts[h] for h in keep}
+                self._hosts = hosts
+                data = {"host": self._host_id, "hosts": hosts, "step": self._step,
+                        "epsilon": self.epsilon, "version": STATE_VERSION}
+                if self._rollups is not None:
+                    data["rollups"] = self._rollup_engine().to_dict()
+                if self._hists is not None:
+                    data["histograms"] = self._histogram_set().to_dict()
+                if self._costs is not None and self._costs.models:
+                    data["cost_models"] = self._costs.to_dict()
+                if self._tails is not None and self._tails.sketches:
+                    data["tails"] = self._tails.to_dict()
+                if self._mem_stats:
+                    data["memory"] = {b: {p: dict(r) for p, r in ps.items()} for b, ps in self._mem_stats.items()}
+                history = list(self._load_history())
+            t0 = time.time()
+            save_state(self.state_path, data, history, self._state_format())
+            for limiter in self._limiters:
+                if limiter.path:
+                    limiter.save(limiter.path)
+            if self.hooks.active:
+                self.hooks.emit("state_saved", {"ts": t0, "duration": time.time() - t0, "path": self.state_path,
+                                                "format": self._state_format(), "step": data["step"]})
         except Exception:
             pass
 
-    def _log_decision(self, decision, exec_time, overhead, avg_overhead, fail_safe, throttle, matrix_time, io_time):
-        entry = {"datetime_utc": utc_now_str(), "decision": decision, "exec_time": exec_time,
+    def rollups(self, resolution: str = "hour", bucket: Optional[str] = None, label: Optional[str] = None,
+                since: Optional[float] = None, until: Optional[float] = None) -> List[Dict[str, Any]]:
+        if self._rollups is None:
+            return []
+        return self._rollup_engine().query(resolution, bucket, label, since, until)
+
+    def _rollup_engine(self) -> RollupEngine:
+        """Stored rollups are merged in on first query/save, never on the decision path."""
+        if self._rollups_loader is not None:
+            loader, self._rollups_loader = self._rollups_loader, None
+            try:
+                self._rollups.merge_dict(loader())
+            except Exception:
+                pass
+        return self._rollups
+
+    def _histogram_set(self) -> HistogramSet:
+        """Stored histograms are merged into the live set on first read/save."""
+        if self._hists_loader is not None:
+            loader, self._hists_loader = self._hists_loader, None
+            try:
+                self._hists.merge(HistogramSet.from_dict(loader()))
+            except Exception:
+                pass
+        return self._hists
+
+    def latency_quantiles(self, metric: str = "exec_time", qs=(0.5, 0.95, 0.99)) -> Dict[str, Dict[str, Any]]:
+        """e.g. latency_quantiles()["large/parallel"]["p99"]"""
+        if self._hists is None:
+            return {}
+        if self._ring is not None and self._ring.n:
+            self._fast_flush()
+        return self._histogram_set().quantiles(metric, qs)
+
+    # Consistent observer view
+    def snapshot(self) -> "TunerSnapshot":
+        """Immutable, versioned view; O(1) while nothing changed, rebuilt once per change.
+
+        The lock is held only to read the small per-arm state and to publish; history and
+        histograms are copied outside it and the result is kept only if no update raced the copy.
+        """
+        snap = self._snapshot
+        if snap is not None and snap.version == self._generation:
+            return snap
+        if self._ring is not None and self._ring.n:
+            self._fast_flush()
+        self._load_lazy()
+        for _ in range(SNAPSHOT_RETRIES):
+            with self._lock:
+                snap = self._snapshot
+                if snap is not None and snap.version == self._generation:
+                    return snap
+                parts = self._snapshot_parts()
+            snap = self._finish_snapshot(parts)
+            with self._lock:
+                if snap.version == self._generation:
+                    self._snapshot = snap
+                    return snap
+        with self._lock:  # steady writers: copy under the lock rather than retry forever
+            parts = self._snapshot_parts()
+            snap = self._snapshot = self._finish_snapshot(parts)
+        return snap
+
+    def _load_lazy(self):
+        """Run pending history/histogram loaders (disk reads) outside the lock, merge under it."""
+        h_loader, g_loader = self._history_loader, self._hists_loader
+        if h_loader is None and g_loader is None:
+            return
+        stored, hists = [], None
+        if h_loader is not None:
+            try:
+                stored = h_loader()
+            except Exception:
+                stored = []
+        if g_loader is not None:
+            try:
+                hists = HistogramSet.from_dict(g_loader())
+            except Exception:
+                hists = None
+        with self._lock:
+            if h_loader is not None and self._history_loader is h_loader:
+                self._history_loader = None
+                self._history = (stored + self._history)[-self.max_history:]
+            if g_loader is not None and self._hists_loader is g_loader:
+                self._hists_loader = None
+                if hists is not None:
+                    self._hists.merge(hists)
+
+    def _snapshot_parts(self) -> Dict[str, Any]:
+        """Everything a snapshot needs that is cheap to read: scalars, per-arm state, references."""
+        from .snapshot import freeze_stats
+        ld = self._last_decision
+        return dict(
+            version=self._generation, taken_at=time.time(), mode=self.mode, host=self._host_id,
+            step=self._step, epsilon=self.epsilon, throttle_percent=self._current_percent,
+            fail_safe=self._fail_safe, avg_overhead=self._avg_overhead,
+            overhead_window=tuple(self._overhead_hist), stats=freeze_stats(self._stats),
+            best=MappingProxyType(dict(self._best)),
+            last_decision=(MappingProxyType(ld._asdict() if isinstance(ld, Decision) else dict(ld))
+                           if ld else None),
+            memory=freeze_stats(self._mem_stats) if self._mem_stats else None,
+            cost_models=MappingProxyType(self._costs.summary()) if self._costs is not None else None,
+            tails=MappingProxyType(self._tails.summary()) if self._tails is not None else None,
+            pressure=MappingProxyType(self._pressure.to_dict()) if self._pressure is not None else None,
+            throttle=MappingProxyType(self._throttle.to_dict(self.clock())),
+            limits=MappingProxyType(dict(self._limits.current)) if self._limits is not None else None,
+            # history is append-only until trimmed into a new list: (list, length) pins this generation
+            _history=self._history, _history_len=len(self._history), _hists=self._hists)
+
+    def _finish_snapshot(self, parts: Dict[str, Any]) -> "TunerSnapshot":
+        """The O(history + histograms) copies; safe without the lock given the pinned references."""
+        from .snapshot import TunerSnapshot
+        history, n, hists = parts.pop("_history"), parts.pop("_history_len"), parts.pop("_hists")
+        return TunerSnapshot(_history=tuple(history[:n]), histograms=hists.copy() if hists is not None else None,
+                             **parts)
+
+    def _state_format(self) -> str:
+        if self.state_format != "auto":
+            return self.state_format
+        return "json" if self.state_path.lower().endswith(".json") else "binary"
+
+    def _log_decision(self, decision, exec_time, overhead, avg_overhead, fail_safe, throttle, matrix_time, io_time,
+                      usage=None):
+        entry = {"datetime_utc": utc_now_str(), "ts": round(time.time(), 6),
+                 "bucket": self._last_choice["bucket"], "bytes": self._last_bytes,
+                 "decision": decision, "exec_time": exec_time,
                  "overhead": overhead, "matrix_time": matrix_time, "io_time": io_time,
                  "avg_overhead": avg_overhead, "fail_safe": fail_safe, "throttle_percent": throttle}
+        if usage is not None:
+            entry["usage"] = {k: round(v, 9) if isinstance(v, float) else v for k, v in usage.items()}
         print(f"[SelfTune] {entry}")
         if self.log_to_file:
             try:
@@ -289,8 +1055,43 @@ def get_autotune(mode: Optional[str] = None) -> Autotune:
 def tune(**kwargs) -> Dict[str, Any]:
     return get_autotune().tune(**kwargs)
 
-def report(n_bytes: int, exec_time: float, overhead: float = 0.0):
-    return get_autotune()._apply_feedback(exec_time)
+def decide(n_bytes: int = 0, exec_time: Optional[float] = None, overhead: Optional[float] = None) -> Decision:
+    return get_autotune().decide(n_bytes, exec_time, overhead)
+
+def report(n_bytes: int, exec_time: float, overhead: float = 0.0, memory: Optional[int] = None):
+    get_autotune().report(n_bytes, exec_time, overhead, memory)
+
+def subscribe(event: str, fn):
+    """Register fn(event, info) on the singleton tuner; see hooks.EVENTS."""
+    return get_autotune().hooks.subscribe(event, fn)
+
+def trace_to(path: Optional[str] = None, tuner: Optional[Autotune] = None):
+    """Write the tuner's decisions as Chrome trace / Perfetto JSON; returns the emitter (close() it)."""
+    from .trace import TraceEmitter
+    return TraceEmitter(path).attach(tuner or get_autotune())
+
+def snapshot() -> "TunerSnapshot":
+    return get_autotune().snapshot()
+
+def predict_time(n_bytes: int, label: str) -> float:
+    """Cost-model estimate (seconds) for `label` at n_bytes; inf until fitted."""
+    tuner = get_autotune()
+    if tuner._costs is None:
+        return inf
+    return tuner._costs.predict(get_bucket(n_bytes), label, n_bytes)
 
 def get_logs(max_entries: int = 100) -> List[Dict[str, Any]]:
-    return get_autotune()._history[-max_entries:]
+    return get_autotune().history[-max_entries:]
+
+def serve_metrics(tuner: Optional[Autotune] = None, host: str = "127.0.0.1", port: int = 8090, **kwargs):
+    """Start the /metrics, /ready, /state, /last server for `tuner` (default: singleton)."""
+    from .server import serve_metrics as _serve
+    return _serve(tuner or get_autotune(), host, port, **kwargs)
+
+def get_rollups(resolution: str = "hour", **filters) -> List[Dict[str, Any]]:
+    return get_autotune().rollups(resolution, **filters)
+
+def query_logs(since: Optional[float] = None, until: Optional[float] = None, **filters):
+    """Stream records from the on-disk decision log (see logquery.query)."""
+    from .logquery import query
+    return query(get_autotune().log_path, since, until, **filters)
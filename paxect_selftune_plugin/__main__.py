@@ -0,0 +1,34 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: Apache-2.0
+# -*- coding: utf-8 -*-
+"""
+PAXECT SelfTune — Command Line
+------------------------------
+  python3 -m paxect_selftune_plugin <command> [args...]
+
+Each command is implemented by the `main(argv)` of a package module.
+"""
+
+import sys
+from importlib import import_module
+
+COMMANDS = {
+    "bench": "paxect_selftune_plugin.bench",
+    "calibrate": "paxect_selftune_plugin.calibrate",
+    "coordinator": "paxect_selftune_plugin.coordinator",
+    "integrity": "paxect_selftune_plugin.integrity",
+    "logs": "paxect_selftune_plugin.logquery",
+    "simulate": "paxect_selftune_plugin.simulate",
+    "soak": "paxect_selftune_plugin.soak",
+    "state": "paxect_selftune_plugin.state",
+}
+
+def main(argv=None) -> int:
+    argv = list(sys.argv[1:] if argv is None else argv)
+    if not argv or argv[0] not in COMMANDS:
+        print("usage: python3 -m paxect_selftune_plugin {%s} ..." % ",".join(COMMANDS), file=sys.stderr)
+        return 2
+    return import_module(COMMANDS[argv[0]]).main(argv[1:])
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: Apache-2.0
+# -*- coding: utf-8 -*-
+"""
+PAXECT SelfTune — Benchmarks with Regression Budgets
+----------------------------------------------------
+Each benchmark returns a plain dict and is also runnable from the CLI,
+exiting non-zero when its budget is exceeded (CI friendly):
+
+  python3 -m paxect_selftune_plugin bench startup --budget-ms 75
+  python3 -m paxect_selftune_plugin bench decision --budget-bytes 256
+  python3 -m paxect_selftune_plugin bench ratelimit --budget-ops 500000
+  python3 -m paxect_selftune_plugin bench stream --size-mb 64 --budget-ratio 0.5
+
+`bench decision` compares tune() with the decide() fast path. CPython has
+no allocation counter, so it reports what can be measured: the median
+transient peak of traced memory per call (tracemalloc) and the change in
+live memory blocks over a long steady-state run (sys.getallocatedblocks).
+"""
+
+import os, sys, json, argparse, subprocess, tempfile
+from statistics import median
+from typing import Dict, Any, Optional, List
+
+STARTUP_BUDGET_MS = 75.0  # import + construct, NumPy and the LAZY_MODULES must stay unloaded
+# Loaded on first use only; any of them in sys.modules after import + construct fails `bench startup`
+LAZY_MODULES = ("server", "coordinator", "soak", "simulate", "ratelimit", "streamio", "channels", "calibrate",
+                "integrity", "logquery", "trace", "snapshot", "measure", "tail")
+DECISION_BUDGET_BYTES = 256  # median transient bytes per decide() call
+RATELIMIT_BUDGET_OPS = 500_000  # allow() calls/s, single window; floor for slow CI runners
+STREAM_BUDGET_RATIO = 0.5  # StreamEngine.copy() MiB/s relative to whole-file read + write
+
+_STARTUP_PROBE = """
+import sys, time
+t0 = time.perf_counter()
+import paxect_selftune_plugin as p
+t1 = time.perf_counter()
+tuner = p.Autotune(state_path=sys.argv[1], log_to_file=False)
+t2 = time.perf_counter()
+import json
+print(json.dumps({"import_ms": (t1 - t0) * 1e3, "construct_ms": (t2 - t1) * 1e3,
+                  "numpy_loaded": "numpy" in sys.modules,
+                  "modules": sorted(m.split(".", 1)[1] for m in sys.modules
+                                    if m.startswith("paxect_selftune_plugin."))}))
+"""
+
+# ---------------- Startup ----------------
+def startup_benchmark(runs: int = 7, state_path: Optional[str] = None) -> Dict[str, Any]:
+    """Median import + Autotune() construction time, each run in a fresh interpreter."""
+    pkg_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ)
+    env["PYTHONPATH"] = pkg_root + os.pathsep + env.get("PYTHONPATH", "")
+    state_path = state_path or os.path.join(tempfile.gettempdir(), "paxect_selftune_bench_state.json")
+    samples: List[Dict[str, Any]] = []
+    for _ in range(max(1, runs)):
+        out = subprocess.run([sys.executable, "-c", _STARTUP_PROBE, state_path],
+                             env=env, capture_output=True, text=True, check=True)
+        samples.append(json.loads(out.stdout.strip().splitlines()[-1]))
+    imp = median(s["import_ms"] for s in samples)
+    con = median(s["construct_ms"] for s in samples)
+    loaded = sorted({m for s in samples for m in s["modules"]})
+    return {"runs": len(samples), "import_ms": round(imp, 3), "construct_ms": round(con, 3),
+            "total_ms": round(imp + con, 3), "numpy_loaded": any(s["numpy_loaded"] for s in samples),
+            "modules": loaded, "eager_lazy_modules": [m for m in loaded if m in LAZY_MODULES]}
+
+# ---------------- Decision path ----------------
+def _per_call(tuner, name: str):
+    if name == "tune":
+        return lambda n: tuner.tune(exec_time=1e-4, overhead=1e-5, last_bytes=n)
+    return lambda n: tuner.decide(n, 1e-4, 1e-5)
+
+def decision_benchmark(n: int = 20000, traced: int = 2000) -> Dict[str, Any]:
+    """ns/op, transient bytes per call and retained blocks per call of tune() vs decide()."""
+    import gc, time, tracemalloc, contextlib
+    from . import Autotune
+    sizes = (4096, 1 << 20, 8 << 20)
+    out: Dict[str, Any] = {"n": n}
+    with tempfile.TemporaryDirectory(prefix="paxect_bench_") as tmp, \
+            open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for name in ("tune", "decide"):
+            tuner = Autotune(state_path=os.path.join(tmp, name + ".json"), log_to_file=False,
+                             save_interval=10 * (n + traced) + 1, host_keyed=False)
+            call = _per_call(tuner, name)
+            for i in range(2 * tuner.ring_capacity):  # warm caches, fill history/ring once
+                call(sizes[i % 3])
+            gc.collect()
+            blocks0 = sys.getallocatedblocks()
+            t0 = time.perf_counter_ns()
+            for i in range(n):
+                call(sizes[i % 3])
+            t1 = time.perf_counter_ns()
+            gc.collect()
+            blocks1 = sys.getallocatedblocks()
+            peaks = []
+            tracemalloc.start()
+            try:
+                for i in range(traced):
+                    tracemalloc.reset_peak()
+                    base = tracemalloc.get_traced_memory()[0]
+                    call(sizes[i % 3])
+                    peaks.append(tracemalloc.get_traced_memory()[1] - base)
+            finally:
+                tracemalloc.stop()
+            out[name] = {"ns_per_op": round((t1 - t0) / n, 1), "peak_bytes_per_call": median(peaks),
+                         "max_peak_bytes": max(peaks), "retained_blocks_per_call": round((blocks1 - blocks0) / n, 4)}
+    out["speedup"] = round(out["tune"]["ns_per_op"] / max(1.0, out["decide"]["ns_per_op"]), 2)
+    t, d = out["tune"], out["decide"]
+    out["allocations_removed"] = {  # what decide() no longer allocates per call, relative to tune()
+        "peak_bytes_per_call": t["peak_bytes_per_call"] - d["peak_bytes_per_call"],
+        "peak_share": round(1.0 - d["peak_bytes_per_call"] / t["peak_bytes_per_call"], 4)
+        if t["peak_bytes_per_call"] else None,
+        "retained_blocks_per_call": round(t["retained_blocks_per_call"] - d["retained_blocks_per_call"], 4)}
+    return out
+
+# ---------------- Rate limiter ----------------
+def ratelimit_benchmark(n: int = 1_000_000, keys: int = 1000) -> Dict[str, Any]:
+    """allow() calls per second over `keys` hot keys, for one and for two windows."""
+    import time
+    from .ratelimit import RateLimiter
+    names = [f"key-{i}" for i in range(keys)]
+    out: Dict[str, Any] = {"n": n, "keys": keys}
+    for label, windows in (("one_window", ((1.0, 1 << 40),)), ("two_windows", ((1.0, 1 << 40), (60.0, 1 << 40)))):
+        allow = RateLimiter(windows).allow
+        seq = (names * (n // keys + 1))[:n]
+        t0 = time.perf_counter()
+        for k in seq:
+            allow(k)
+        dt = time.perf_counter() - t0
+        out[label] = {"ops_per_s": round(n / dt), "ns_per_op": round(dt / n * 1e9, 1)}
+    return out
+
+def stream_benchmark(size_mb: int = 64, reps: int = 3) -> Dict[str, Any]:
+    """StreamEngine read/copy throughput vs whole-file f.read()/f.write(), best of `reps`."""
+    import time, shutil
+    from . import Autotune
+    from .streamio import StreamEngine
+    workdir = tempfile.mkdtemp(prefix="paxect_stream_")
+    src, dst = os.path.join(workdir, "src.bin"), os.path.join(workdir, "dst.bin")
+    size = size_mb << 20
+    with open(src, "wb") as f:
+        for _ in range(size_mb):
+            f.write(os.urandom(1 << 20))
+    tuner = Autotune(state_path=os.path.join(workdir, "state.pxst"), log_to_file=False, save_interval=10 ** 9)
+    engine = StreamEngine(tuner)
+
+    def naive_copy():
+        with open(src, "rb") as f:
+            data = f.read()
+        with open(dst, "wb") as f:
+            f.write(data)
+
+    def stream_read():
+        for _ in engine.read(src):
+            pass
+
+    out: Dict[str, Any] = {"size_mb": size_mb}
+    try:
+        for label, fn in (("naive_copy", naive_copy), ("stream_copy", lambda: engine.copy(src, dst)),
+                          ("stream_read", stream_read)):
+            best = min(_timed(fn, time.perf_counter) for _ in range(max(1, reps)))
+            out[label] = {"mib_per_s": round(size_mb / best, 1)}
+        out["engine"] = engine.to_dict()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return out
+
+def _timed(fn, clock) -> float:
+    t0 = clock()
+    fn()
+    return clock() - t0
+
+# ---------------- CLI ----------------
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="paxect_selftune_plugin bench")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_start = sub.add_parser("startup", help="import + construction time in a fresh interpreter")
+    p_start.add_argument("--runs", type=int, default=7)
+    p_start.add_argument("--budget-ms", type=float, default=STARTUP_BUDGET_MS)
+    p_start.add_argument("--state-path", default=None)
+    p_dec = sub.add_parser("decision", help="tune() vs decide(): time and allocations per decision")
+    p_dec.add_argument("--n", type=int, default=20000)
+    p_dec.add_argument("--budget-bytes", type=float, default=DECISION_BUDGET_BYTES)
+    p_rl = sub.add_parser("ratelimit", help="RateLimiter.allow() throughput")
+    p_rl.add_argument("--n", type=int, default=1_000_000)
+    p_rl.add_argument("--keys", type=int, default=1000)
+    p_rl.add_argument("--budget-ops", type=float, default=RATELIMIT_BUDGET_OPS)
+    p_st = sub.add_parser("stream", help="StreamEngine copy/read throughput vs whole-file I/O")
+    p_st.add_argument("--size-mb", type=int, default=64)
+    p_st.add_argument("--reps", type=int, default=3)
+    p_st.add_argument("--budget-ratio", type=float, default=STREAM_BUDGET_RATIO)
+    args = parser.parse_args(argv)
+
+    if args.cmd == "startup":
+        res = startup_benchmark(args.runs, args.state_path)
+        res["budget_ms"] = args.budget_ms
+        res["ok"] = (res["total_ms"] <= args.budget_ms and not res["numpy_loaded"]
+                     and not res["eager_lazy_modules"])
+        print(json.dumps(res))
+        return 0 if res["ok"] else 1
+    if args.cmd == "decision":
+        res = decision_benchmark(args.n)
+        res["budget_bytes"] = args.budget_bytes
+        res["ok"] = res["decide"]["peak_bytes_per_call"] <= args.budget_bytes
+        print(json.dumps(res))
+        return 0 if res["ok"] else 1
+    if args.cmd == "ratelimit":
+        res = ratelimit_benchmark(args.n, args.keys)
+        res["budget_ops"] = args.budget_ops
+        res["ok"] = res["one_window"]["ops_per_s"] >= args.budget_ops
+        print(json.dumps(res))
+        return 0 if res["ok"] else 1
+    if args.cmd == "stream":
+        res = stream_benchmark(args.size_mb, args.reps)
+        res["budget_ratio"] = args.budget_ratio
+        res["ok"] = res["stream_copy"]["mib_per_s"] >= args.budget_ratio * res["naive_copy"]["mib_per_s"]
+        print(json.dumps(res))
+        return 0 if res["ok"] else 1
+    return 2
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: Apache-2.0
+# -*- coding: utf-8 -*-
+"""
+PAXECT SelfTune — Offline Calibration → Frozen Decision Table
+-------------------------------------------------------------
+Sweeps every profile × blocksize × worker count against payloads of each
+size class on the target host, and freezes the winners into a signed table
+that `mode="auto"` serves without exploration:
+
+  python3 -m paxect_selftune_plugin calibrate sweep --out table.json
+  python3 -m paxect_selftune_plugin calibrate sweep --payload sample.bin --out table.json
+  python3 -m paxect_selftune_plugin calibrate verify table.json
+  python3 -m paxect_selftune_plugin calibrate show table.json
+  python3 -m paxect_selftune_plugin calibrate host   # host timings for warm starts
+
+Size classes are powers of two: class k covers [2^(k-1), 2^k) bytes, so a
+lookup is `rows[n_bytes.bit_length()]` — one index, no search. Classes
+outside the swept range reuse the nearest swept class.
+
+Signature: HMAC-SHA256 over the canonical table body when a key is given
+(--key or $PAXECT_TABLE_KEY), plain SHA-256 otherwise (integrity only).
+A table whose signature does not verify is refused.
+
+Default workload per profile (or pass `job=` to sweep()):
+ - baseline → CRC32 + write, chunk by chunk
+ - compress → zlib level 1 + write of the compressed chunk
+ - parallel → baseline chunks spread over a thread pool (zlib/CRC release the GIL)
+"""
+
+import os, json, time, hmac, zlib, hashlib, tempfile
+from concurrent.futures import ThreadPoolExecutor
+from statistics import median
+from typing import Dict, Any, Optional, List, NamedTuple, Callable, Sequence
+
+TABLE_FORMAT = "paxect-decision-table-1"
+KEY_ENV = "PAXECT_TABLE_KEY"
+N_CLASSES = 65                                   # bit_length() of any 64-bit size
+DEFAULT_SIZES = tuple(1 << k for k in range(12, 25))  # 4 KiB … 16 MiB
+BLOCKSIZES = (4096, 16384, 65536, 262144, 1048576)
+
+class DecisionTableError(ValueError):
+    pass
+
+class TableRow(NamedTuple):
+    size_class: int
+    label: str
+    blocksize: int
+    workers: int
+    seconds: float
+
+# ---------------- Workload ----------------
+def synthetic_payload(n: int, seed: int = 7) -> bytes:
+    """Half random, half repetitive: compresses roughly 2:1 like mixed container data."""
+    import random
+    rnd = random.Random(seed).getrandbits(8 * (n // 2)).to_bytes(n // 2, "little") if n >= 2 else b""
+    text = (b"paxect-selftune calibration record " * (n // 32 + 1))[:n - len(rnd)]
+    return rnd + text
+
+def default_job(payload: memoryview, label: str, blocksize: int, workers: int, fd: int):
+    n = len(payload)
+    def chunk(off: int):
+        piece = payload[off:off + blocksize]
+        if label == "compress":
+            os.pwrite(fd, zlib.compress(piece, 1), off)
+        else:
+            zlib.crc32(piece)
+            os.pwrite(fd, piece, off)
+    if label == "parallel" and workers > 1:
+        with ThreadPoolExecutor(workers) as pool:
+            list(pool.map(chunk, range(0, n, blocksize)))
+    else:
+        for off in range(0, n, blocksize):
+            chunk(off)
+
+def _candidates(size: int, max_workers: int) -> List[Dict[str, Any]]:
+    out = []
+    workers = sorted({w for w in (2, 4, 8, 16, max_workers) if 1 < w <= max_workers})
+    for bs in BLOCKSIZES:
+        if bs > max(4096, size):
+            continue
+        out.append({"label": "baseline", "blocksize": bs, "workers": 1})
+        out.append({"label": "compress", "blocksize": bs, "workers": 1})
+        for w in workers:
+            if size // bs >= w:  # at least one chunk per worker
+                out.append({"label": "parallel", "blocksize": bs, "workers": w})
+    return out
+
+# ---------------- Sweep ----------------
+def sweep(sizes: Sequence[int] = DEFAULT_SIZES, reps: int = 3, payload: Optional[bytes] = None,
+          max_workers: Optional[int] = None, job: Optional[Callable] = None,
+          progress: Optional[Callable[[str], None]] = None) -> List[TableRow]:
+    """Best candidate per size class (median of `reps` runs)."""
+    if max_workers is None:
+        from .cgroup import CgroupLimits
+        max_workers = CgroupLimits().get()["workers"]
+    job = job or default_job
+    rows = []
+    fd, tmp = tempfile.mkstemp(prefix="paxect_calibrate_")
+    try:
+        for size in sorted(sizes):
+            data = (payload * (size // len(payload) + 1))[:size] if payload else synthetic_payload(size)
+            view = memoryview(data)
+            best = None
+            for cand in _candidates(size, max_workers):
+                times = []
+                for _ in range(max(1, reps)):
+                    t0 = time.perf_counter()
+                    job(view, cand["label"], cand["blocksize"], cand["workers"], fd)
+                    times.append(time.perf_counter() - t0)
+                t = median(times)
+                if best is None or t < best[0]:
+                    best = (t, cand)
+            t, cand = best
+            rows.append(TableRow(size.bit_length(), cand["label"], cand["blocksize"], cand["workers"], t))
+            if progress:
+                progress(f"{size:>10} B  {cand['label']:<8} bs={cand['blocksize']:<8} "
+                         f"workers={cand['workers']}  {t * 1e3:.3f} ms")
+    finally:
+        os.close(fd)
+        os.unlink(tmp)
+    return rows
+
+# ---------------- Table ----------------
+def _canonical(body: Dict[str, Any]) -> bytes:
+    return json.dumps(body, sort_keys=True, separators=(",", ":")).encode("utf-8")
+
+def _sign(body: Dict[str, Any], key: Optional[bytes]) -> Dict[str, str]:
+    if key:
+        return {"alg": "hmac-sha256", "value": hmac.new(key, _canonical(body), hashlib.sha256).hexdigest()}
+    return {"alg": "sha256", "value": hashlib.sha256(_canonical(body)).hexdigest()}
+
+def _key(key) -> Optional[bytes]:
+    key = key if key is not None else os.environ.get(KEY_ENV)
+    return key.encode("utf-8") if isinstance(key, str) else key
+
+def build_table(rows: List[TableRow], key=None) -> Dict[str, Any]:
+    from .fingerprint import host_fingerprint, fingerprint_id
+    fp = host_fingerprint()
+    body = {"format": TABLE_FORMAT, "host": fingerprint_id(fp), "fingerprint": fp,
+            "created": round(time.time(), 3), "rows": [r._asdict() for r in rows]}
+    return dict(body, signature=_sign(body, _key(key)))
+
+def write_table(path: str, table: Dict[str, Any]):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(table, f, indent=2)
+    os.replace(tmp, path)
+
+class DecisionTable:
+    """Frozen table: lookup(n_bytes) is a single list index."""
+
+    __slots__ = ("host", "created", "rows", "_by_class")
+
+    def __init__(self, table: Dict[str, Any], key=None):
+        table = dict(table)
+        sig = table.pop("signature", None)
+        if table.get("format") != TABLE_FORMAT:
+            raise DecisionTableError(f"unsupported decision table format: {table.get('format')!r}")
+        if not sig:
+            raise DecisionTableError("decision table is not signed")
+        k = _key(key)
+        if sig.get("alg") == "hmac-sha256" and not k:
+            raise DecisionTableError(f"decision table is HMAC-signed; set {KEY_ENV} or pass key=")
+        if k and sig.get("alg") != "hmac-sha256":
+            raise DecisionTableError("a table key is configured but the table is not HMAC-signed")
+        expected = _sign(table, k if sig.get("alg") == "hmac-sha256" else None)
+        if not hmac.compare_digest(expected["value"], str(sig.get("value", ""))):
+            raise DecisionTableError("decision table signature mismatch")
+        self.host, self.created = table.get("host"), table.get("created")
+        self.rows = tuple(TableRow(**r) for r in sorted(table["rows"], key=lambda r: r["size_class"]))
+        if not self.rows:
+            raise DecisionTableError("decision table has no rows")
+        # Fill every bit_length class with the nearest swept row
+        by_class = [None] * N_CLASSES
+        for k_ in range(N_CLASSES):
+            by_class[k_] = min(self.rows, key=lambda r: (abs(r.size_class - k_), r.size_class))
+        self._by_class = tuple(by_class)
+
+    def lookup(self, n_bytes: int) -> TableRow:
+        return self._by_class[min(n_bytes.bit_length(), N_CLASSES - 1)]
+
+def load_table(path: str, key=None) -> DecisionTable:
+    with open(path, "r", encoding="utf-8") as f:
+        return DecisionTable(json.load(f), key)
+
+# ---------------- CLI ----------------
+def _parse_size(s: str) -> int:
+    text = s.strip().upper().rstrip("B")
+    mult = {"K": 1 << 10, "M": 1 << 20, "G": 1 << 30}.get(text[-1:], 1)
+    try:
+        n = int(float(text[:-1] if mult != 1 else text) * mult)
+    except ValueError:
+        n = 0
+    if n <= 0:
+        raise ValueError(f"invalid size {s!r} (e.g. 4096, 64K, 16M)")
+    return n
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse, sys
+    parser = argparse.ArgumentParser(prog="paxect_selftune_plugin calibrate")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_sw = sub.add_parser("sweep", help="benchmark profiles on this host and write a signed table")
+    p_sw.add_argument("--out", required=True)
+    p_sw.add_argument("--min-size", default="4K")
+    p_sw.add_argument("--max-size", default="16M")
+    p_sw.add_argument("--reps", type=int, default=3)
+    p_sw.add_argument("--payload", help="representative payload file (repeated/truncated to each size)")
+    p_sw.add_argument("--max-workers", type=int, default=None)
+    p_sw.add_argument("--key", default=None, help=f"HMAC key (default ${KEY_ENV}; none → SHA-256 only)")
+    p_ver = sub.add_parser("verify", help="check a table's signature")
+    p_ver.add_argument("table"); p_ver.add_argument("--key", default=None)
+    p_show = sub.add_parser("show", help="print a verified table")
+    p_show.add_argument("table"); p_show.add_argument("--key", default=None)
+    p_host = sub.add_parser("host", help="time cpu/io (matrix with NumPy) and store them with the tuner state")
+    p_host.add_argument("--state", default=None, help="tuner state file (default: the tuner's default)")
+    p_host.add_argument("--force", action="store_true", help="re-measure even if a calibration is stored")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.cmd == "sweep":
+            lo, hi = _parse_size(args.min_size), _parse_size(args.max_size)
+            sizes = [1 << k for k in range(max(1, lo.bit_length() - 1), hi.bit_length())]
+            payload = None
+            if args.payload:
+                with open(args.payload, "rb") as f:
+                    payload = f.read(hi)
+            rows = sweep(sizes, args.reps, payload, args.max_workers, progress=print)
+            write_table(args.out, build_table(rows, args.key))
+            print(f"wrote {args.out} ({len(rows)} size classes)")
+        elif args.cmd == "host":
+            from . import Autotune
+            tuner = Autotune(state_path=args.state, log_to_file=False)
+            cal = tuner.calibrate(force=args.force)
+            tuner._save_state()
+            print(json.dumps({"state": tuner.state_path, "host": tuner._host_id, "calibration": cal}))
+        else:
+            table = load_table(args.table, args.key)
+            if args.cmd == "verify":
+                print(json.dumps({"ok": True, "host": table.host, "rows": len(table.rows)}))
+            else:
+                for r in table.rows:
+                    print(f"[{1 << max(0, r.size_class - 1):>10}, {1 << r.size_class:>10})  {r.label:<8} "
+                          f"bs={r.blocksize:<8} workers={r.workers}  {r.seconds * 1e3:.3f} ms")
+    except (OSError, ValueError) as e:  # DecisionTableError is a ValueError
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+__all__ = ["sweep", "build_table", "write_table", "load_table", "DecisionTable", "TableRow",
+           "DecisionTableError", "default_job", "synthetic_payload"]
+
+if __name__ == "__main__":
+    raise SystemExit(main())
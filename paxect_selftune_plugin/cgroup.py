@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: Apache-2.0
+# -*- coding: utf-8 -*-
+"""
+PAXECT SelfTune — Container Limits
+----------------------------------
+Effective CPU and memory limits of the current cgroup, so parallel decisions
+are sized for the container rather than for every host core.
+
+ - cgroup v2: cpu.max, cpuset.cpus.effective, memory.max
+ - cgroup v1: cpu.cfs_quota_us / cpu.cfs_period_us, cpuset.effective_cpus
+   (or cpuset.cpus), memory.limit_in_bytes
+ - always: os.sched_getaffinity() / os.cpu_count() as the upper bound
+
+The cgroup path comes from /proc/self/cgroup; when it does not exist under
+the mount (private cgroup namespace) the mount root is used. Limits are
+re-read at most once per `interval` seconds, so quota changes applied to a
+running pod are picked up.
+"""
+
+import os, math, time
+from typing import Dict, Any, Optional
+
+CGROUP_ROOT = "/sys/fs/cgroup"
+UNLIMITED_V1 = 1 << 60          # v1 reports "no limit" as a huge page-aligned number
+BUFFER_FRACTION = 0.25          # share of memory.max decisions may plan for I/O buffers
+MIN_BLOCKSIZE = 4096
+
+def _read(path: str) -> Optional[str]:
+    try:
+        with open(path, "r") as f:
+            return f.read().strip()
+    except OSError:
+        return None
+
+def parse_cpuset(text: str) -> int:
+    """'0-3,8,10-11' → 7"""
+    n = 0
+    for part in text.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        lo, _, hi = part.partition("-")
+        n += int(hi or lo) - int(lo) + 1
+    return n
+
+def _host_cpus() -> int:
+    try:
+        return len(os.sched_getaffinity(0))
+    except (AttributeError, OSError):
+        return os.cpu_count() or 1
+
+def _cgroup_paths(proc_cgroup: str) -> Dict[str, str]:
+    """controller → path from /proc/self/cgroup ('' key = v2 unified path)."""
+    out = {}
+    for line in (_read(proc_cgroup) or "").splitlines():
+        parts = line.split(":", 2)
+        if len(parts) != 3:
+            continue
+        for ctrl in parts[1].split(",") if parts[1] else [""]:
+            out[ctrl] = parts[2]
+    return out
+
+def _dir(root: str, sub: str, path: str) -> str:
+    base = os.path.join(root, sub) if sub else root
+    full = os.path.join(base, path.lstrip("/"))
+    return full if os.path.isdir(full) else base
+
+def read_limits(root: str = CGROUP_ROOT, proc_cgroup: str = "/proc/self/cgroup") -> Dict[str, Any]:
+    paths = _cgroup_paths(proc_cgroup)
+    host = _host_cpus()
+    quota = cpuset = memory = None
+    version = None
+
+    d = _dir(root, "", paths.get("", "/"))
+    cpu_max, cpus_eff, mem_max = (_read(os.path.join(d, f)) for f in ("cpu.max", "cpuset.cpus.effective", "memory.max"))
+    if cpu_max is not None or cpus_eff is not None or mem_max is not None:
+        version = 2
+        if cpu_max:
+            q, _, period = cpu_max.partition(" ")
+            if q != "max":
+                quota = int(q) / int(period or 100000)
+        if cpus_eff:
+            cpuset = parse_cpuset(cpus_eff)
+        if mem_max and mem_max != "max":
+            memory = int(mem_max)
+    else:
+        d_cpu = _dir(root, "cpu", paths.get("cpu", "/"))
+        q, period = _read(os.path.join(d_cpu, "cpu.cfs_quota_us")), _read(os.path.join(d_cpu, "cpu.cfs_period_us"))
+        d_set = _dir(root, "cpuset", paths.get("cpuset", "/"))
+        cpus = _read(os.path.join(d_set, "cpuset.effective_cpus")) or _read(os.path.join(d_set, "cpuset.cpus"))
+        d_mem = _dir(root, "memory", paths.get("memory", "/"))
+        mem = _read(os.path.join(d_mem, "memory.limit_in_bytes"))
+        if q is not None or cpus is not None or mem is not None:
+            version = 1
+        if q and period and int(q) > 0:
+            quota = int(q) / int(period)
+        if cpus:
+            cpuset = parse_cpuset(cpus)
+        if mem and int(mem) < UNLIMITED_V1:
+            memory = int(mem)
+
+    cpus = float(min(c for c in (host, cpuset, quota) if c))
+    return {"version": version, "host_cpus": host, "cpu_quota": quota, "cpuset_cpus": cpuset,
+            "effective_cpus": round(cpus, 3), "workers": max(1, math.floor(cpus)), "memory_max": memory}
+
+class CgroupLimits:
+    def __init__(self, interval: float = 30.0, root: str = CGROUP_ROOT, proc_cgroup: str = "/proc/self/cgroup",
+                 buffer_fraction: float = BUFFER_FRACTION):
+        self.interval = interval
+        self.root, self.proc_cgroup = root, proc_cgroup
+        self.buffer_fraction = buffer_fraction
+        self.current: Dict[str, Any] = {}
+        self._next = 0.0
+
+    def get(self, force: bool = False) -> Dict[str, Any]:
+        now = time.monotonic()
+        if force or now >= self._next:
+            self._next = now + self.interval
+            try:
+                self.current = read_limits(self.root, self.proc_cgroup)
+            except (OSError, ValueError):
+                self.current = self.current or {"version": None, "host_cpus": _host_cpus(), "cpu_quota": None,
+                                                 "cpuset_cpus": None, "effective_cpus": float(_host_cpus()),
+                                                 "workers": _host_cpus(), "memory_max": None}
+        return self.current
+
+    def size(self, blocksize: int, parallel: bool) -> Dict[str, Any]:
+        """Bound workers, chunk size and buffer memory (double-buffered chunk per worker)."""
+        lim = self.get()
+        workers = lim["workers"] if parallel else 1
+        budget = int(lim["memory_max"] * self.buffer_fraction) if lim.get("memory_max") else None
+        if budget is not None:
+            blocksize = max(MIN_BLOCKSIZE, min(blocksize, budget // (2 * workers)))
+            workers = max(1, min(workers, budget // (2 * blocksize)))
+        return {"blocksize": blocksize, "workers": workers, "max_buffer_bytes": budget}
+
+__all__ = ["CgroupLimits", "read_limits", "parse_cpuset", "BUFFER_FRACTION"]
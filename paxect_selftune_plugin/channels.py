@@ -0,0 +1,189 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: Apache-2.0
+# -*- coding: utf-8 -*-
+"""
+PAXECT SelfTune — Channel Groups
+--------------------------------
+Independent tuners per channel (e.g. data / control / heartbeat as in
+demo_08) under one shared overhead budget:
+
+  group = ChannelGroup(budget=0.75)
+  group.add("data", weight=4.0)
+  group.add("control", priority=1)
+  group.add("heartbeat", priority=2)
+  d = group.decide("data", n_bytes, exec_time, overhead)
+
+Each channel keeps its own Autotune (own stats, state file and log), but
+its private fail-safe trip is disabled by default: the group feeds the
+overhead ratio of all channels together into one ThrottleController
+(trip at `budget`, same hysteresis and stepped recovery as a single
+tuner).
+
+While that controller is below 100%, the admitted share of total load is
+allocated every `rebalance_interval` seconds:
+
+ - strictly by priority first (higher number = served first), so a
+   heartbeat keeps running at 100% while bulk data absorbs the cut
+ - within one priority, weighted max-min fair by `weight` over each
+   channel's measured share of busy time (exec + overhead)
+
+A channel's percent is its allocation over its demand (never below
+`min_percent`); channels cut below 100% during a trip are also put in
+fail-safe. The cap is applied inside the channel tuner's throttle
+update, so decisions, rate limiters and logs all see it.
+"""
+
+import os, time, threading
+from dataclasses import dataclass
+from typing import Dict, Any, Optional, Sequence
+
+from .throttle import ThrottleController, DEFAULT_SCHEDULE
+
+@dataclass
+class Channel:
+    name: str
+    tuner: Any
+    weight: float = 1.0
+    priority: int = 0
+    share: float = 0.0     # smoothed share of the group's busy time
+    percent: int = 100     # allocated throttle percent
+    _busy: float = 0.0     # exec + overhead seconds since the last rebalance
+    _overhead: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"weight": self.weight, "priority": self.priority, "share": round(self.share, 4),
+                "percent": self.percent, "fail_safe": self.tuner._budget_cap[0]}
+
+def _channel_path(path: str, name: str) -> str:
+    base, ext = os.path.splitext(path)
+    return f"{base}.{name}{ext}"
+
+def _fill(capacity: float, demand: Dict[str, float], weight: Dict[str, float]) -> Dict[str, float]:
+    """Weighted max-min fair split of `capacity` over `demand` (water-filling)."""
+    alloc = dict.fromkeys(demand, 0.0)
+    rem = {n: d for n, d in demand.items() if d > 0.0}
+    while rem and capacity > 1e-12:
+        wsum = sum(weight[n] for n in rem)
+        done = [n for n in rem if rem[n] <= capacity * weight[n] / wsum]
+        if not done:
+            for n in rem:
+                alloc[n] += capacity * weight[n] / wsum
+            break
+        for n in done:
+            alloc[n] += rem.pop(n)
+            capacity -= alloc[n]
+    return alloc
+
+class ChannelGroup:
+    def __init__(self, budget: float = 0.75, release: Optional[float] = None,
+                 schedule: Sequence[int] = DEFAULT_SCHEDULE, hold: float = 60.0, step: float = 30.0,
+                 rebalance_interval: float = 1.0, min_percent: int = 10, smoothing: float = 0.5,
+                 clock=time.monotonic, **tuner_kwargs):
+        self.budget = budget
+        self.rebalance_interval = rebalance_interval
+        self.min_percent = min_percent
+        self.smoothing = smoothing
+        self.clock = clock
+        self.tuner_kwargs = tuner_kwargs
+        self.channels: Dict[str, Channel] = {}
+        self.avg_overhead = 0.0
+        self._ctl = ThrottleController(budget, release, schedule, hold, step)
+        self._lock = threading.Lock()
+        self._next = clock() + rebalance_interval
+
+    def add(self, name: str, weight: float = 1.0, priority: int = 0, **kwargs):
+        """Create the channel's Autotune (group kwargs, then these); returns the tuner."""
+        from . import Autotune, get_default_state_path, get_default_log_path
+        if name in self.channels:
+            raise ValueError(f"channel {name!r} already exists")
+        if weight <= 0:
+            raise ValueError("weight must be > 0")
+        opts = dict(self.tuner_kwargs, **kwargs)
+        opts["state_path"] = _channel_path(opts.get("state_path") or get_default_state_path(), name)
+        opts["log_path"] = _channel_path(opts.get("log_path") or get_default_log_path(), name)
+        opts.setdefault("max_overhead_ratio", 1.0)  # the group budget trips instead
+        opts.setdefault("clock", self.clock)
+        tuner = Autotune(**opts)
+        with self._lock:
+            self.channels[name] = Channel(name, tuner, float(weight), int(priority))
+            self._allocate()
+        return tuner
+
+    def tuner(self, name: str):
+        return self.channels[name].tuner
+
+    # ---------------- Decisions ----------------
+    def decide(self, name: str, n_bytes: int = 0, exec_time: Optional[float] = None,
+               overhead: Optional[float] = None):
+        """Channel tuner's decide(), with the feedback counted against the group budget."""
+        if exec_time is not None:
+            self.record(name, exec_time, overhead or 0.0)
+        return self.channels[name].tuner.decide(n_bytes, exec_time, overhead)
+
+    def tune(self, name: str, **kwargs) -> Dict[str, Any]:
+        if kwargs.get("exec_time") is not None:
+            self.record(name, kwargs["exec_time"], kwargs.get("overhead") or 0.0)
+        return self.channels[name].tuner.tune(**kwargs)
+
+    def record(self, name: str, exec_time: float, overhead: float, now: Optional[float] = None):
+        """Count one measured operation (for callers that drive the channel tuner directly)."""
+        now = self.clock() if now is None else now
+        with self._lock:
+            ch = self.channels[name]
+            ch._busy += exec_time + overhead
+            ch._overhead += overhead
+            if now >= self._next:
+                self._rebalance(now)
+
+    # ---------------- Budget ----------------
+    def rebalance(self, now: Optional[float] = None) -> Dict[str, int]:
+        """Fold the interval's load into the shares and the group throttle; returns percent per channel."""
+        with self._lock:
+            self._rebalance(self.clock() if now is None else now)
+            return {n: ch.percent for n, ch in self.channels.items()}
+
+    def _rebalance(self, now: float):
+        chans = list(self.channels.values())
+        busy = sum(ch._busy for ch in chans)
+        if busy > 0.0:
+            self.avg_overhead = sum(ch._overhead for ch in chans) / busy
+            a = self.smoothing
+            for ch in chans:
+                ch.share = a * ch.share + (1.0 - a) * ch._busy / busy
+        else:
+            self.avg_overhead = 0.0  # idle interval: nothing spent
+        for ch in chans:
+            ch._busy = ch._overhead = 0.0
+        self._ctl.update(self.avg_overhead, now)
+        self._next = now + self.rebalance_interval
+        self._allocate()
+
+    def _allocate(self):
+        ctl = self._ctl
+        total = sum(ch.share for ch in self.channels.values())
+        capacity = total * ctl.percent / 100.0
+        for prio in sorted({ch.priority for ch in self.channels.values()}, reverse=True):
+            tier = [ch for ch in self.channels.values() if ch.priority == prio]
+            demand = {ch.name: ch.share for ch in tier}
+            alloc = _fill(capacity, demand, {ch.name: ch.weight for ch in tier})
+            for ch in tier:
+                if ch.share > 0.0:
+                    pct = int(round(100.0 * alloc[ch.name] / ch.share))
+                else:
+                    pct = 100 if capacity > 1e-12 else 0  # idle: full if its tier is still reached
+                ch.percent = min(100, max(self.min_percent, pct))
+                ch.tuner._budget_cap = (ctl.state == "tripped" and ch.percent < 100, ch.percent)
+            capacity = max(0.0, capacity - sum(alloc.values()))
+
+    # ---------------- Reporting ----------------
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"budget": self.budget, "avg_overhead": round(self.avg_overhead, 4),
+                    "throttle": self._ctl.to_dict(self.clock()),
+                    "channels": {n: ch.to_dict() for n, ch in self.channels.items()}}
+
+    def save(self):
+        for ch in list(self.channels.values()):
+            ch.tuner._save_state()
+
+__all__ = ["ChannelGroup", "Channel"]
@@ -0,0 +1,388 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: Apache-2.0
+# -*- coding: utf-8 -*-
+"""
+PAXECT SelfTune — Fleet Coordinator
+-----------------------------------
+Shares learning between many tuner processes (pods, workers) through one
+small server instead of overwriting a common state file:
+
+  python3 -m paxect_selftune_plugin coordinator serve --listen unix:/tmp/paxect.sock
+  python3 -m paxect_selftune_plugin coordinator status --connect unix:/tmp/paxect.sock
+  python3 -m paxect_selftune_plugin coordinator local --workers 4    # N local processes
+
+Addresses: "unix:/path" or "host:port" (TCP).
+
+Protocol: one JSON object per line over a persistent stream connection.
+
+ - client → {"op": "push", "client": id, "since": version,
+             "deltas": {bucket: {label: [count, sum_seconds]}}}
+ - server → {"op": "update", "version": v}                    (nothing new)
+            {"op": "update", "version": v, "best": {...},
+             "stats": {bucket: {label: [count, mean_seconds]}}}
+
+The server decays fleet sums with a half-life, so arms are re-ranked when
+the fleet's workload drifts. Clients never wait on it: decisions stay
+local, deltas are summed in memory and pushed by a background thread every
+`interval` seconds. When the coordinator is unreachable the deltas are
+kept (they are sums, so they do not grow), the last fleet view is dropped
+after `stale_after` seconds and the tuner continues on local stats only.
+"""
+
+import os, json, time, socket, threading, socketserver
+from typing import Dict, Any, Optional, List, Tuple
+
+HALF_LIFE = 600.0     # seconds for fleet sums to lose half their weight
+MIN_COUNT = 3.0       # fleet samples before an arm can be ranked best
+PUSH_INTERVAL = 2.0
+MAX_LINE = 1 << 20
+
+def parse_address(address: str) -> Tuple[int, Any]:
+    """'unix:/path' → (AF_UNIX, path); 'host:port' / 'tcp://host:port' → (AF_INET, (host, port))."""
+    if address.startswith("unix:"):
+        return socket.AF_UNIX, address[5:]
+    if address.startswith("tcp://"):
+        address = address[6:]
+    host, _, port = address.rpartition(":")
+    return socket.AF_INET, (host or "127.0.0.1", int(port))
+
+# ---------------- Fleet aggregate ----------------
+class FleetStats:
+    """Decayed per bucket/arm sums from all clients."""
+
+    def __init__(self, half_life: float = HALF_LIFE, min_count: float = MIN_COUNT):
+        self.half_life = half_life
+        self.min_count = min_count
+        self.stats: Dict[str, Dict[str, List[float]]] = {}   # bucket → label → [count, sum, t]
+        self.clients: Dict[str, float] = {}
+        self.version = 0
+        self._view: Dict[str, Any] = {"best": {}, "stats": {}}
+        self._lock = threading.Lock()
+
+    def merge(self, client: str, deltas: Dict[str, Dict[str, List[float]]], now: Optional[float] = None):
+        now = time.time() if now is None else now
+        with self._lock:
+            self.clients[client] = now
+            if not deltas:
+                return
+            for bucket, arms in deltas.items():
+                for label, (count, total) in arms.items():
+                    rec = self.stats.setdefault(bucket, {}).setdefault(label, [0.0, 0.0, now])
+                    w = 0.5 ** (max(0.0, now - rec[2]) / self.half_life) if self.half_life > 0 else 1.0
+                    rec[0] = rec[0] * w + float(count)
+                    rec[1] = rec[1] * w + float(total)
+                    rec[2] = now
+            self.version += 1
+            self._view = self._render()
+
+    def _render(self) -> Dict[str, Any]:
+        stats, best = {}, {}
+        for bucket, arms in self.stats.items():
+            stats[bucket] = {l: [round(c, 3), s / c] for l, (c, s, _) in arms.items() if c > 0}
+            ranked = [(mean, l) for l, (c, mean) in stats[bucket].items() if c >= self.min_count]
+            if ranked:
+                best[bucket] = min(ranked)[1]
+        return {"best": best, "stats": stats}
+
+    def update(self, since: Optional[int] = None) -> Dict[str, Any]:
+        """Compact reply: the fleet view only when it changed since the client's version."""
+        view, version = self._view, self.version
+        if since == version:
+            return {"op": "update", "version": version}
+        return dict(view, op="update", version=version)
+
+    def status(self) -> Dict[str, Any]:
+        now = time.time()
+        return dict(self._view, version=self.version,
+                    clients={c: round(now - t, 3) for c, t in sorted(self.clients.items())})
+
+# ---------------- Server ----------------
+class _Handler(socketserver.StreamRequestHandler):
+    def handle(self):
+        fleet: FleetStats = self.server.fleet
+        self.server.conns.add(self.connection)
+        try:
+            self._serve(fleet)
+        except OSError:
+            pass  # client went away or stop() closed the connection
+        finally:
+            self.server.conns.discard(self.connection)
+
+    def _serve(self, fleet: FleetStats):
+        for line in iter(lambda: self.rfile.readline(MAX_LINE), b""):
+            try:
+                msg = json.loads(line)
+                op = msg.get("op")
+                if op == "push":
+                    fleet.merge(str(msg.get("client", "?")), msg.get("deltas") or {})
+                    reply = fleet.update(msg.get("since"))
+                elif op == "pull":
+                    reply = fleet.update(msg.get("since"))
+                elif op == "status":
+                    reply = fleet.status()
+                else:
+                    reply = {"op": "error", "error": f"unknown op {op!r}"}
+            except (ValueError, TypeError, AttributeError) as e:
+                reply = {"op": "error", "error": str(e)}
+            self.wfile.write(json.dumps(reply, separators=(",", ":")).encode("utf-8") + b"\n")
+
+class _TCPServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+if hasattr(socketserver, "ThreadingUnixStreamServer"):
+    class _UnixServer(socketserver.ThreadingUnixStreamServer):
+        daemon_threads = True
+else:  # Windows
+    _UnixServer = None
+
+class CoordinatorServer:
+    """serve_forever() in a daemon thread; stop() closes the socket (and unlinks a Unix path)."""
+
+    def __init__(self, address: str, half_life: float = HALF_LIFE, min_count: float = MIN_COUNT):
+        self.address = address
+        self.fleet = FleetStats(half_life, min_count)
+        family, addr = parse_address(address)
+        if family == socket.AF_UNIX:
+            if _UnixServer is None:
+                raise OSError("Unix sockets are not available on this platform")
+            if os.path.exists(addr):
+                os.unlink(addr)  # stale socket from a previous run
+            self._server = _UnixServer(addr, _Handler)
+        else:
+            self._server = _TCPServer(addr, _Handler)
+            host, port = self._server.server_address[:2]
+            self.address = f"{host}:{port}"  # resolves port 0
+        self._server.fleet = self.fleet
+        self._server.conns = set()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "CoordinatorServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="paxect-coordinator", daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        self._server.serve_forever()
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        for conn in list(self._server.conns):
+            try:
+                conn.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+        family, addr = parse_address(self.address)
+        if family == socket.AF_UNIX and os.path.exists(addr):
+            os.unlink(addr)
+
+# ---------------- Client ----------------
+class CoordinatorClient:
+    """Batches feedback deltas and exchanges them with the coordinator off the decision path."""
+
+    def __init__(self, address: str, interval: float = PUSH_INTERVAL, timeout: float = 1.0,
+                 stale_after: Optional[float] = None, client_id: Optional[str] = None):
+        self.address = address
+        self.interval = interval
+        self.timeout = timeout
+        self.stale_after = stale_after if stale_after is not None else 10 * interval
+        self.client_id = client_id or f"{socket.gethostname()}:{os.getpid()}"
+        self.fleet: Optional[Dict[str, Any]] = None   # {"version", "best", "stats"}, swapped whole
+        self.available = False
+        self.last_error: Optional[str] = None
+        self._pending: Dict[str, Dict[str, List[float]]] = {}
+        self._lock = threading.Lock()
+        self._sock: Optional[socket.socket] = None
+        self._rfile = None
+        self._synced = 0.0
+        self._backoff = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # Decision path side: O(1), no I/O
+    def record(self, bucket: str, label: str, exec_time: float):
+        with self._lock:
+            rec = self._pending.setdefault(bucket, {}).setdefault(label, [0, 0.0])
+            rec[0] += 1
+            rec[1] += exec_time
+        if self._thread is None:
+            self.start()
+
+    def fleet_stats(self, bucket: str) -> Optional[Dict[str, List[float]]]:
+        fleet = self.fleet
+        return fleet["stats"].get(bucket) if fleet is not None else None
+
+    def fleet_best(self, bucket: str) -> Optional[str]:
+        fleet = self.fleet
+        return fleet["best"].get(bucket) if fleet is not None else None
+
+    # Background side
+    def start(self) -> "CoordinatorClient":
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="paxect-coordinator-client", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self, flush: bool = True):
+        self._stop.set()
+        if flush:
+            self.sync()
+        self._close()
+
+    def _run(self):
+        while not self._stop.wait(self._backoff):
+            self.sync()
+
+    def sync(self) -> bool:
+        """Push pending deltas and apply the reply; on failure keep them for the next attempt."""
+        with self._lock:
+            deltas, self._pending = self._pending, {}
+        since = self.fleet["version"] if self.fleet is not None else None
+        msg = {"op": "push", "client": self.client_id, "since": since, "deltas": deltas}
+        try:
+            reply = self._request(msg)
+        except (OSError, ValueError) as e:
+            self._close()
+            self._restore(deltas)
+            self.available, self.last_error = False, str(e)
+            self._backoff = min(self._backoff * 2, 30 * self.interval)
+            if self.fleet is not None and time.time() - self._synced > self.stale_after:
+                self.fleet = None  # degrade to local-only learning
+            return False
+        if "best" in reply:
+            self.fleet = {"version": reply["version"], "best": reply["best"], "stats": reply["stats"]}
+        self.available, self.last_error = True, None
+        self._synced = time.time()
+        self._backoff = self.interval
+        return True
+
+    def _restore(self, deltas):
+        with self._lock:
+            for bucket, arms in deltas.items():
+                for label, (count, total) in arms.items():
+                    rec = self._pending.setdefault(bucket, {}).setdefault(label, [0, 0.0])
+                    rec[0] += count
+                    rec[1] += total
+
+    def _request(self, msg: Dict[str, Any]) -> Dict[str, Any]:
+        if self._sock is None:
+            family, addr = parse_address(self.address)
+            sock = socket.socket(family, socket.SOCK_STREAM)
+            sock.settimeout(self.timeout)
+            try:
+                sock.connect(addr)
+            except OSError:
+                sock.close()
+                raise
+            self._sock, self._rfile = sock, sock.makefile("rb")
+        self._sock.sendall(json.dumps(msg, separators=(",", ":")).encode("utf-8") + b"\n")
+        line = self._rfile.readline(MAX_LINE)
+        if not line:
+            raise OSError("coordinator closed the connection")
+        return json.loads(line)
+
+    def _close(self):
+        if self._sock is not None:
+            try:
+                self._rfile.close()
+                self._sock.close()
+            except OSError:
+                pass
+            self._sock = self._rfile = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        fleet = self.fleet
+        return {"address": self.address, "client": self.client_id, "available": self.available,
+                "version": fleet["version"] if fleet else None, "best": dict(fleet["best"]) if fleet else None,
+                "last_sync": self._synced or None, "error": self.last_error}
+
+def request(address: str, msg: Dict[str, Any], timeout: float = 2.0) -> Dict[str, Any]:
+    """One-shot request (e.g. {"op": "status"})."""
+    family, addr = parse_address(address)
+    with socket.socket(family, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(addr)
+        sock.sendall(json.dumps(msg).encode("utf-8") + b"\n")
+        with sock.makefile("rb") as f:
+            return json.loads(f.readline(MAX_LINE))
+
+# ---------------- Local multi-process run ----------------
+def _local_worker(address: str, decisions: int, seed: int, out_q, workdir: str):
+    """Worker process: its own tuner on noisy (±30%) arm costs where compress is cheapest."""
+    import random
+    from . import Autotune
+    rnd = random.Random(seed)
+    true_cost = {"baseline": 1.0, "compress": 0.6, "parallel": 0.8}
+    tuner = Autotune(state_path=os.path.join(workdir, f"worker_{seed}.json"),
+                     log_to_file=False, save_interval=10 ** 9, coordinator=address, coordinator_interval=0.2)
+    d = tuner.decide(1 << 20)
+    for _ in range(decisions):
+        t = true_cost[d.label] * 1e-3 * rnd.uniform(0.7, 1.3)
+        d = tuner.decide(1 << 20, t, 1e-5)
+    tuner._coord.stop()
+    out_q.put({"seed": seed, "local_best": tuner._best.get("medium"), "coordinator": tuner._coord.to_dict()})
+
+def local_run(workers: int = 4, decisions: int = 500, address: Optional[str] = None) -> Dict[str, Any]:
+    """Coordinator in this process plus `workers` tuner processes on the same machine."""
+    import shutil, tempfile, multiprocessing as mp
+    workdir = tempfile.mkdtemp(prefix="paxect_coord_")  # socket and worker state files
+    address = address or "unix:" + os.path.join(workdir, "coord.sock")
+    server = None
+    try:
+        server = CoordinatorServer(address).start()
+        q = mp.Queue()
+        procs = [mp.Process(target=_local_worker, args=(server.address, decisions, i, q, workdir))
+                 for i in range(workers)]
+        for p in procs:
+            p.start()
+        results = [q.get(timeout=120) for _ in procs]
+        for p in procs:
+            p.join()
+        return {"address": server.address, "fleet": server.fleet.status(),
+                "workers": sorted(results, key=lambda r: r["seed"])}
+    finally:
+        if server is not None:
+            server.stop()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+# ---------------- CLI ----------------
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse, sys
+    parser = argparse.ArgumentParser(prog="paxect_selftune_plugin coordinator")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_serve = sub.add_parser("serve", help="run the coordinator")
+    p_serve.add_argument("--listen", default="127.0.0.1:8091", help="unix:/path or host:port")
+    p_serve.add_argument("--half-life", type=float, default=HALF_LIFE)
+    p_serve.add_argument("--min-count", type=float, default=MIN_COUNT)
+    p_stat = sub.add_parser("status", help="print the fleet view of a running coordinator")
+    p_stat.add_argument("--connect", default="127.0.0.1:8091")
+    p_loc = sub.add_parser("local", help="coordinator + N worker processes on this machine")
+    p_loc.add_argument("--workers", type=int, default=4)
+    p_loc.add_argument("--decisions", type=int, default=500)
+    p_loc.add_argument("--listen", default=None)
+    args = parser.parse_args(argv)
+
+    try:
+        if args.cmd == "serve":
+            server = CoordinatorServer(args.listen, args.half_life, args.min_count)
+            print(f"coordinator listening on {server.address}")
+            try:
+                server.serve_forever()
+            except KeyboardInterrupt:
+                pass
+            finally:
+                server.stop()
+        elif args.cmd == "status":
+            print(json.dumps(request(args.connect, {"op": "status"}), indent=2))
+        else:
+            print(json.dumps(local_run(args.workers, args.decisions, args.listen), indent=2))
+    except (OSError, ValueError) as e:  # bad address, malformed reply
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+__all__ = ["CoordinatorServer", "CoordinatorClient", "FleetStats", "parse_address", "request", "local_run"]
+
+if __name__ == "__main__":
+    raise SystemExit(main())
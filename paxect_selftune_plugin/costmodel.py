@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: Apache-2.0
+# -*- coding: utf-8 -*-
+"""
+PAXECT SelfTune — Per-Byte Cost Model
+-------------------------------------
+time ≈ a + b · MiB, fitted per bucket/arm by recursive least squares with
+exponential forgetting (λ), so arms are compared at the payload size that
+is actually about to be processed instead of on a bucket-wide average.
+
+ - update() is O(1): a 2×2 RLS step in plain Python, no allocation beyond
+   a few floats
+ - covariance windup (no size variation while forgetting) is bounded by
+   capping the trace of P
+ - models are persisted with the tuner state; the configured λ applies on
+   load, whatever λ they were saved with
+"""
+
+from math import inf
+from typing import Dict, Any, Optional, List, Tuple
+
+MIB = float(1 << 20)
+FORGETTING = 0.98
+P0 = 1e4            # initial covariance (weak prior)
+P_MAX_TRACE = 1e6   # anti-windup cap
+MIN_SAMPLES = 3     # below this, callers should fall back to the EMA
+
+class RLSModel:
+    __slots__ = ("a", "b", "p00", "p01", "p11", "n", "lam")
+
+    def __init__(self, lam: float = FORGETTING):
+        self.a = self.b = 0.0
+        self.p00, self.p01, self.p11 = P0, 0.0, P0
+        self.n = 0
+        self.lam = lam
+
+    def update(self, n_bytes: int, seconds: float):
+        x = n_bytes / MIB
+        p00, p01, p11, lam = self.p00, self.p01, self.p11, self.lam
+        # P·φ with φ = (1, x)
+        g0, g1 = p00 + p01 * x, p01 + p11 * x
+        denom = lam + g0 + g1 * x
+        k0, k1 = g0 / denom, g1 / denom
+        err = seconds - (self.a + self.b * x)
+        self.a += k0 * err
+        self.b += k1 * err
+        # P = (P − k·φᵀ·P) / λ
+        p00 = (p00 - k0 * g0) / lam
+        p01 = (p01 - k0 * g1) / lam
+        p11 = (p11 - k1 * g1) / lam
+        trace = p00 + p11
+        if trace > P_MAX_TRACE:
+            s = P_MAX_TRACE / trace
+            p00, p01, p11 = p00 * s, p01 * s, p11 * s
+        self.p00, self.p01, self.p11 = p00, p01, p11
+        self.n += 1
+
+    def predict(self, n_bytes: int) -> float:
+        if self.n < MIN_SAMPLES:
+            return inf
+        return max(0.0, self.a + self.b * n_bytes / MIB)
+
+    def to_list(self) -> List[float]:
+        return [self.a, self.b, self.p00, self.p01, self.p11, self.n]
+
+    @classmethod
+    def from_list(cls, v: List[float], lam: float = FORGETTING) -> "RLSModel":
+        m = cls(lam)
+        m.a, m.b, m.p00, m.p01, m.p11 = (float(x) for x in v[:5])
+        m.n = int(v[5])
+        return m
+
+# ---------------- Per bucket/arm set ----------------
+class CostModels:
+    def __init__(self, lam: float = FORGETTING):
+        self.lam = lam
+        self.models: Dict[Tuple[str, str], RLSModel] = {}
+
+    def get(self, bucket: str, label: str) -> RLSModel:
+        m = self.models.get((bucket, label))
+        if m is None:
+            m = self.models[(bucket, label)] = RLSModel(self.lam)
+        return m
+
+    def update(self, bucket: str, label: str, n_bytes: int, seconds: float):
+        self.get(bucket, label).update(n_bytes, seconds)
+
+    def predict(self, bucket: str, label: str, n_bytes: int) -> float:
+        m = self.models.get((bucket, label))
+        return m.predict(n_bytes) if m is not None else inf
+
+    def summary(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        out: Dict[str, Dict[str, Dict[str, float]]] = {}
+        for (b, l), m in sorted(self.models.items()):
+            out.setdefault(b, {})[l] = {"fixed_s": m.a, "per_mib_s": m.b, "samples": m.n}
+        return out
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"lambda": self.lam, "models": {f"{b}|{l}": m.to_list() for (b, l), m in self.models.items()}}
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any], lam: Optional[float] = None) -> "CostModels":
+        """Restore models; `lam` (the configured forgetting) overrides the stored λ."""
+        out = cls(d.get("lambda", FORGETTING) if lam is None else lam)
+        for key, v in d.get("models", {}).items():
+            b, l = key.split("|", 1)
+            out.models[(b, l)] = RLSModel.from_list(v, out.lam)
+        return out
+
+__all__ = ["RLSModel", "CostModels", "FORGETTING", "MIN_SAMPLES"]
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: Apache-2.0
+# -*- coding: utf-8 -*-
+"""
+PAXECT SelfTune — Fast Decision Path
+------------------------------------
+Building blocks for `Autotune.decide()`, the low-overhead alternative to
+`tune()`:
+
+ - Decision: immutable NamedTuple, precomputed once per (size class, arm,
+   fail-safe, throttle, limits) and shared by every call that maps to it;
+   `d["label"]` works as with the dicts returned by tune()
+ - DecisionRing: preallocated typed arrays holding the raw facts of each
+   decision with a monotonic integer timestamp; rows become history dicts,
+   rollup samples and log lines only when the ring is drained (full, on
+   save, or when history is read)
+
+Per decision no dicts, strings, tuples or datetimes are created; what is
+left are float/int temporaries of the EMA and overhead arithmetic.
+"""
+
+import time
+from array import array
+from typing import NamedTuple, Optional, Iterator, Tuple
+
+class Decision(NamedTuple):
+    label: str
+    policy: str
+    blocksize: int
+    parallel: bool
+    compress: bool
+    workers: Optional[int]           # None: not bounded (cgroup_aware off, no table row)
+    max_buffer_bytes: Optional[int]
+    fail_safe: bool
+    throttle_percent: int
+
+    def __getitem__(self, key):
+        # dict-style access for code written against tune()'s result
+        return getattr(self, key) if isinstance(key, str) else tuple.__getitem__(self, key)
+
+    def get(self, key, default=None):
+        return getattr(self, key, default)
+
+    def as_dict(self):
+        return self._asdict()
+
+class DecisionRing:
+    """Fixed-capacity columnar buffer; push() only stores into preallocated slots."""
+
+    __slots__ = ("capacity", "n", "ts", "bucket", "fb_bucket", "fb_label", "exec_time", "overhead",
+                 "avg_overhead", "n_bytes", "decision", "wall0", "mono0")
+
+    NONE = -1.0     # exec_time/overhead sentinel for "no feedback"
+    NO_ARM = 255    # fb_bucket/fb_label sentinel for "no previous decision"
+
+    def __init__(self, capacity: int = 1024):
+        self.capacity = capacity
+        self.n = 0
+        self.ts = array("q", bytes(8 * capacity))
+        self.bucket = array("B", bytes(capacity))
+        self.fb_bucket = array("B", bytes(capacity))
+        self.fb_label = array("B", bytes(capacity))
+        self.exec_time = array("d", bytes(8 * capacity))
+        self.overhead = array("d", bytes(8 * capacity))
+        self.avg_overhead = array("d", bytes(8 * capacity))
+        self.n_bytes = array("Q", bytes(8 * capacity))
+        self.decision = [None] * capacity  # shared Decision references, not copies
+        # monotonic → wall clock mapping, applied when rows are formatted
+        self.wall0, self.mono0 = time.time(), time.monotonic_ns()
+
+    def push(self, ts_ns: int, bucket: int, fb_bucket: int, fb_label: int, exec_time: float,
+             overhead: float, avg_overhead: float, n_bytes: int, decision: Decision) -> bool:
+        """Store one decision; returns True when the ring is full and must be drained."""
+        i = self.n
+        self.ts[i] = ts_ns
+        self.bucket[i] = bucket
+        self.fb_bucket[i] = fb_bucket
+        self.fb_label[i] = fb_label
+        self.exec_time[i] = exec_time
+        self.overhead[i] = overhead
+        self.avg_overhead[i] = avg_overhead
+        self.n_bytes[i] = n_bytes
+        self.decision[i] = decision
+        self.n = i + 1
+        return self.n >= self.capacity
+
+    def wall(self, ts_ns: int) -> float:
+        return self.wall0 + (ts_ns - self.mono0) / 1e9
+
+    def drain(self) -> Iterator[Tuple]:
+        """(wall ts, bucket, fb_bucket, fb_label, exec, overhead, avg, bytes, decision), oldest first."""
+        n, self.n = self.n, 0
+        none = self.NONE
+        for i in range(n):
+            ex, ov = self.exec_time[i], self.overhead[i]
+            yield (self.wall(self.ts[i]), self.bucket[i], self.fb_bucket[i], self.fb_label[i],
+                   None if ex == none else ex, None if ov == none else ov, self.avg_overhead[i],
+                   self.n_bytes[i], self.decision[i])
+
+__all__ = ["Decision", "DecisionRing"]
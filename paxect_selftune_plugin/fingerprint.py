@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: Apache-2.0
+# -*- coding: utf-8 -*-
+"""
+PAXECT SelfTune — Host Fingerprint
+----------------------------------
+Identifies the machine a tuning state was learned on so that stats copied
+between hosts (4-core VM ↔ 64-core bare metal) are never applied blindly.
+
+ - fingerprint      → CPU count/model, memory, NumPy BLAS, Python version
+ - fingerprint_id   → stable short hash used as the state key
+ - similarity       → 0.0 … 1.0 score between two fingerprints
+ - nearest_host     → best warm-start candidate among stored hosts
+ - calibration_scale→ EMA scale factor from calibration benchmarks
+"""
+
+import os, sys, json, hashlib
+from math import log
+from typing import Dict, Any, Optional, Tuple
+
+# ---------------- Probes ----------------
+def _cpu_model() -> str:
+    try:
+        with open("/proc/cpuinfo", "r", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                if key.strip() in ("model name", "Hardware", "cpu model", "Processor", "cpu"):
+                    value = " ".join(value.split())
+                    if value:
+                        return value
+    except OSError:
+        pass
+    import platform
+    return platform.processor() or _machine() or "unknown"
+
+def _machine() -> str:
+    try:
+        return os.uname().machine
+    except AttributeError:  # Windows
+        import platform
+        return platform.machine()
+
+def _mem_total_bytes() -> int:
+    try:
+        with open("/proc/meminfo", "r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith("MemTotal:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        return int(os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES"))
+    except (AttributeError, ValueError, OSError):
+        return 0
+
+def _numpy_blas() -> str:
+    """NumPy version + bundled BLAS vendor, found on disk without importing NumPy."""
+    import importlib.util
+    try:
+        spec = importlib.util.find_spec("numpy")
+    except (ImportError, ValueError):
+        spec = None
+    if spec is None or not spec.origin:
+        return "none"
+    pkg_dir = os.path.dirname(spec.origin)
+    site_dir = os.path.dirname(pkg_dir)
+    version, vendor = "unknown", "unknown"
+    libs = []
+    for d in (site_dir, os.path.join(site_dir, "numpy.libs"), os.path.join(pkg_dir, ".dylibs")):
+        try:
+            names = os.listdir(d)
+        except OSError:
+            continue
+        if d == site_dir:
+            version = next((n[6:-10] for n in names if n.startswith("numpy-") and n.endswith(".dist-info")), version)
+        else:
+            libs.extend(n.lower() for n in names)
+    for tag in ("mkl", "openblas", "accelerate", "blis", "atlas"):
+        if any(tag in n for n in libs):
+            vendor = tag
+            break
+    return f"numpy-{version}/{vendor}"
+
+# ---------------- Fingerprint ----------------
+def host_fingerprint() -> Dict[str, Any]:
+    return {
+        "cpu_count": os.cpu_count() or 1,
+        "cpu_model": _cpu_model(),
+        "mem_total": _mem_total_bytes(),
+        "blas": _numpy_blas(),
+        "python": "%d.%d" % sys.version_info[:2],
+        "machine": _machine(),
+    }
+
+def fingerprint_id(fp: Dict[str, Any]) -> str:
+    blob = json.dumps(fp, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    return hashlib.sha256(blob).hexdigest()[:16]
+
+def _log_closeness(a: float, b: float) -> float:
+    if a <= 0 or b <= 0:
+        return 0.5
+    return 1.0 / (1.0 + abs(log(a / b)))
+
+def similarity(a: Dict[str, Any], b: Dict[str, Any]) -> float:
+    """Weighted similarity; CPU shape dominates, runtime details break ties."""
+    score = 0.40 * _log_closeness(a.get("cpu_count", 0), b.get("cpu_count", 0))
+    score += 0.25 * (a.get("cpu_model") == b.get("cpu_model"))
+    score += 0.15 * _log_closeness(a.get("mem_total", 0), b.get("mem_total", 0))
+    score += 0.10 * (a.get("blas") == b.get("blas"))
+    score += 0.05 * (a.get("python") == b.get("python"))
+    score += 0.05 * (a.get("machine") == b.get("machine"))
+    return round(score, 6)
+
+def nearest_host(fp: Dict[str, Any], hosts: Dict[str, Dict[str, Any]]) -> Optional[Tuple[str, float]]:
+    best = None
+    for host_id, entry in hosts.items():
+        score = similarity(fp, entry.get("fingerprint", {}))
+        if best is None or score > best[1]:
+            best = (host_id, score)
+    return best
+
+def calibration_scale(target: Dict[str, float], source: Dict[str, float]) -> float:
+    """Geometric mean of target/source timings over shared calibration keys."""
+    ratios = [target[k] / source[k] for k in target
+              if k in source and target[k] and source[k] and target[k] > 0 and source[k] > 0]
+    if not ratios:
+        return 1.0
+    prod = 1.0
+    for r in ratios:
+        prod *= r
+    scale = prod ** (1.0 / len(ratios))
+    return min(100.0, max(0.01, scale))
+
+__all__ = ["host_fingerprint", "fingerprint_id", "similarity", "nearest_host", "calibration_scale"]
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: Apache-2.0
+# -*- coding: utf-8 -*-
+"""
+PAXECT SelfTune — Mergeable Log-Linear Histograms
+-------------------------------------------------
+HDR-style histograms with fixed memory and bounded relative error:
+
+ - values are quantized to integer `unit`s; below 2^S units every unit has
+   its own bin, above that each power of two is split into 2^(S-1) linear
+   sub-bins (relative error ≤ 2^-(S-1), ~3% with the default S=5)
+ - record() is O(1): a few integer ops and one in-place array increment;
+   the count array is preallocated, nothing grows
+ - histograms with the same layout merge by adding counts, so per-thread,
+   per-process and per-node histograms combine exactly
+ - compact sparse serialization for the state file, Prometheus bucket export
+
+A histogram is not locked; give each thread its own and merge() them.
+"""
+
+import struct
+from array import array
+from math import inf
+from typing import Dict, Any, Optional, List, Tuple, Iterable
+
+SUB_BITS = 5
+METRICS = {
+    # metric → (unit, max exponent, Prometheus le bounds)
+    "exec_time": (1e-7, 40, (1e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 5e-3, 1e-2, 5e-2, 0.1, 0.5, 1.0, 5.0)),
+    "overhead": (1e-7, 40, (1e-5, 5e-5, 1e-4, 2.5e-4, 5e-4, 1e-3, 2.5e-3, 5e-3, 1e-2, 5e-2, 0.1, 0.5, 1.0, 5.0)),
+    "overhead_ratio": (1e-5, 18, (0.05, 0.1, 0.25, 0.5, 0.75, 0.9, 1.0)),
+}
+
+_HDR = struct.Struct("<dBBQdddI")   # unit, sub bits, max exp, count, sum, min, max, nonzero bins
+_BIN = struct.Struct("<HQ")
+
+class LogLinearHistogram:
+    __slots__ = ("unit", "sub_bits", "max_exp", "_sub", "_half", "_inv_unit", "counts", "count", "sum", "min", "max")
+
+    def __init__(self, unit: float = 1e-7, sub_bits: int = SUB_BITS, max_exp: int = 40):
+        self.unit, self.sub_bits, self.max_exp = unit, sub_bits, max_exp
+        self._sub = 1 << sub_bits
+        self._half = self._sub >> 1
+        self._inv_unit = 1.0 / unit
+        self.counts = array("Q", bytes(8 * (self._sub + (max_exp - sub_bits) * self._half)))
+        self.count = 0
+        self.sum = 0.0
+        self.min = inf
+        self.max = -inf
+
+    # ---- recording ----
+    def index(self, value: float) -> int:
+        v = int(value * self._inv_unit) if value > 0 else 0
+        if v < self._sub:
+            return v
+        e = v.bit_length() - self.sub_bits
+        i = self._sub + (e - 1) * self._half + ((v >> e) - self._half)
+        return i if i < len(self.counts) else len(self.counts) - 1
+
+    def record(self, value: float):
+        self.counts[self.index(value)] += 1
+        self.count += 1
+        self.sum += value
+        if value < self.min:
+            self.min = value
+        if value > self.max:
+            self.max = value
+
+    # ---- reading ----
+    def bin_bounds(self, i: int) -> Tuple[float, float]:
+        if i < self._sub:
+            return i * self.unit, (i + 1) * self.unit
+        e = (i - self._sub) // self._half + 1
+        m = (i - self._sub) % self._half + self._half
+        return (m << e) * self.unit, ((m + 1) << e) * self.unit
+
+    def quantile(self, q: float) -> Optional[float]:
+        if not self.count:
+            return None
+        rank, seen = q * self.count, 0
+        for i, c in enumerate(self.counts):
+            if c:
+                seen += c
+                if seen >= rank:
+                    lo, hi = self.bin_bounds(i)
+                    return min(self.max, max(self.min, (lo + hi) / 2))
+        return self.max
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.sum / self.count if self.count else None
+
+    def cumulative(self, bounds: Iterable[float]) -> List[Tuple[float, int]]:
+        """(le, cumulative count) pairs; a bin counts toward le when its midpoint ≤ le."""
+        out, seen, i, n = [], 0, 0, len(self.counts)
+        for le in sorted(bounds):
+            while i < n:
+                lo, hi = self.bin_bounds(i)
+                if (lo + hi) / 2 > le:
+                    break
+                seen += self.counts[i]
+                i += 1
+            out.append((le, seen))
+        out.append((inf, self.count))
+        return out
+
+    # ---- merging ----
+    def same_layout(self, other: "LogLinearHistogram") -> bool:
+        return (self.unit, self.sub_bits, self.max_exp) == (other.unit, other.sub_bits, other.max_exp)
+
+    def merge(self, other: "LogLinearHistogram") -> "LogLinearHistogram":
+        if not self.same_layout(other):
+            raise ValueError("histogram layouts differ")
+        counts = self.counts
+        for i, c in enumerate(other.counts):
+            if c:
+                counts[i] += c
+        self.count += other.count
+        self.sum += other.sum
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def copy(self) -> "LogLinearHistogram":
+        h = LogLinearHistogram(self.unit, self.sub_bits, self.max_exp)
+        h.counts = array("Q", self.counts)
+        h.count, h.sum, h.min, h.max = self.count, self.sum, self.min, self.max
+        return h
+
+    # ---- serialization ----
+    def to_bytes(self) -> bytes:
+        nz = [(i, c) for i, c in enumerate(self.counts) if c]
+        return (_HDR.pack(self.unit, self.sub_bits, self.max_exp, self.count, self.sum, self.min, self.max, len(nz))
+                + b"".join(_BIN.pack(i, c) for i, c in nz))
+
+    @classmethod
+    def from_bytes(cls, buf, pos: int = 0) -> Tuple["LogLinearHistogram", int]:
+        unit, sub_bits, max_exp, count, total, lo, hi, n = _HDR.unpack_from(buf, pos)
+        pos += _HDR.size
+        h = cls(unit, sub_bits, max_exp)
+        for _ in range(n):
+            i, c = _BIN.unpack_from(buf, pos)
+            pos += _BIN.size
+            h.counts[i] = c
+        h.count, h.sum, h.min, h.max = count, total, lo, hi
+        return h, pos
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"unit": self.unit, "sub_bits": self.sub_bits, "max_exp": self.max_exp, "count": self.count,
+                "sum": self.sum, "min": None if self.min == inf else self.min,
+                "max": None if self.max == -inf else self.max,
+                "bins": {str(i): c for i, c in enumerate(self.counts) if c}}
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "LogLinearHistogram":
+        h = cls(d["unit"], d["sub_bits"], d["max_exp"])
+        for i, c in d.get("bins", {}).items():
+            h.counts[int(i)] = int(c)
+        h.count, h.sum = int(d["count"]), float(d["sum"])
+        h.min = inf if d.get("min") is None else d["min"]
+        h.max = -inf if d.get("max") is None else d["max"]
+        return h
+
+# ---------------- Per bucket/profile set ----------------
+class HistogramSet:
+    """Histograms keyed by (metric, bucket, profile); created on first record."""
+
+    def __init__(self):
+        self.series: Dict[Tuple[str, str, str], LogLinearHistogram] = {}
+
+    def get(self, metric: str, bucket: str, profile: str) -> LogLinearHistogram:
+        key = (metric, bucket, profile)
+        h = self.series.get(key)
+        if h is None:
+            unit, max_exp, _ = METRICS[metric]
+            h = self.series[key] = LogLinearHistogram(unit, SUB_BITS, max_exp)
+        return h
+
+    def record(self, bucket: str, profile: str, exec_time: float, overhead: Optional[float] = None):
+        self.get("exec_time", bucket, profile).record(exec_time)
+        if overhead is not None:
+            self.get("overhead", bucket, profile).record(overhead)
+            self.get("overhead_ratio", bucket, profile).record(overhead / max(1e-6, exec_time + overhead))
+
+    def merge(self, other: "HistogramSet") -> "HistogramSet":
+        for (metric, b, p), h in other.series.items():
+            self.get(metric, b, p).merge(h)
+        return self
+
+    def copy(self) -> "HistogramSet":
+        out = HistogramSet()
+        out.series = {k: h.copy() for k, h in list(self.series.items())}
+        return out
+
+    def quantiles(self, metric: str = "exec_time", qs=(0.5, 0.95, 0.99)) -> Dict[str, Dict[str, Any]]:
+        out = {}
+        for (m, b, p), h in sorted(self.series.items()):
+            if m == metric:
+                out[f"{b}/{p}"] = dict({f"p{int(q * 100)}": h.quantile(q) for q in qs}, count=h.count, mean=h.mean)
+        return out
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"|".join(k): h.to_dict() for k, h in self.series.items()}
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any]) -> "HistogramSet":
+        out = cls()
+        for key, hd in d.items():
+            out.series[tuple(key.split("|", 2))] = LogLinearHistogram.from_dict(hd)
+        return out
+
+# ---------------- Binary codec (state section "HGRM") ----------------
+def encode_histograms(d: Dict[str, Any]) -> bytes:
+    body = bytearray(struct.pack("<I", len(d)))
+    for key, hd in d.items():
+        kb = key.encode("utf-8")
+        body += struct.pack("<H", len(kb)) + kb + LogLinearHistogram.from_dict(hd).to_bytes()
+    return bytes(body)
+
+def decode_histograms(buf: bytes) -> Dict[str, Any]:
+    (n,) = struct.unpack_from("<I", buf, 0)
+    pos, out = 4, {}
+    for _ in range(n):
+        (kl,) = struct.unpack_from("<H", buf, pos)
+        key = bytes(buf[pos + 2:pos + 2 + kl]).decode("utf-8")
+        h, pos = LogLinearHistogram.from_bytes(buf, pos + 2 + kl)
+        out[key] = h.to_dict()
+    return out
+
+# ---------------- Prometheus ----------------
+def prometheus_lines(hset: HistogramSet, prefix: str = "paxect_selftune_") -> List[str]:
+    names = {"exec_time": ("exec_seconds", "exec_time per bucket/profile"),
+             "overhead": ("overhead_seconds", "overhead per bucket/profile"),
+             "overhead_ratio": ("overhead_ratio", "overhead / (exec_time + overhead) per bucket/profile")}
+    lines = []
+    for metric, (name, help_text) in names.items():
+        series = sorted((k, h) for k, h in hset.series.items() if k[0] == metric)
+        if not series:
+            continue
+        full = prefix + name
+        lines += [f"# HELP {full} {help_text}", f"# TYPE {full} histogram"]
+        bounds = METRICS[metric][2]
+        for (_, b, p), h in series:
+            lab = f'bucket="{b}",profile="{p}"'
+            for le, c in h.cumulative(bounds):
+                lines.append(f'{full}_bucket{{{lab},le="{"+Inf" if le == inf else repr(le)}"}} {c}')
+            lines.append(f"{full}_sum{{{lab}}} {repr(h.sum)}")
+            lines.append(f"{full}_count{{{lab}}} {h.count}")
+    return lines
+
+__all__ = ["LogLinearHistogram", "HistogramSet", "METRICS", "encode_histograms",
+           "decode_histograms", "prometheus_lines"]
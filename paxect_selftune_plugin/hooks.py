@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: Apache-2.0
+# -*- coding: utf-8 -*-
+"""
+PAXECT SelfTune — Decision Lifecycle Hooks
+------------------------------------------
+Subscribe callbacks to tuner events:
+
+ - pre_decision     → tune() entered (bucket, last_bytes, step)
+ - post_decision    → decision returned (start/end timestamps, decision)
+ - feedback         → exec_time/overhead folded into a bucket/profile EMA
+ - fail_safe_enter  → average overhead crossed max_overhead_ratio
+ - fail_safe_exit   → average overhead back below it
+ - state_saved      → state file written (path, format, duration)
+
+Callbacks are called as `fn(event, info)` with a fresh info dict, on the
+thread that triggered the event and never while the tuner lock is held.
+Exceptions raised by callbacks are swallowed.
+
+Idle cost: the tuner checks `hooks.active` (one attribute read) and builds
+no info dicts while nothing is subscribed. Subscriber lists are tuples
+replaced on (un)subscribe, so emit() iterates without locking.
+"""
+
+import threading
+from typing import Dict, Any, Callable, Tuple
+
+EVENTS = ("pre_decision", "post_decision", "feedback", "fail_safe_enter", "fail_safe_exit", "state_saved")
+
+Hook = Callable[[str, Dict[str, Any]], None]
+
+class Hooks:
+    __slots__ = ("active", "_subs", "_lock")
+
+    def __init__(self):
+        self.active = False
+        self._subs: Dict[str, Tuple[Hook, ...]] = {e: () for e in EVENTS}
+        self._lock = threading.Lock()
+
+    def subscribe(self, event: str, fn: Hook) -> Hook:
+        """Register `fn` for `event` ("*" = all events). Returns fn (usable as decorator helper)."""
+        events = EVENTS if event == "*" else (event,)
+        for e in events:
+            if e not in self._subs:
+                raise ValueError(f"unknown hook event: {e!r} (expected one of {', '.join(EVENTS)})")
+        with self._lock:
+            for e in events:
+                if fn not in self._subs[e]:
+                    self._subs[e] = self._subs[e] + (fn,)
+            self.active = True
+        return fn
+
+    def unsubscribe(self, fn: Hook, event: str = "*"):
+        with self._lock:
+            for e in (EVENTS if event == "*" else (event,)):
+                self._subs[e] = tuple(f for f in self._subs.get(e, ()) if f is not fn)
+            self.active = any(self._subs.values())
+
+    def on(self, event: str):
+        """Decorator form: @tuner.hooks.on("post_decision")"""
+        return lambda fn: self.subscribe(event, fn)
+
+    def emit(self, event: str, info: Dict[str, Any]):
+        for fn in self._subs[event]:
+            try:
+                fn(event, info)
+            except Exception:
+                pass
+
+    def subscribers(self, event: str) -> Tuple[Hook, ...]:
+        return self._subs[event]
+
+__all__ = ["Hooks", "EVENTS"]
@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: Apache-2.0
+# -*- coding: utf-8 -*-
+"""
+PAXECT SelfTune — Integrity Hash Selection
+------------------------------------------
+Picks the cheapest block checksum on this host that still meets the
+pipeline's integrity level, per size bucket:
+
+  python3 -m paxect_selftune_plugin integrity bench --level crypto --out integrity.json
+  python3 -m paxect_selftune_plugin integrity show integrity.json
+
+Levels (each algorithm meets its own level and every lower one):
+
+ - detect  → accidental corruption only: crc32
+ - crypto  → adversarial tampering: blake2s, blake2b, sha256
+ - fips    → FIPS-approved digest required: sha256
+
+Strategies are (algorithm, group): `group` consecutive blocks share one
+digest instead of one digest per block, which saves the per-call cost on
+small blocks at the price of coarser corruption localization (capped by
+`max_group`).
+
+ChunkHasher / hash_chunks() feed `memoryview` slices straight into the
+hash, so checksumming never copies payload bytes.
+"""
+
+import os, json, time, zlib, hashlib
+from typing import Dict, Any, Optional, List, Sequence, Tuple, Union
+
+LEVELS = ("detect", "crypto", "fips")
+ALGORITHMS = {"crc32": "detect", "blake2s": "crypto", "blake2b": "crypto", "sha256": "fips"}
+GROUPS = (1, 4, 16, 64)
+BUCKET_PAYLOAD = {"small": 64 << 10, "medium": 1 << 20, "large": 8 << 20}
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+def meets(algorithm: str, level: str) -> bool:
+    return LEVELS.index(ALGORITHMS[algorithm]) >= LEVELS.index(level)
+
+# ---------------- Hashing helper ----------------
+class ChunkHasher:
+    """update(chunk) per block; one digest per `group` blocks (digests, finish())."""
+
+    __slots__ = ("algorithm", "group", "digests", "_new", "_h", "_crc", "_n")
+
+    def __init__(self, algorithm: str = "sha256", group: int = 1):
+        if algorithm not in ALGORITHMS:
+            raise ValueError(f"unknown algorithm {algorithm!r}; expected one of {sorted(ALGORITHMS)}")
+        self.algorithm, self.group = algorithm, max(1, int(group))
+        self.digests: List[bytes] = []
+        self._new = getattr(hashlib, algorithm, None)
+        self._h = None
+        self._crc = 0
+        self._n = 0
+
+    def update(self, chunk: Buffer):
+        if self.algorithm == "crc32":
+            self._crc = zlib.crc32(chunk, self._crc)
+        else:
+            if self._h is None:
+                self._h = self._new()
+            self._h.update(chunk)
+        self._n += 1
+        if self._n >= self.group:
+            self._emit()
+
+    def _emit(self):
+        if self.algorithm == "crc32":
+            self.digests.append(self._crc.to_bytes(4, "big"))
+            self._crc = 0
+        else:
+            self.digests.append(self._h.digest())
+            self._h = None
+        self._n = 0
+
+    def finish(self) -> List[bytes]:
+        if self._n:
+            self._emit()
+        return self.digests
+
+def hash_chunks(data: Buffer, blocksize: int, algorithm: str = "sha256", group: int = 1) -> List[bytes]:
+    """Digests over `data` in blocks of `blocksize`, `group` blocks per digest, without copying."""
+    view = data if isinstance(data, memoryview) else memoryview(data)
+    if view.ndim != 1 or view.itemsize != 1:
+        view = view.cast("B")
+    h = ChunkHasher(algorithm, group)
+    for off in range(0, len(view), blocksize):
+        h.update(view[off:off + blocksize])
+    return h.finish()
+
+def hasher_for(profile: Dict[str, Any], n_bytes: int) -> ChunkHasher:
+    """ChunkHasher for the strategy a profile recommends at this payload size."""
+    from . import get_bucket
+    rec = profile["buckets"][get_bucket(n_bytes)]
+    return ChunkHasher(rec["algorithm"], rec["group"])
+
+# ---------------- Benchmark ----------------
+def _time(fn, reps: int) -> float:
+    best = float("inf")
+    for _ in range(max(1, reps)):
+        t0 = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+def benchmark(level: str = "crypto", max_group: int = 16, blocksizes: Optional[Dict[str, int]] = None,
+              algorithms: Sequence[str] = tuple(ALGORITHMS), reps: int = 5) -> Dict[str, Any]:
+    """Time every eligible (algorithm, group) per bucket; recommend the fastest."""
+    from . import get_default_blocksize
+    if level not in LEVELS:
+        raise ValueError(f"level must be one of {LEVELS}")
+    out: Dict[str, Any] = {"level": level, "max_group": max_group, "created": round(time.time(), 3), "buckets": {}}
+    for bucket, size in BUCKET_PAYLOAD.items():
+        bs = (blocksizes or {}).get(bucket) or get_default_blocksize(bucket)
+        view = memoryview(os.urandom(size))
+        cands: List[Tuple[float, str, int]] = []
+        for alg in algorithms:
+            if not meets(alg, level):
+                continue
+            for g in GROUPS:
+                if g > max_group:
+                    continue
+                secs = _time(lambda: hash_chunks(view, bs, alg, g), reps)
+                cands.append((secs, alg, g))
+        if not cands:
+            raise ValueError(f"no algorithm meets level {level!r}")
+        cands.sort()
+        secs, alg, g = cands[0]
+        out["buckets"][bucket] = {
+            "algorithm": alg, "group": g, "blocksize": bs, "mib_per_s": round(size / secs / (1 << 20), 1),
+            "candidates": [{"algorithm": a, "group": gg, "mib_per_s": round(size / s / (1 << 20), 1)}
+                           for s, a, gg in cands]}
+    return out
+
+def save_profile(path: str, profile: Dict[str, Any]):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(profile, f, indent=2)
+    os.replace(tmp, path)
+
+def load_profile(path: str, level: Optional[str] = None) -> Dict[str, Any]:
+    """Load a profile; refuses one whose choices do not meet `level`."""
+    with open(path, "r", encoding="utf-8") as f:
+        profile = json.load(f)
+    level = level or profile.get("level", "detect")
+    for bucket, rec in profile["buckets"].items():
+        if rec["algorithm"] not in ALGORITHMS or not meets(rec["algorithm"], level):
+            raise ValueError(f"{bucket}: {rec['algorithm']!r} does not meet integrity level {level!r}")
+    return profile
+
+# ---------------- CLI ----------------
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse, sys
+    parser = argparse.ArgumentParser(prog="paxect_selftune_plugin integrity")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_b = sub.add_parser("bench", help="time checksum strategies per bucket and recommend one")
+    p_b.add_argument("--level", choices=LEVELS, default="crypto")
+    p_b.add_argument("--max-group", type=int, default=16, help="max blocks per digest")
+    p_b.add_argument("--reps", type=int, default=5)
+    p_b.add_argument("--out", default=None)
+    p_s = sub.add_parser("show", help="print a saved profile")
+    p_s.add_argument("profile")
+    p_s.add_argument("--level", choices=LEVELS, default=None)
+    args = parser.parse_args(argv)
+
+    try:
+        if args.cmd == "bench":
+            profile = benchmark(args.level, args.max_group, reps=args.reps)
+            if args.out:
+                save_profile(args.out, profile)
+        else:
+            profile = load_profile(args.profile, args.level)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    for bucket, rec in profile["buckets"].items():
+        print(f"{bucket:<7} {rec['algorithm']:<8} group={rec['group']:<3} bs={rec['blocksize']:<6} "
+              f"{rec['mib_per_s']:>8.1f} MiB/s")
+    return 0
+
+__all__ = ["ChunkHasher", "hash_chunks", "hasher_for", "benchmark", "save_profile", "load_profile",
+           "meets", "LEVELS", "ALGORITHMS"]
+
+if __name__ == "__main__":
+    raise SystemExit(main())
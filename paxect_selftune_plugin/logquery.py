@@ -0,0 +1,338 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: Apache-2.0
+# -*- coding: utf-8 -*-
+"""
+PAXECT SelfTune — Indexed Decision-Log Queries
+----------------------------------------------
+Streams matching records out of a multi-GB `autotune_log.jsonl` without
+json-decoding every line.
+
+ - Sidecar index (`<log>.idx`, "PXLI") splits the append-only log into
+   segments of N records: byte range, time range, bucket/label bitmaps and
+   a fail-safe count per segment. Refreshed incrementally (tail only).
+ - Queries pick segments from the index, mmap-scan only those byte ranges,
+   reject lines with a byte-level prefilter and decode the rest.
+ - Results are generators; `aggregate()` folds them in constant memory.
+
+CLI:
+  python3 -m paxect_selftune_plugin logs index LOG
+  python3 -m paxect_selftune_plugin logs query LOG --since 2026-10-13 --until 2026-10-14 --bucket large --fail-safe
+  python3 -m paxect_selftune_plugin logs agg   LOG --by bucket,label --field exec_time
+"""
+
+import os, sys, json, mmap, struct, zlib
+from datetime import datetime, timezone
+from typing import Dict, Any, Optional, List, Iterator, Iterable, Tuple
+
+INDEX_MAGIC = b"PXLI"
+INDEX_VERSION = 1
+SEGMENT_RECORDS = 4096
+MAX_NAMES = 32  # per bitmap (u32)
+
+_IDX_HEADER = struct.Struct("<4sHHIQI")  # magic, version, names, segment records, indexed bytes, head crc
+_SEGMENT = struct.Struct("<QQddIIII")    # start, end, t_min, t_max, count, bucket bits, label bits, fail-safe count
+_HEAD_BYTES = 256
+_BLOCKSIZE_BUCKET = {8192: "small", 16384: "medium", 32768: "large"}
+
+# ---------------- Record helpers ----------------
+def _parse_utc(s: str) -> float:
+    return datetime.strptime(s, "%Y-%m-%d %H:%M:%S UTC").replace(tzinfo=timezone.utc).timestamp()
+
+def record_time(rec: Dict[str, Any]) -> float:
+    ts = rec.get("ts")
+    if ts is not None:
+        return float(ts)
+    try:
+        return _parse_utc(rec["datetime_utc"])
+    except (KeyError, ValueError):
+        return 0.0
+
+def record_bucket(rec: Dict[str, Any]) -> str:
+    if "bucket" in rec:
+        return rec["bucket"]
+    return _BLOCKSIZE_BUCKET.get((rec.get("decision") or {}).get("blocksize"), "unknown")
+
+def record_label(rec: Dict[str, Any]) -> str:
+    return (rec.get("decision") or {}).get("label", "unknown")
+
+def parse_time(value: Optional[str]) -> Optional[float]:
+    """Epoch seconds or ISO-8601 ('2026-10-13', '2026-10-13T08:00'); naive = UTC."""
+    if value is None or value == "":
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        pass
+    dt = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return dt.timestamp()
+
+# ---------------- Index ----------------
+class Segment:
+    __slots__ = ("start", "end", "t_min", "t_max", "count", "bucket_bits", "label_bits", "fail_safe")
+
+    def __init__(self, start, end=0, t_min=float("inf"), t_max=float("-inf"), count=0,
+                 bucket_bits=0, label_bits=0, fail_safe=0):
+        self.start, self.end, self.t_min, self.t_max = start, end, t_min, t_max
+        self.count, self.bucket_bits, self.label_bits, self.fail_safe = count, bucket_bits, label_bits, fail_safe
+
+class LogIndex:
+    def __init__(self, log_path: str, index_path: Optional[str] = None,
+                 segment_records: int = SEGMENT_RECORDS):
+        self.log_path = log_path
+        self.index_path = index_path or log_path + ".idx"
+        self.segment_records = segment_records
+        self.names: List[str] = []
+        self.segments: List[Segment] = []
+        self.indexed_bytes = 0
+        self._head_crc = 0
+        self._load()
+
+    def _bit(self, name: str) -> int:
+        try:
+            return 1 << self.names.index(name)
+        except ValueError:
+            if len(self.names) >= MAX_NAMES:
+                return 0  # overflow: segment is never excluded by this bitmap
+            self.names.append(name)
+            return 1 << (len(self.names) - 1)
+
+    def mask(self, name: str) -> Optional[int]:
+        return (1 << self.names.index(name)) if name in self.names else None
+
+    def _head(self) -> int:
+        """CRC of the already-indexed head of the log; changes when the file is replaced."""
+        try:
+            with open(self.log_path, "rb") as f:
+                return zlib.crc32(f.read(min(_HEAD_BYTES, self.indexed_bytes)))
+        except OSError:
+            return 0
+
+    def _load(self):
+        try:
+            with open(self.index_path, "rb") as f:
+                raw = f.read()
+            magic, version, n_names, seg_records, indexed, head = _IDX_HEADER.unpack_from(raw, 0)
+            if magic != INDEX_MAGIC or version != INDEX_VERSION or seg_records != self.segment_records:
+                return
+            pos, names = _IDX_HEADER.size, []
+            for _ in range(n_names):
+                (n,) = struct.unpack_from("<H", raw, pos)
+                names.append(raw[pos + 2:pos + 2 + n].decode("utf-8"))
+                pos += 2 + n
+            segments = [Segment(*vals) for vals in _SEGMENT.iter_unpack(raw[pos:])]
+        except (OSError, struct.error, UnicodeDecodeError):
+            return
+        self.names, self.segments, self.indexed_bytes, self._head_crc = names, segments, indexed, head
+
+    def save(self):
+        blob = bytearray(_IDX_HEADER.pack(INDEX_MAGIC, INDEX_VERSION, len(self.names),
+                                          self.segment_records, self.indexed_bytes, self._head_crc))
+        for n in self.names:
+            b = n.encode("utf-8")
+            blob += struct.pack("<H", len(b)) + b
+        for s in self.segments:
+            blob += _SEGMENT.pack(s.start, s.end, s.t_min, s.t_max, s.count,
+                                  s.bucket_bits, s.label_bits, s.fail_safe)
+        tmp = self.index_path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(blob)
+        os.replace(tmp, self.index_path)
+
+    def refresh(self) -> int:
+        """Index whatever was appended since the last refresh; rebuild after truncation/rotation."""
+        try:
+            size = os.path.getsize(self.log_path)
+        except OSError:
+            size = 0
+        if size < self.indexed_bytes or (self.indexed_bytes and self._head() != self._head_crc):
+            self.names, self.segments, self.indexed_bytes = [], [], 0
+        if size == self.indexed_bytes:
+            return 0
+        before = len(self.segments)
+        # Re-open a trailing partial segment so segments stay N records long
+        if self.segments and self.segments[-1].count < self.segment_records:
+            seg = self.segments.pop()
+        else:
+            seg = Segment(self.indexed_bytes)
+        with open(self.log_path, "rb") as f:
+            f.seek(self.indexed_bytes)
+            pos = self.indexed_bytes
+            for line in f:
+                if not line.endswith(b"\n"):
+                    break  # partial write in progress; picked up next refresh
+                end = pos + len(line)
+                try:
+                    rec = json.loads(line)
+                except ValueError:
+                    pos = end
+                    continue
+                t = record_time(rec)
+                seg.t_min, seg.t_max = min(seg.t_min, t), max(seg.t_max, t)
+                seg.bucket_bits |= self._bit(record_bucket(rec))
+                seg.label_bits |= self._bit(record_label(rec))
+                seg.fail_safe += 1 if rec.get("fail_safe") else 0
+                seg.count += 1
+                seg.end = pos = end
+                if seg.count >= self.segment_records:
+                    self.segments.append(seg)
+                    seg = Segment(pos)
+        if seg.count:
+            self.segments.append(seg)
+        self.indexed_bytes = self.segments[-1].end if self.segments else pos
+        self._head_crc = self._head()
+        self.save()
+        return len(self.segments) - before
+
+    def select(self, since: Optional[float] = None, until: Optional[float] = None,
+               bucket: Optional[str] = None, label: Optional[str] = None,
+               fail_safe: Optional[bool] = None) -> Iterator[Segment]:
+        b_mask = self.mask(bucket) if bucket else 0
+        l_mask = self.mask(label) if label else 0
+        overflow = len(self.names) >= MAX_NAMES
+        if (bucket and b_mask is None or label and l_mask is None) and not overflow:
+            return
+        for s in self.segments:
+            if since is not None and s.t_max < since:
+                continue
+            if until is not None and s.t_min >= until:
+                continue
+            if b_mask and not s.bucket_bits & b_mask:
+                continue
+            if l_mask and not s.label_bits & l_mask:
+                continue
+            if fail_safe is True and not s.fail_safe:
+                continue
+            if fail_safe is False and s.fail_safe == s.count:
+                continue
+            yield s
+
+# ---------------- Query ----------------
+def _prefilter(label: Optional[str], fail_safe: Optional[bool]) -> List[bytes]:
+    needles = []
+    if label:
+        needles.append(b'"label": ' + json.dumps(label).encode())
+    if fail_safe is True:
+        needles.append(b'"fail_safe": true')
+    return needles
+
+def query(log_path: str, since: Optional[float] = None, until: Optional[float] = None,
+          bucket: Optional[str] = None, label: Optional[str] = None,
+          fail_safe: Optional[bool] = None, index: Optional[LogIndex] = None,
+          refresh: bool = True) -> Iterator[Dict[str, Any]]:
+    """Yield decoded records matching every given filter, oldest first."""
+    index = index or LogIndex(log_path)
+    if refresh:
+        index.refresh()
+    segments = list(index.select(since, until, bucket, label, fail_safe))
+    if not segments:
+        return
+    needles = _prefilter(label, fail_safe)
+    with open(log_path, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for seg in segments:
+                pos = seg.start
+                while pos < seg.end:
+                    nl = mm.find(b"\n", pos, seg.end)
+                    nl = seg.end - 1 if nl < 0 else nl
+                    line = mm[pos:nl]
+                    pos = nl + 1
+                    if needles and not all(n in line for n in needles):
+                        continue
+                    try:
+                        rec = json.loads(line)
+                    except ValueError:
+                        continue
+                    t = record_time(rec)
+                    if since is not None and t < since or until is not None and t >= until:
+                        continue
+                    if bucket and record_bucket(rec) != bucket:
+                        continue
+                    if label and record_label(rec) != label:
+                        continue
+                    if fail_safe is not None and bool(rec.get("fail_safe")) != fail_safe:
+                        continue
+                    yield rec
+
+def _field(rec: Dict[str, Any], key: str):
+    if key == "bucket":
+        return record_bucket(rec)
+    if key == "label":
+        return record_label(rec)
+    if key in ("hour", "day"):
+        fmt = "%Y-%m-%d %H:00" if key == "hour" else "%Y-%m-%d"
+        return datetime.fromtimestamp(record_time(rec), timezone.utc).strftime(fmt)
+    value = rec.get(key)
+    if value is None:
+        value = (rec.get("decision") or {}).get(key)
+    return value
+
+def aggregate(records: Iterable[Dict[str, Any]], by: Tuple[str, ...] = ("bucket", "label"),
+              field: str = "exec_time") -> Dict[str, Dict[str, Any]]:
+    """count / mean / min / max of `field` and fail-safe count, grouped by `by` keys."""
+    groups: Dict[Tuple, List[float]] = {}
+    for rec in records:
+        key = tuple(str(_field(rec, k)) for k in by)
+        g = groups.get(key)
+        if g is None:
+            g = groups[key] = [0, 0.0, float("inf"), float("-inf"), 0, 0]
+        g[0] += 1
+        g[5] += 1 if rec.get("fail_safe") else 0
+        v = _field(rec, field)
+        if isinstance(v, (int, float)) and not isinstance(v, bool):
+            g[1] += v
+            g[2], g[3] = min(g[2], v), max(g[3], v)
+            g[4] += 1
+    out = {}
+    for key, (n, total, lo, hi, n_val, fs) in sorted(groups.items()):
+        out["/".join(key)] = {"count": n, "fail_safe": fs,
+                              "mean": total / n_val if n_val else None,
+                              "min": lo if n_val else None, "max": hi if n_val else None}
+    return out
+
+# ---------------- CLI ----------------
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+    parser = argparse.ArgumentParser(prog="paxect_selftune_plugin logs")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_idx = sub.add_parser("index", help="build or refresh the sidecar index")
+    p_idx.add_argument("log")
+    for name in ("query", "agg"):
+        p = sub.add_parser(name)
+        p.add_argument("log")
+        p.add_argument("--since"); p.add_argument("--until")
+        p.add_argument("--bucket"); p.add_argument("--label")
+        p.add_argument("--fail-safe", dest="fail_safe", action="store_const", const=True)
+        p.add_argument("--no-fail-safe", dest="fail_safe", action="store_const", const=False)
+        if name == "query":
+            p.add_argument("--limit", type=int, default=0)
+        else:
+            p.add_argument("--by", default="bucket,label")
+            p.add_argument("--field", default="exec_time")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.cmd == "index":
+            index = LogIndex(args.log)
+            added = index.refresh()
+            print(json.dumps({"segments": len(index.segments), "added": added,
+                              "indexed_bytes": index.indexed_bytes, "names": index.names}))
+            return 0
+        records = query(args.log, parse_time(args.since), parse_time(args.until),
+                        args.bucket, args.label, args.fail_safe)
+        if args.cmd == "query":
+            for i, rec in enumerate(records, 1):
+                sys.stdout.write(json.dumps(rec) + "\n")
+                if args.limit and i >= args.limit:
+                    break
+        else:
+            by = tuple(k.strip() for k in args.by.split(",") if k.strip())
+            print(json.dumps(aggregate(records, by, args.field), indent=2))
+    except (OSError, ValueError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: Apache-2.0
+# -*- coding: utf-8 -*-
+"""
+PAXECT SelfTune — Measured Overhead
+-----------------------------------
+Derives `exec_time` / `overhead` from the OS instead of caller guesses:
+
+ - wall     → time.perf_counter()
+ - cpu      → time.process_time() (or thread_time() with scope="thread")
+ - user/sys → resource.getrusage() user and system seconds
+ - ctx      → voluntary / involuntary context switches
+ - blk      → block input / output operations
+
+For one span of tuned work: exec_time = wall seconds, like a caller
+timing it by hand. Waiting (I/O, locks, child processes) is part of the
+work's cost, not overhead, so arms that wait are not favoured and I/O-bound
+work does not trip the fail-safe. A span therefore has no overhead of its
+own: the tuner supplies it as its own instrumented time (decision, save,
+log) around the span, so the fail-safe sees only the tuner's cost. cpu and
+wait (wall − CPU) are reported alongside for the log.
+
+Without `resource` (Windows) user = cpu and the counters stay 0.
+
+Optional peak memory per span (`memory=`):
+
+ - "rss"         → peak resident set growth: VmHWM is reset through
+                   /proc/self/clear_refs at span start and read at the end;
+                   where that is not permitted, the /proc/self/statm delta
+ - "tracemalloc" → peak traced Python allocations (starts tracemalloc on
+                   first use; exact but slows allocation-heavy code)
+"""
+
+import os, time
+from typing import Dict, Any, NamedTuple, Optional, Tuple
+
+try:
+    import resource
+    _RUSAGE = {"process": resource.RUSAGE_SELF,
+               "thread": getattr(resource, "RUSAGE_THREAD", resource.RUSAGE_SELF)}
+except ImportError:  # Windows
+    resource = None
+    _RUSAGE = {}
+
+SCOPES = ("process", "thread")
+MEMORY_SOURCES = ("off", "rss", "tracemalloc")
+_PAGE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+
+class Usage(NamedTuple):
+    wall: float
+    cpu: float
+    user: float
+    sys: float
+    vol_ctx: int
+    invol_ctx: int
+    blk_in: int
+    blk_out: int
+
+def take(scope: str = "process") -> Usage:
+    cpu = time.thread_time() if scope == "thread" else time.process_time()
+    if resource is None:
+        return Usage(time.perf_counter(), cpu, cpu, 0.0, 0, 0, 0, 0)
+    ru = resource.getrusage(_RUSAGE[scope])
+    return Usage(time.perf_counter(), cpu, ru.ru_utime, ru.ru_stime,
+                 ru.ru_nvcsw, ru.ru_nivcsw, ru.ru_inblock, ru.ru_oublock)
+
+def delta(start: Usage, end: Usage) -> Dict[str, Any]:
+    """Usage components between two samples, plus exec_time (= wall)."""
+    wall = max(0.0, end.wall - start.wall)
+    cpu = max(0.0, end.cpu - start.cpu)
+    # CPU can exceed wall when several threads work in parallel: no waiting then
+    busy = min(cpu, wall)
+    return {"wall": wall, "cpu": cpu, "user": end.user - start.user, "sys": end.sys - start.sys,
+            "wait": wall - busy, "vol_ctx": end.vol_ctx - start.vol_ctx,
+            "invol_ctx": end.invol_ctx - start.invol_ctx,
+            "blk_in": end.blk_in - start.blk_in, "blk_out": end.blk_out - start.blk_out,
+            "exec_time": wall}
+
+# ---------------- Memory ----------------
+def rss_bytes() -> int:
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * _PAGE
+    except (OSError, ValueError, IndexError):
+        return 0
+
+def _hwm_bytes() -> Optional[int]:
+    try:
+        with open("/proc/self/status", "rb") as f:
+            for line in f:
+                if line.startswith(b"VmHWM:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError):
+        pass
+    return None
+
+def _reset_hwm() -> bool:
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")  # 5 = reset peak RSS (Linux ≥ 4.0)
+        return True
+    except OSError:
+        return False
+
+def mem_mark(memory: str) -> Optional[Tuple[int, bool]]:
+    """Start a memory span: (baseline bytes, peak counter reset?) or None when off."""
+    if memory == "tracemalloc":
+        import tracemalloc
+        if not tracemalloc.is_tracing():
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        return tracemalloc.get_traced_memory()[0], True
+    if memory == "rss":
+        return rss_bytes(), _reset_hwm()
+    return None
+
+def mem_peak(memory: str, mark: Optional[Tuple[int, bool]]) -> Optional[int]:
+    """Peak growth in bytes since mem_mark()."""
+    if mark is None:
+        return None
+    base, reset = mark
+    if memory == "tracemalloc":
+        import tracemalloc
+        return max(0, tracemalloc.get_traced_memory()[1] - base)
+    hwm = _hwm_bytes() if reset else None
+    return max(0, (hwm if hwm is not None else rss_bytes()) - base)
+
+class Measurement:
+    """Context manager measuring one span of tuned work.
+
+        with tuner.measure():
+            run_job(decision)
+        tuner.tune(last_bytes=n)   # exec_time = m.exec_time, overhead = the tuner's own time
+    """
+
+    __slots__ = ("scope", "memory", "start", "usage", "_mem", "_sink")
+
+    def __init__(self, scope: str = "process", sink=None, memory: str = "off"):
+        if scope not in SCOPES:
+            raise ValueError(f"scope must be one of {SCOPES}")
+        if memory not in MEMORY_SOURCES:
+            raise ValueError(f"memory must be one of {MEMORY_SOURCES}")
+        self.scope, self.memory = scope, memory
+        self.start: Optional[Usage] = None
+        self.usage: Optional[Dict[str, Any]] = None
+        self._mem = None
+        self._sink = sink
+
+    def __enter__(self) -> "Measurement":
+        self._mem = mem_mark(self.memory)
+        self.start = take(self.scope)
+        return self
+
+    def __exit__(self, *exc):
+        self.usage = delta(self.start, take(self.scope))
+        if self._mem is not None:
+            self.usage["mem_peak"] = mem_peak(self.memory, self._mem)
+        if self._sink is not None:
+            self._sink(self.usage)
+        return False
+
+    @property
+    def exec_time(self) -> Optional[float]:
+        return self.usage["exec_time"] if self.usage else None
+
+    @property
+    def mem_peak(self) -> Optional[int]:
+        return self.usage.get("mem_peak") if self.usage else None
+
+__all__ = ["Measurement", "Usage", "take", "delta", "mem_mark", "mem_peak", "rss_bytes",
+           "SCOPES", "MEMORY_SOURCES"]
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: Apache-2.0
+# -*- coding: utf-8 -*-
+"""
+PAXECT SelfTune — System Pressure
+---------------------------------
+Throttle input from measured stall time instead of wall-clock timers.
+
+ - Linux ≥ 4.20: /proc/pressure/{cpu,io,memory} (PSI). Stall percent per
+   resource is derived from the `total` stall microseconds between two
+   samples (avg10 on the first sample). CPU uses the "some" line, I/O and
+   memory the "full" line (every runnable task stalled).
+ - Elsewhere: /proc/loadavg — runnable tasks beyond the CPU count, as a
+   share of all runnable tasks (the loadavg analogue of CPU "some").
+ - No source at all: stall 0, throttle stays at 100%.
+
+Sampling is rate-limited to one read per `interval` seconds; in between,
+throttle_percent() is a monotonic clock read and a cached value.
+"""
+
+import os, time
+from typing import Dict, Any, Optional, Tuple
+
+PSI_RESOURCES = {"cpu": "some", "io": "full", "memory": "full"}
+# (stall % at or above, throttle percent) — most severe matching level wins
+DEFAULT_LEVELS: Tuple[Tuple[float, int], ...] = ((10.0, 75), (25.0, 50), (50.0, 25))
+
+def read_psi(path: str) -> Optional[Dict[str, Dict[str, float]]]:
+    """{'some': {'avg10':..,'avg60':..,'avg300':..,'total':..}, 'full': {...}} or None."""
+    try:
+        with open(path, "r") as f:
+            text = f.read()
+    except OSError:
+        return None
+    out = {}
+    for line in text.splitlines():
+        kind, *fields = line.split()
+        out[kind] = {k: float(v) for k, v in (x.split("=", 1) for x in fields)}
+    return out
+
+def read_loadavg(path: str = "/proc/loadavg") -> Optional[float]:
+    try:
+        with open(path, "r") as f:
+            return float(f.read().split()[0])
+    except (OSError, ValueError, IndexError):
+        return None
+
+class PressureMonitor:
+    def __init__(self, interval: float = 5.0, levels=DEFAULT_LEVELS, proc_root: str = "/proc",
+                 cpu_count: Optional[int] = None):
+        self.interval = interval
+        self.levels = tuple(sorted(levels))
+        self.proc_root = proc_root
+        self.cpu_count = cpu_count or os.cpu_count() or 1
+        self.source: Optional[str] = None       # "psi" | "loadavg" | None
+        self.stall: Dict[str, float] = {}        # resource → stall percent
+        self.percent = 100
+        self.sampled_at: Optional[float] = None
+        self._totals: Dict[str, Tuple[float, float]] = {}
+        self._next = 0.0
+
+    def sample(self, force: bool = False) -> Dict[str, float]:
+        now = time.monotonic()
+        if not force and now < self._next:
+            return self.stall
+        self._next = now + self.interval
+        stall = self._sample_psi(now)
+        if stall is None:
+            load = read_loadavg(os.path.join(self.proc_root, "loadavg"))
+            if load is not None:
+                self.source = "loadavg"
+                stall = {"cpu": 100.0 * max(0.0, load - self.cpu_count) / load if load > 0 else 0.0}
+            else:
+                self.source, stall = None, {}
+        self.stall = {k: round(v, 3) for k, v in stall.items()}
+        self.percent = self._percent(max(self.stall.values(), default=0.0))
+        self.sampled_at = time.time()
+        return self.stall
+
+    def _sample_psi(self, now: float) -> Optional[Dict[str, float]]:
+        stall = {}
+        for res, line in PSI_RESOURCES.items():
+            psi = read_psi(os.path.join(self.proc_root, "pressure", res))
+            if psi is None or line not in psi:
+                continue
+            total = psi[line]["total"]
+            prev = self._totals.get(res)
+            self._totals[res] = (now, total)
+            if prev is not None and now > prev[0]:
+                # total is cumulative stall in µs; delta over elapsed wall µs
+                stall[res] = min(100.0, max(0.0, (total - prev[1]) / ((now - prev[0]) * 1e6) * 100.0))
+            else:
+                stall[res] = psi[line]["avg10"]
+        if not stall:
+            return None
+        self.source = "psi"
+        return stall
+
+    def _percent(self, stall: float) -> int:
+        percent = 100
+        for threshold, level in self.levels:
+            if stall >= threshold:
+                percent = min(percent, level)
+        return percent
+
+    def throttle_percent(self) -> int:
+        self.sample()
+        return self.percent
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"source": self.source, "stall": dict(self.stall), "throttle_percent": self.percent,
+                "sampled_at": self.sampled_at, "interval": self.interval}
+
+__all__ = ["PressureMonitor", "read_psi", "read_loadavg", "DEFAULT_LEVELS", "PSI_RESOURCES"]
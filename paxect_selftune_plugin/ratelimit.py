@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: Apache-2.0
+# -*- coding: utf-8 -*-
+"""
+PAXECT SelfTune — Sliding-Window Rate Limiter
+---------------------------------------------
+Packaged successor of demo_03's `ThrottleWindow` (one timestamp per hit in
+a deque, full list persisted as JSON) for thousands of keys at high rates:
+
+ - approximate sliding windows from `buckets` sub-window counters per
+   window: a hit expires with its sub-window, so the window is exact to
+   within window/buckets seconds
+ - several windows checked at once (e.g. 10/s and 500/min); a hit is
+   counted only when every window allows it
+ - fixed memory per key: one flat list of ints, whatever the rate; at
+   most `max_keys` keys. A new key past the cap first prunes idle keys
+   (at most once per shortest window), then evicts the oldest key in O(1)
+ - limits scale with the tuner's throttle percent when bound to a tuner
+   (`Autotune.rate_limiter()`), so a fail-safe trip also slows admission
+ - compact binary persistence (`save()` / `load()`): slots and counters as
+   little-endian packed arrays, keys as UTF-8, so files move between hosts
+
+allow() touches one dict entry and a handful of list slots; sub-windows
+are only cleared when a key's slot index moves on.
+"""
+
+import os, sys, time, struct
+from array import array
+from collections import OrderedDict
+from typing import Dict, Any, Optional, List, Sequence, Tuple
+
+FORMAT_MAGIC = b"PXRL1\n"
+DEFAULT_BUCKETS = 10
+
+def _le(a: array) -> bytes:
+    if sys.byteorder == "big":
+        a = array(a.typecode, a)
+        a.byteswap()
+    return a.tobytes()
+
+def _from_le(typecode: str, blob: bytes) -> array:
+    a = array(typecode)
+    a.frombytes(blob)
+    if sys.byteorder == "big":
+        a.byteswap()
+    return a
+
+def _need(data: bytes, pos: int, n: int):
+    if pos + n > len(data):
+        raise ValueError("truncated rate limiter state")
+
+class RateLimiter:
+    """allow(key) → bool over one or more (window seconds, limit) pairs."""
+
+    def __init__(self, windows: Sequence[Tuple[float, int]] = ((1.0, 100),), buckets: int = DEFAULT_BUCKETS,
+                 max_keys: int = 100_000, clock=time.time):
+        if not windows:
+            raise ValueError("at least one (window_s, limit) pair is required")
+        if buckets < 1:
+            raise ValueError("buckets must be ≥ 1")
+        self.windows = tuple((float(w), int(l)) for w, l in windows)
+        self.buckets = int(buckets)
+        self.max_keys = max_keys
+        self.clock = clock
+        self.scale = 1.0
+        self.denied = 0
+        self.evicted = 0
+        self.path: Optional[str] = None  # saved with the tuner state when bound via Autotune.rate_limiter()
+        self._keys: "OrderedDict[str, List[int]]" = OrderedDict()  # insertion order: oldest first
+        self._next_prune = -float("inf")
+        self._prune_every = min(w for w, _ in self.windows)
+        # per window: [slot, total, c_0 … c_{buckets-1}] at a fixed offset in the key's list
+        self._stride = 2 + self.buckets
+        self._blank = [0] * (self._stride * len(self.windows))
+        self._specs: Tuple[Tuple[int, float, int], ...] = ()
+        self._inv0, self._limit0 = 0.0, 0
+        self.set_scale(1.0)
+        if len(self.windows) == 1:
+            self.allow = self._allow_one  # the common case without the per-window loops
+
+    def set_scale(self, scale: float):
+        """Multiply every limit by `scale` (e.g. throttle percent / 100); at least 1 hit stays allowed."""
+        self.scale = scale
+        self._specs = tuple((i * self._stride, self.buckets / w, max(1, int(l * scale)))
+                            for i, (w, l) in enumerate(self.windows))
+        _, self._inv0, self._limit0 = self._specs[0]
+
+    def allow(self, key: str, cost: int = 1, now: Optional[float] = None) -> bool:
+        if now is None:
+            now = self.clock()
+        st = self._keys.get(key)
+        if st is None:
+            if len(self._keys) >= self.max_keys:
+                self._make_room(now)
+            st = self._keys[key] = self._blank[:]
+        n = self.buckets
+        for off, inv, limit in self._specs:
+            slot = int(now * inv)
+            if slot != st[off]:
+                self._advance(st, off, slot)
+            if st[off + 1] + cost > limit:
+                self.denied += 1
+                return False
+        for off, inv, limit in self._specs:
+            st[off + 2 + st[off] % n] += cost
+            st[off + 1] += cost
+        return True
+
+    def _allow_one(self, key: str, cost: int = 1, now: Optional[float] = None) -> bool:
+        if now is None:
+            now = self.clock()
+        st = self._keys.get(key)
+        if st is None:
+            if len(self._keys) >= self.max_keys:
+                self._make_room(now)
+            st = self._keys[key] = self._blank[:]
+        slot = int(now * self._inv0)
+        if slot != st[0]:
+            self._advance(st, 0, slot)
+        if st[1] + cost > self._limit0:
+            self.denied += 1
+            return False
+        st[2 + slot % self.buckets] += cost
+        st[1] += cost
+        return True
+
+    def _make_room(self, now: float):
+        if now >= self._next_prune:
+            self._next_prune = now + self._prune_every
+            self.prune(now)
+        while len(self._keys) >= self.max_keys:
+            self._keys.popitem(last=False)
+            self.evicted += 1
+
+    def _advance(self, st: List[int], off: int, slot: int):
+        n, last = self.buckets, st[off]
+        if slot - last >= n or slot < last:
+            st[off + 1:off + 2 + n] = self._blank[:n + 1]
+        else:
+            total = st[off + 1]
+            for s in range(last + 1, slot + 1):
+                i = off + 2 + s % n
+                total -= st[i]
+                st[i] = 0
+            st[off + 1] = total
+        st[off] = slot
+
+    def count(self, key: str, now: Optional[float] = None) -> List[int]:
+        """Hits currently counted per window for `key`."""
+        st = self._keys.get(key)
+        if st is None:
+            return [0] * len(self.windows)
+        now = self.clock() if now is None else now
+        out = []
+        for off, inv, _ in self._specs:
+            slot = int(now * inv)
+            if slot != st[off]:
+                self._advance(st, off, slot)
+            out.append(st[off + 1])
+        return out
+
+    def prune(self, now: Optional[float] = None) -> int:
+        """Drop keys whose every window has fully expired; returns how many."""
+        now = self.clock() if now is None else now
+        n = self.buckets
+        idle = [k for k, st in self._keys.items()
+                if all(int(now * inv) - st[off] >= n for off, inv, _ in self._specs)]
+        for k in idle:
+            del self._keys[k]
+        return len(idle)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"windows": [list(w) for w in self.windows], "buckets": self.buckets, "scale": self.scale,
+                "effective_limits": [l for _, _, l in self._specs], "keys": len(self._keys), "denied": self.denied,
+                "evicted": self.evicted}
+
+    # ---------------- Persistence ----------------
+    def to_bytes(self) -> bytes:
+        """magic | header | per key: u16 key length, key, packed int64 state."""
+        head = struct.pack("<IIH", len(self._keys), self.buckets, len(self.windows))
+        head += _le(array("d", [v for w in self.windows for v in w]))
+        parts = [FORMAT_MAGIC, head]
+        for key, st in self._keys.items():
+            k = key.encode("utf-8")
+            parts.append(struct.pack("<H", len(k)))
+            parts.append(k)
+            parts.append(_le(array("q", st)))
+        return b"".join(parts)
+
+    @classmethod
+    def from_bytes(cls, data: bytes, **kwargs) -> "RateLimiter":
+        """Restore from to_bytes() output; truncated or malformed data raises ValueError."""
+        if not data.startswith(FORMAT_MAGIC):
+            raise ValueError("not a rate limiter state")
+        head = struct.Struct("<IIH")
+        pos = len(FORMAT_MAGIC)
+        _need(data, pos, head.size)
+        n_keys, buckets, n_win = head.unpack_from(data, pos)
+        pos += head.size
+        _need(data, pos, 16 * n_win)
+        flat = _from_le("d", data[pos:pos + 16 * n_win])
+        pos += 16 * n_win
+        out = cls([(flat[2 * i], int(flat[2 * i + 1])) for i in range(n_win)], buckets, **kwargs)
+        width = 8 * len(out._blank)
+        for _ in range(n_keys):
+            _need(data, pos, 2)
+            (klen,) = struct.unpack_from("<H", data, pos)
+            _need(data, pos + 2, klen + width)
+            key = data[pos + 2:pos + 2 + klen].decode("utf-8")
+            pos += 2 + klen
+            out._keys[key] = _from_le("q", data[pos:pos + width]).tolist()
+            pos += width
+        return out
+
+    def save(self, path: str):
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(self.to_bytes())
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str, **kwargs) -> "RateLimiter":
+        with open(path, "rb") as f:
+            return cls.from_bytes(f.read(), **kwargs)
+
+__all__ = ["RateLimiter", "DEFAULT_BUCKETS"]
@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: Apache-2.0
+# -*- coding: utf-8 -*-
+"""
+PAXECT SelfTune — Time-Bucketed Rollups
+---------------------------------------
+Streaming per-minute / per-hour / per-day aggregates of tuning activity,
+kept per bucket and label, so multi-day trends survive after raw history
+has rotated out and without touching the JSONL log.
+
+Per window:
+ - count, mean exec_time, p50/p95/p99 exec_time (log-binned, ~2.5% error)
+ - mean overhead ratio
+ - fail-safe seconds and throttle_percent time shares (time-weighted)
+
+Memory is bounded: each (resolution, bucket, label) keeps at most
+`retention[resolution]` windows; older windows are evicted.
+"""
+
+import struct
+from collections import deque
+from math import floor, log
+from typing import Dict, Any, Optional, List, Tuple
+
+RESOLUTIONS = {"minute": 60, "hour": 3600, "day": 86400}
+RETENTION = {"minute": 120, "hour": 72, "day": 90}
+MAX_GAP_S = 60.0          # cap on the time one decision can account for
+_BIN_BASE = 1.05
+_LOG_BASE = log(_BIN_BASE)
+_ZERO_BIN = -32768
+
+def _bin(value: float) -> int:
+    if value <= 0:
+        return _ZERO_BIN
+    return max(-32767, min(32767, floor(log(value) / _LOG_BASE)))
+
+def _bin_value(b: int) -> float:
+    return 0.0 if b == _ZERO_BIN else _BIN_BASE ** (b + 0.5)
+
+# ---------------- Window ----------------
+class Window:
+    __slots__ = ("start", "count", "n_exec", "sum_exec", "sum_ratio", "fs_seconds", "throttle", "bins")
+
+    def __init__(self, start: int):
+        self.start = start
+        self.count = 0
+        self.n_exec = 0
+        self.sum_exec = 0.0
+        self.sum_ratio = 0.0
+        self.fs_seconds = 0.0
+        self.throttle: Dict[int, float] = {}
+        self.bins: Dict[int, int] = {}
+
+    def add(self, exec_time: Optional[float], ratio: float, fail_safe: bool, throttle: int, dt: float):
+        self.count += 1
+        self.sum_ratio += ratio
+        if exec_time is not None:
+            self.n_exec += 1
+            self.sum_exec += exec_time
+            b = _bin(exec_time)
+            self.bins[b] = self.bins.get(b, 0) + 1
+        if dt > 0:
+            if fail_safe:
+                self.fs_seconds += dt
+            self.throttle[throttle] = self.throttle.get(throttle, 0.0) + dt
+
+    def quantile(self, q: float) -> Optional[float]:
+        if not self.n_exec:
+            return None
+        rank, seen = q * (self.n_exec - 1), 0
+        for b in sorted(self.bins):
+            seen += self.bins[b]
+            if seen > rank:
+                return _bin_value(b)
+        return _bin_value(max(self.bins))
+
+    def summary(self) -> Dict[str, Any]:
+        tracked = sum(self.throttle.values())
+        return {
+            "start": self.start,
+            "count": self.count,
+            "mean_exec_time": self.sum_exec / self.n_exec if self.n_exec else None,
+            "p50_exec_time": self.quantile(0.50),
+            "p95_exec_time": self.quantile(0.95),
+            "p99_exec_time": self.quantile(0.99),
+            "overhead_ratio": self.sum_ratio / self.count if self.count else None,
+            "fail_safe_seconds": round(self.fs_seconds, 6),
+            "throttle_share": {str(p): round(s / tracked, 6) for p, s in sorted(self.throttle.items())} if tracked else {},
+        }
+
+# ---------------- Engine ----------------
+class RollupEngine:
+    def __init__(self, resolutions: Optional[Dict[str, int]] = None,
+                 retention: Optional[Dict[str, int]] = None, max_gap: float = MAX_GAP_S):
+        self.resolutions = dict(resolutions or RESOLUTIONS)
+        self.retention = {r: int((retention or RETENTION).get(r, 60)) for r in self.resolutions}
+        self.max_gap = max_gap
+        self.last_ts: Optional[float] = None
+        self._windows: Dict[Tuple[str, str, str], deque] = {}
+
+    def _window(self, res: str, bucket: str, label: str, ts: float) -> Optional[Window]:
+        key = (res, bucket, label)
+        ring = self._windows.get(key)
+        if ring is None:
+            ring = self._windows[key] = deque(maxlen=self.retention[res])
+        span = self.resolutions[res]
+        start = int(ts // span) * span
+        if ring and ring[-1].start == start:
+            return ring[-1]
+        if not ring or ring[-1].start < start:
+            ring.append(Window(start))  # deque(maxlen) evicts the oldest window
+            return ring[-1]
+        for w in reversed(ring):  # out-of-order record: find its (retained) window
+            if w.start == start:
+                return w
+        return None
+
+    def record(self, ts: float, bucket: str, label: str, exec_time: Optional[float],
+               overhead: Optional[float], fail_safe: bool, throttle_percent: int):
+        dt = 0.0 if self.last_ts is None else min(self.max_gap, max(0.0, ts - self.last_ts))
+        self.last_ts = ts if self.last_ts is None else max(self.last_ts, ts)
+        ratio = 0.0
+        if exec_time is not None and overhead is not None:
+            ratio = float(overhead) / max(1e-6, exec_time + overhead)
+        for res in self.resolutions:
+            w = self._window(res, bucket, label, ts)
+            if w is not None:
+                w.add(exec_time, ratio, fail_safe, int(throttle_percent), dt)
+
+    def query(self, resolution: str = "hour", bucket: Optional[str] = None,
+              label: Optional[str] = None, since: Optional[float] = None,
+              until: Optional[float] = None) -> List[Dict[str, Any]]:
+        rows = []
+        for (res, b, l), ring in self._windows.items():
+            if res != resolution or bucket and b != bucket or label and l != label:
+                continue
+            for w in ring:
+                if since is not None and w.start + self.resolutions[res] <= since:
+                    continue
+                if until is not None and w.start >= until:
+                    continue
+                rows.append(dict(w.summary(), bucket=b, label=l, resolution=res))
+        rows.sort(key=lambda r: (r["start"], r["bucket"], r["label"]))
+        return rows
+
+    # ---- persistence (dict form; state.py encodes it compactly) ----
+    def to_dict(self) -> Dict[str, Any]:
+        windows = []
+        for (res, b, l), ring in self._windows.items():
+            for w in ring:
+                windows.append({"res": res, "bucket": b, "label": l, "start": w.start, "count": w.count,
+                                "n_exec": w.n_exec, "sum_exec": w.sum_exec, "sum_ratio": w.sum_ratio,
+                                "fs_seconds": w.fs_seconds,
+                                "throttle": {str(k): v for k, v in w.throttle.items()},
+                                "bins": {str(k): v for k, v in w.bins.items()}})
+        return {"resolutions": self.resolutions, "retention": self.retention,
+                "last_ts": self.last_ts, "windows": windows}
+
+    def merge_dict(self, data: Dict[str, Any]):
+        """Fold persisted windows into this engine (same window start → sums combine)."""
+        if data.get("last_ts") is not None:
+            self.last_ts = max(self.last_ts or data["last_ts"], data["last_ts"])
+        merged: Dict[Tuple[str, str, str], Dict[int, Window]] = {}
+        for wd in data.get("windows", []):
+            if wd["res"] not in self.resolutions:
+                continue
+            key = (wd["res"], wd["bucket"], wd["label"])
+            by_start = merged.get(key)
+            if by_start is None:
+                by_start = merged[key] = {w.start: w for w in self._windows.get(key, ())}
+            start = int(wd["start"])
+            w = by_start.get(start)
+            if w is None:
+                w = by_start[start] = Window(start)
+            w.count += int(wd["count"])
+            w.n_exec += int(wd["n_exec"])
+            w.sum_exec += wd["sum_exec"]
+            w.sum_ratio += wd["sum_ratio"]
+            w.fs_seconds += wd["fs_seconds"]
+            for k, v in wd.get("throttle", {}).items():
+                w.throttle[int(k)] = w.throttle.get(int(k), 0.0) + float(v)
+            for k, v in wd.get("bins", {}).items():
+                w.bins[int(k)] = w.bins.get(int(k), 0) + int(v)
+        for key, by_start in merged.items():
+            keep = self.retention[key[0]]
+            self._windows[key] = deque(sorted(by_start.values(), key=lambda x: x.start)[-keep:], maxlen=keep)
+
+# ---------------- Binary codec (state section "RLUP") ----------------
+_R_WIN = struct.Struct("<BHHqIIdddB")
+_R_PAIR_T = struct.Struct("<Hd")
+_R_PAIR_B = struct.Struct("<hI")
+
+def encode_rollups(data: Dict[str, Any]) -> bytes:
+    res_names = list(data.get("resolutions", {}))
+    names: List[str] = []
+    def idx(n: str) -> int:
+        if n not in names:
+            names.append(n)
+        return names.index(n)
+    body = bytearray()
+    windows = data.get("windows", [])
+    for wd in windows:
+        throttle, bins = wd.get("throttle", {}), wd.get("bins", {})
+        body += _R_WIN.pack(res_names.index(wd["res"]), idx(wd["bucket"]), idx(wd["label"]), int(wd["start"]),
+                            int(wd["count"]), int(wd["n_exec"]), wd["sum_exec"], wd["sum_ratio"],
+                            wd["fs_seconds"], len(throttle))
+        for k, v in throttle.items():
+            body += _R_PAIR_T.pack(int(k), float(v))
+        body += struct.pack("<H", len(bins))
+        for k, v in bins.items():
+            body += _R_PAIR_B.pack(int(k), int(v))
+    head = bytearray(struct.pack("<dB", data.get("last_ts") or float("nan"), len(res_names)))
+    for r in res_names:
+        rb = r.encode("utf-8")
+        head += struct.pack("<B", len(rb)) + rb + struct.pack("<II", data["resolutions"][r], data["retention"][r])
+    head += struct.pack("<H", len(names))
+    for n in names:
+        nb = n.encode("utf-8")
+        head += struct.pack("<B", len(nb)) + nb
+    return bytes(head) + struct.pack("<I", len(windows)) + bytes(body)
+
+def decode_rollups(buf: bytes) -> Dict[str, Any]:
+    last_ts, n_res = struct.unpack_from("<dB", buf, 0)
+    pos, resolutions, retention = 9, {}, {}
+    for _ in range(n_res):
+        n = buf[pos]; r = buf[pos + 1:pos + 1 + n].decode("utf-8"); pos += 1 + n
+        resolutions[r], retention[r] = struct.unpack_from("<II", buf, pos); pos += 8
+    (n_names,) = struct.unpack_from("<H", buf, pos); pos += 2
+    names = []
+    for _ in range(n_names):
+        n = buf[pos]; names.append(buf[pos + 1:pos + 1 + n].decode("utf-8")); pos += 1 + n
+    (n_win,) = struct.unpack_from("<I", buf, pos); pos += 4
+    res_names, windows = list(resolutions), []
+    for _ in range(n_win):
+        r, b, l, start, count, n_exec, s_exec, s_ratio, fs, n_t = _R_WIN.unpack_from(buf, pos)
+        pos += _R_WIN.size
+        throttle = {}
+        for _ in range(n_t):
+            k, v = _R_PAIR_T.unpack_from(buf, pos); pos += _R_PAIR_T.size
+            throttle[str(k)] = v
+        (n_b,) = struct.unpack_from("<H", buf, pos); pos += 2
+        bins = {}
+        for _ in range(n_b):
+            k, v = _R_PAIR_B.unpack_from(buf, pos); pos += _R_PAIR_B.size
+            bins[str(k)] = v
+        windows.append({"res": res_names[r], "bucket": names[b], "label": names[l], "start": start,
+                        "count": count, "n_exec": n_exec, "sum_exec": s_exec, "sum_ratio": s_ratio,
+                        "fs_seconds": fs, "throttle": throttle, "bins": bins})
+    return {"resolutions": resolutions, "retention": retention,
+            "last_ts": None if last_ts != last_ts else last_ts, "windows": windows}
+
+__all__ = ["RollupEngine", "RESOLUTIONS", "RETENTION", "encode_rollups", "decode_rollups"]
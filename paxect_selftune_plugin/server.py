@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: Apache-2.0
+# -*- coding: utf-8 -*-
+"""
+PAXECT SelfTune — Observability Server
+--------------------------------------
+Threaded HTTP server for a running tuner:
+
+ - /metrics → Prometheus text exposition (version 0.0.4)
+ - /ready   → 200 once the first payload is rendered, 503 before
+ - /state   → JSON view of stats, best arms, epsilon, throttle
+ - /last    → last decision (JSON)
+ - /ping    → liveness
+
+Payloads are rendered by a background thread from `tuner.snapshot()` every
+`refresh_interval` seconds and published by a single reference swap. Scrape
+handlers only read that reference, so any number of scrapes per second
+never touch the tuner or contend with the tuning hot path.
+"""
+
+import json, time, threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, Optional, Callable, List, Tuple
+from .histogram import prometheus_lines
+
+PROM_CTYPE = "text/plain; version=0.0.4; charset=utf-8"
+JSON_CTYPE = "application/json"
+
+# ---------------- Rendering ----------------
+def _fmt(v) -> str:
+    if v is None:
+        return "NaN"
+    if isinstance(v, bool):
+        return "1" if v else "0"
+    if v == float("inf"):
+        return "+Inf"
+    return repr(float(v)) if isinstance(v, float) else str(v)
+
+def _labels(d: Dict[str, Any]) -> str:
+    if not d:
+        return ""
+    inner = ",".join('%s="%s"' % (k, str(v).replace("\\", "\\\\").replace('"', '\\"')) for k, v in d.items())
+    return "{" + inner + "}"
+
+class PromWriter:
+    def __init__(self, prefix: str = "paxect_selftune_"):
+        self.prefix = prefix
+        self.lines: List[str] = []
+
+    def metric(self, name: str, mtype: str, help_text: str, samples):
+        """samples: value, or iterable of (labels dict, value)."""
+        full = self.prefix + name
+        self.lines.append(f"# HELP {full} {help_text}")
+        self.lines.append(f"# TYPE {full} {mtype}")
+        if not isinstance(samples, (list, tuple)):
+            samples = [({}, samples)]
+        for labels, value in samples:
+            self.lines.append(f"{full}{_labels(labels)} {_fmt(value)}")
+
+    def raw(self, lines: List[str]):
+        self.lines.extend(lines)
+
+    def text(self) -> str:
+        return "\n".join(self.lines) + "\n"
+
+def render_prometheus(view: Dict[str, Any], extra: Optional[Dict[str, float]] = None) -> str:
+    w = PromWriter()
+    w.metric("decisions_total", "counter", "Tuning decisions taken", view.get("step", 0))
+    w.metric("epsilon", "gauge", "Epsilon exploration factor", view.get("epsilon"))
+    w.metric("throttle_percent", "gauge", "Current throttle percent", view.get("throttle_percent"))
+    w.metric("fail_safe_active", "gauge", "Fail-safe active flag", bool(view.get("fail_safe")))
+    w.metric("avg_overhead_ratio", "gauge", "Windowed average overhead ratio", view.get("avg_overhead"))
+    stats = view.get("stats", {})
+    w.metric("ema_exec_seconds", "gauge", "EMA exec_time per bucket/profile",
+             [({"bucket": b, "profile": p}, r["ema"]) for b, ps in stats.items() for p, r in ps.items()])
+    w.metric("feedback_total", "counter", "Feedback samples per bucket/profile",
+             [({"bucket": b, "profile": p}, r["count"]) for b, ps in stats.items() for p, r in ps.items()])
+    w.metric("best_profile", "gauge", "Current best profile per bucket (1 = selected)",
+             [({"bucket": b, "profile": p}, 1) for b, p in view.get("best", {}).items()])
+    memory = view.get("memory")
+    if memory:
+        w.metric("peak_memory_bytes", "gauge", "EMA of peak memory per bucket/profile",
+                 [({"bucket": b, "profile": p}, r["ema"]) for b, ps in memory.items() for p, r in ps.items()])
+    costs = view.get("cost_models")
+    if costs:
+        w.metric("cost_per_mib_seconds", "gauge", "Fitted marginal seconds per MiB per bucket/profile",
+                 [({"bucket": b, "profile": p}, m["per_mib_s"]) for b, ms in costs.items() for p, m in ms.items()])
+        w.metric("cost_fixed_seconds", "gauge", "Fitted fixed seconds per call per bucket/profile",
+                 [({"bucket": b, "profile": p}, m["fixed_s"]) for b, ms in costs.items() for p, m in ms.items()])
+    pressure = view.get("pressure")
+    if pressure and pressure.get("stall"):
+        w.metric("system_stall_percent", "gauge", f"Stall percent per resource (source: {pressure['source']})",
+                 [({"resource": r}, v) for r, v in sorted(pressure["stall"].items())])
+    limits = view.get("limits")
+    if limits:
+        w.metric("cgroup_effective_cpus", "gauge", "Usable CPUs (min of affinity, cpuset, quota)",
+                 limits.get("effective_cpus"))
+        w.metric("cgroup_cpu_quota", "gauge", "CPU quota in cores (NaN = unlimited)", limits.get("cpu_quota"))
+        w.metric("cgroup_memory_max_bytes", "gauge", "Memory limit in bytes (NaN = unlimited)",
+                 limits.get("memory_max"))
+        w.metric("parallel_workers", "gauge", "Worker count bound for parallel decisions", limits.get("workers"))
+    throttle = view.get("throttle")
+    if throttle:
+        w.metric("throttle_trips_total", "counter", "Fail-safe trips", throttle.get("trips"))
+        w.metric("throttle_state_seconds_total", "counter", "Seconds spent per throttle controller state",
+                 [({"state": k}, v) for k, v in throttle["seconds_in_state"].items()])
+        w.metric("throttle_percent_seconds_total", "counter", "Seconds spent at each throttle percent",
+                 [({"percent": k}, v) for k, v in throttle["seconds_at_percent"].items()])
+    if view.get("histograms") is not None:
+        w.raw(prometheus_lines(view["histograms"], w.prefix))
+    for name, value in (extra or {}).items():
+        w.metric(name, "gauge", name.replace("_", " "), value)
+    return w.text()
+
+def _state_json(view: Dict[str, Any]) -> Dict[str, Any]:
+    def clean(o):
+        if isinstance(o, float) and o in (float("inf"), float("-inf")):
+            return None
+        if isinstance(o, dict):
+            return {k: clean(v) for k, v in o.items()}
+        return o
+    keep = ("mode", "host", "step", "epsilon", "throttle_percent", "fail_safe", "avg_overhead", "stats", "best",
+            "memory", "cost_models", "pressure", "limits", "throttle")
+    return clean({k: view.get(k) for k in keep})
+
+# ---------------- Server ----------------
+class MetricsServer:
+    def __init__(self, tuner, host: str = "127.0.0.1", port: int = 8090,
+                 refresh_interval: float = 1.0, extra: Optional[Callable[[], Dict[str, float]]] = None):
+        self.tuner = tuner
+        self.host, self.port = host, port
+        self.refresh_interval = refresh_interval
+        self.extra = extra
+        self.renders = 0
+        self._rendered_version = -1
+        # Published payloads: {path: (body, content type)} swapped as a whole
+        self._payloads: Optional[Dict[str, Tuple[bytes, str]]] = None
+        self._stop = threading.Event()
+        self._httpd: Optional[ThreadingHTTPServer] = None
+        self._threads: List[threading.Thread] = []
+
+    def render(self):
+        snap = self.tuner.snapshot()
+        if snap.version == self._rendered_version and self.extra is None:
+            return  # nothing changed since the last render
+        view = snap.to_dict()
+        extra = self.extra() if self.extra else None
+        payloads = {
+            "/metrics": (render_prometheus(view, extra).encode("utf-8"), PROM_CTYPE),
+            "/state": (json.dumps(_state_json(view)).encode("utf-8"), JSON_CTYPE),
+            "/last": (json.dumps(view.get("last") or {}).encode("utf-8"), JSON_CTYPE),
+            "/ready": (b'{"ready": true}', JSON_CTYPE),
+        }
+        self._payloads = payloads
+        self._rendered_version = snap.version
+        self.renders += 1
+
+    def _refresh_loop(self):
+        while not self._stop.wait(self.refresh_interval):
+            try:
+                self.render()
+            except Exception:
+                pass  # keep serving the previous payload
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                path = self.path.split("?", 1)[0]
+                if path == "/ping":
+                    return self._send(200, json.dumps({"status": "pong", "ts": int(time.time())}).encode(), JSON_CTYPE)
+                payloads = server._payloads
+                if payloads is None:
+                    return self._send(503, b'{"ready": false}', JSON_CTYPE)
+                hit = payloads.get(path)
+                if hit is None:
+                    return self._send(404, b'{"error": "unknown endpoint"}', JSON_CTYPE)
+                self._send(200, hit[0], hit[1])
+
+            def _send(self, code, body, ctype):
+                self.send_response(code)
+                self.send_header("Content-Type", ctype)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                return
+
+        return Handler
+
+    def start(self) -> "MetricsServer":
+        self.render()
+        self._httpd = ThreadingHTTPServer((self.host, self.port), self._handler())
+        self._httpd.daemon_threads = True
+        self.port = self._httpd.server_address[1]
+        self._stop.clear()
+        self._threads = [threading.Thread(target=self._httpd.serve_forever, daemon=True),
+                         threading.Thread(target=self._refresh_loop, daemon=True)]
+        for t in self._threads:
+            t.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+        if self._httpd is not None:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+        for t in self._threads:
+            t.join(timeout=2)
+        self._threads = []
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+def serve_metrics(tuner, host: str = "127.0.0.1", port: int = 8090, **kwargs) -> MetricsServer:
+    return MetricsServer(tuner, host, port, **kwargs).start()
+
+__all__ = ["MetricsServer", "serve_metrics", "render_prometheus", "PromWriter"]
@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: Apache-2.0
+# -*- coding: utf-8 -*-
+"""
+PAXECT SelfTune — Workload Simulator
+------------------------------------
+Evaluates tuner settings against a workload whose right answer is known,
+at full speed and in simulated time (no sleeps, no real payloads):
+
+  python3 -m paxect_selftune_plugin simulate --steps 20000
+  python3 -m paxect_selftune_plugin simulate --seeds 16 --processes 4 --tuner epsilon=0.1
+  python3 -m paxect_selftune_plugin simulate --scenario scenario.json --out result.json
+
+Ground truth per bucket/arm: mean cost in seconds, lognormal noise
+(`sigma`), a Pareto heavy tail (`tail_p`, `tail_alpha`), drift events that
+rescale one arm from a fraction of the run on, overload bursts (overhead
+= `ratio` × exec time, like demo_02 / demo_10 fault injection) and rare
+isolated overhead spikes. The tuner runs with `clock=` bound to simulated
+time, so fail-safe hold and recovery timers behave as in production.
+
+Reported per run:
+
+ - regret: Σ (true mean of chosen arm − true mean of best arm), absolute
+   and relative to the optimal total
+ - convergence: per phase (split at drift events), the first step from
+   which ≥ `converge_share` of the last `converge_window` decisions picked
+   the best arm
+ - fail-safe: trips, trips with no burst in progress or just ended (false
+   positives) and their share
+
+A sweep runs one simulation per seed, spread over worker processes (the
+tuner is sequential, so processes rather than vectorization), and
+aggregates mean/min/max per metric.
+"""
+
+import os, sys, json, math, random, tempfile
+from typing import Dict, Any, Optional, List
+
+DEFAULT_SCENARIO: Dict[str, Any] = {
+    "arms": {  # true mean seconds per decision
+        "small": {"baseline": 1.0e-4, "compress": 1.6e-4, "parallel": 2.5e-4},
+        "medium": {"baseline": 2.0e-3, "compress": 1.4e-3, "parallel": 1.7e-3},
+        "large": {"baseline": 4.0e-2, "compress": 3.0e-2, "parallel": 1.8e-2},
+    },
+    "bytes": {"small": 64 << 10, "medium": 1 << 20, "large": 16 << 20},
+    "mix": {"small": 0.5, "medium": 0.3, "large": 0.2},
+    "sigma": 0.15,                  # lognormal noise on exec time
+    "tail_p": 0.01, "tail_alpha": 1.5,   # 1% of samples × Pareto(α) multiplier
+    "overhead": [0.05, 0.25],       # normal overhead as a share of exec time
+    "spike_p": 0.002, "spike_ratio": 6.0,  # isolated overhead spikes (GC, page cache miss)
+    "drift": [{"at": 0.5, "bucket": "large", "arm": "parallel", "scale": 2.5}],
+    "bursts": [{"start": 0.2, "end": 0.23, "ratio": 5.0}, {"start": 0.7, "end": 0.72, "ratio": 5.0}],
+    "dt": 0.01,                     # simulated seconds between decisions
+}
+
+class SimClock:
+    __slots__ = ("t",)
+
+    def __init__(self, t: float = 1000.0):
+        self.t = t
+
+    def __call__(self) -> float:
+        return self.t
+
+def _true_means(sc: Dict[str, Any], frac: float) -> Dict[str, Dict[str, float]]:
+    means = {b: dict(arms) for b, arms in sc["arms"].items()}
+    for ev in sc.get("drift", ()):
+        if frac >= ev["at"]:
+            means[ev["bucket"]][ev["arm"]] *= ev.get("scale", 1.0)
+    return means
+
+def run(scenario: Optional[Dict[str, Any]] = None, steps: int = 20000, seed: int = 0,
+        tuner_kwargs: Optional[Dict[str, Any]] = None, converge_window: int = 100,
+        converge_share: float = 0.9) -> Dict[str, Any]:
+    """One simulated run; returns its metrics."""
+    from . import Autotune
+    sc = dict(DEFAULT_SCENARIO, **(scenario or {}))
+    rnd = random.Random(seed)
+    random.seed(seed)  # the tuner explores with the module-level generator
+    clock = SimClock()
+    kwargs = {"log_to_file": False, "save_interval": 10 ** 9, "host_keyed": False, "throttle_policy": "off",
+              "cgroup_aware": False}
+    kwargs.update(tuner_kwargs or {})
+    with tempfile.TemporaryDirectory(prefix="paxect_sim_") as workdir:
+        tuner = Autotune(state_path=os.path.join(workdir, "sim_state.json"),
+                         log_path=os.path.join(workdir, "sim_log.jsonl"), clock=clock, **kwargs)
+        return _simulate(tuner, clock, rnd, sc, steps, seed, converge_window, converge_share)
+
+def _simulate(tuner, clock: SimClock, rnd: random.Random, sc: Dict[str, Any], steps: int, seed: int,
+              converge_window: int, converge_share: float) -> Dict[str, Any]:
+    buckets = list(sc["mix"])
+    weights = [sc["mix"][b] for b in buckets]
+    cum = [sum(weights[:i + 1]) / sum(weights) for i in range(len(weights))]
+    boundaries = sorted({ev["at"] for ev in sc.get("drift", ())})
+    phases = [0.0] + boundaries
+    bursts = sc.get("bursts", ())
+    dt, sigma = sc["dt"], sc["sigma"]
+    tail_p, alpha = sc["tail_p"], sc["tail_alpha"]
+    oh_lo, oh_hi = sc["overhead"]
+    grace = tuner.overhead_window + 1  # steps a burst keeps the averaged overhead high
+
+    regret = optimal = 0.0
+    hits: List[int] = []
+    phase_of: List[int] = []
+    trips = false_trips = fs_steps = 0
+    last_burst_step = -10 ** 9
+    prev_fs = False
+    exec_time = overhead = None
+    means, phase = _true_means(sc, 0.0), 0
+    for step in range(steps):
+        frac = step / steps
+        if phase < len(boundaries) and frac >= boundaries[phase]:
+            phase += 1
+            means = _true_means(sc, frac)
+        u = rnd.random()
+        bucket = buckets[next(i for i, c in enumerate(cum) if u <= c)]
+        n_bytes = sc["bytes"][bucket]
+        # feedback of the previous decision comes with this one (as with tune())
+        d = tuner.decide(n_bytes, exec_time, overhead)
+        truth = means[bucket]
+        best = min(truth.values())
+        chosen = truth[d.label]
+        regret += chosen - best
+        optimal += best
+        hits.append(1 if chosen == best else 0)
+        phase_of.append(phase)
+
+        exec_time = chosen * math.exp(rnd.gauss(0.0, sigma) - sigma * sigma / 2)
+        if rnd.random() < tail_p:
+            exec_time *= rnd.paretovariate(alpha)
+        burst = next((b for b in bursts if b["start"] <= frac < b["end"]), None)
+        if burst is not None:
+            overhead = exec_time * burst["ratio"] * rnd.uniform(0.8, 1.2)
+            last_burst_step = step
+        elif rnd.random() < sc["spike_p"]:
+            overhead = exec_time * sc["spike_ratio"]
+        else:
+            overhead = exec_time * rnd.uniform(oh_lo, oh_hi)
+
+        if d.fail_safe:
+            fs_steps += 1
+            if not prev_fs:
+                trips += 1
+                if step - last_burst_step > grace:
+                    false_trips += 1
+        prev_fs = d.fail_safe
+        clock.t += dt
+
+    # Convergence per phase: first step whose trailing window reaches the target share
+    convergence = []
+    for p, start_frac in enumerate(phases):
+        start = int(start_frac * steps)
+        idx = [i for i in range(start, steps) if phase_of[i] == p]
+        found = None
+        window = 0
+        for j, i in enumerate(idx):
+            window += hits[i]
+            if j >= converge_window:
+                window -= hits[idx[j - converge_window]]
+            if j + 1 >= converge_window and window >= converge_share * converge_window:
+                found = j + 1
+                break
+        convergence.append({"phase": p, "starts_at": start, "steps_to_converge": found})
+    return {"seed": seed, "steps": steps, "sim_seconds": round(steps * dt, 3),
+            "regret_s": regret, "relative_regret": regret / optimal if optimal else 0.0,
+            "optimal_share": sum(hits) / steps, "convergence": convergence,
+            "fail_safe_trips": trips, "false_positive_trips": false_trips,
+            "false_positive_rate": false_trips / trips if trips else 0.0,
+            "fail_safe_steps": fs_steps}
+
+def _run_star(args):
+    return run(*args)
+
+def sweep(scenario: Optional[Dict[str, Any]] = None, steps: int = 20000, seeds=range(8), processes: int = 0,
+          tuner_kwargs: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """One run per seed (processes=0 → one per CPU, 1 → in this process) plus aggregates."""
+    jobs = [(scenario, steps, s, tuner_kwargs) for s in seeds]
+    if processes == 1 or len(jobs) == 1:
+        runs = [_run_star(j) for j in jobs]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor(processes or None) as pool:
+            runs = list(pool.map(_run_star, jobs))
+    agg: Dict[str, Any] = {}
+    for key in ("regret_s", "relative_regret", "optimal_share", "fail_safe_trips", "false_positive_rate"):
+        vals = [r[key] for r in runs]
+        agg[key] = {"mean": sum(vals) / len(vals), "min": min(vals), "max": max(vals)}
+    n_phases = len(runs[0]["convergence"])
+    agg["steps_to_converge"] = []
+    for p in range(n_phases):
+        vals = [r["convergence"][p]["steps_to_converge"] for r in runs]
+        done = [v for v in vals if v is not None]
+        agg["steps_to_converge"].append({"phase": p, "converged_runs": len(done),
+                                         "mean": sum(done) / len(done) if done else None,
+                                         "max": max(done) if done else None})
+    return {"runs": len(runs), "steps": steps, "tuner": tuner_kwargs or {}, "aggregate": agg, "per_seed": runs}
+
+# ---------------- CLI ----------------
+def _kv(text: str):
+    key, _, value = text.partition("=")
+    try:
+        return key, json.loads(value)
+    except ValueError:
+        return key, value
+
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+    parser = argparse.ArgumentParser(prog="paxect_selftune_plugin simulate")
+    parser.add_argument("--steps", type=int, default=20000)
+    parser.add_argument("--seeds", type=int, default=1, help="number of seeds (0..N-1)")
+    parser.add_argument("--processes", type=int, default=0, help="0 = one per CPU")
+    parser.add_argument("--scenario", default=None, help="JSON file overriding DEFAULT_SCENARIO keys")
+    parser.add_argument("--tuner", action="append", default=[], type=_kv, metavar="KEY=VALUE",
+                        help="Autotune setting, e.g. epsilon=0.1 (repeatable)")
+    parser.add_argument("--out", default=None)
+    args = parser.parse_args(argv)
+
+    scenario = None
+    if args.scenario:
+        with open(args.scenario, "r", encoding="utf-8") as f:
+            scenario = json.load(f)
+    res = sweep(scenario, args.steps, range(args.seeds), args.processes, dict(args.tuner))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(res, f, indent=2)
+    print(json.dumps({k: res[k] for k in ("runs", "steps", "tuner", "aggregate")}, indent=2))
+    return 0
+
+__all__ = ["run", "sweep", "SimClock", "DEFAULT_SCENARIO"]
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: Apache-2.0
+# -*- coding: utf-8 -*-
+"""
+PAXECT SelfTune — Consistent Snapshots
+--------------------------------------
+Immutable, versioned views of a tuner for observers (HTTP handlers,
+dashboards, exporters) that run beside the tuning thread.
+
+Generation swap: every state change bumps `Autotune._generation` under the
+tuner lock. `Autotune.snapshot()` returns the published snapshot when its
+version matches the generation (one attribute read, no lock); otherwise one
+caller rebuilds it under the lock and publishes it for everyone else. The
+tuning thread never copies anything, however many observers poll.
+"""
+
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Dict, Any, Optional, Tuple, Mapping, NamedTuple
+
+class StatRecord(NamedTuple):
+    ema: float
+    count: float
+
+def freeze_stats(stats: Dict[str, Dict[str, Dict[str, float]]]) -> Mapping[str, Mapping[str, StatRecord]]:
+    return MappingProxyType({b: MappingProxyType({p: StatRecord(r["ema"], r["count"]) for p, r in ps.items()})
+                             for b, ps in stats.items()})
+
+@dataclass(frozen=True)
+class TunerSnapshot:
+    version: int
+    taken_at: float
+    mode: str
+    host: str
+    step: int
+    epsilon: float
+    throttle_percent: int
+    fail_safe: bool
+    avg_overhead: float
+    overhead_window: Tuple[float, ...]
+    stats: Mapping[str, Mapping[str, StatRecord]]
+    best: Mapping[str, str]
+    last_decision: Optional[Mapping[str, Any]]
+    _history: Tuple[Dict[str, Any], ...] = ()
+    histograms: Any = None  # private HistogramSet copy, or None
+    memory: Optional[Mapping[str, Mapping[str, StatRecord]]] = None  # peak-memory EMA (bytes)
+    cost_models: Optional[Mapping[str, Any]] = None  # bucket → label → fixed_s, per_mib_s, samples
+    pressure: Optional[Mapping[str, Any]] = None
+    limits: Optional[Mapping[str, Any]] = None
+    throttle: Optional[Mapping[str, Any]] = None  # controller state, trips, seconds per state/percent
+    tails: Optional[Mapping[str, Any]] = None  # bucket → label → quantile, mean, stddev, samples, confident
+
+    @property
+    def history(self) -> Tuple[Mapping[str, Any], ...]:
+        return tuple(MappingProxyType(row) for row in self._history)
+
+    def to_dict(self, history: bool = False) -> Dict[str, Any]:
+        """Plain, mutable copy (JSON-ready apart from inf EMAs and histograms)."""
+        out = {
+            "version": self.version, "taken_at": self.taken_at, "mode": self.mode, "host": self.host,
+            "step": self.step, "epsilon": self.epsilon, "throttle_percent": self.throttle_percent,
+            "fail_safe": self.fail_safe, "avg_overhead": self.avg_overhead,
+            "overhead_window": list(self.overhead_window),
+            "stats": {b: {p: r._asdict() for p, r in ps.items()} for b, ps in self.stats.items()},
+            "best": dict(self.best),
+            "last": dict(self.last_decision) if self.last_decision is not None else None,
+            "histograms": self.histograms.copy() if self.histograms is not None else None,
+            "memory": ({b: {p: r._asdict() for p, r in ps.items()} for b, ps in self.memory.items()}
+                       if self.memory is not None else None),
+            "cost_models": dict(self.cost_models) if self.cost_models is not None else None,
+            "pressure": dict(self.pressure) if self.pressure is not None else None,
+            "limits": dict(self.limits) if self.limits is not None else None,
+            "throttle": dict(self.throttle) if self.throttle is not None else None,
+            "tails": dict(self.tails) if self.tails is not None else None,
+        }
+        if history:
+            out["history"] = [dict(r) for r in self._history]
+        return out
+
+__all__ = ["TunerSnapshot", "StatRecord", "freeze_stats"]
@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: Apache-2.0
+# -*- coding: utf-8 -*-
+"""
+PAXECT SelfTune — Soak Harness
+------------------------------
+Drives a real `Autotune` at a target decision rate for a fixed duration
+and fails when it degrades over time:
+
+  python3 -m paxect_selftune_plugin soak --duration 600 --rate 500
+  python3 -m paxect_selftune_plugin soak --duration 3600 --api decide --out soak.json
+
+Every `interval` seconds it records:
+
+ - decision latency p50/p95/p99/max of that interval
+ - traced Python heap (tracemalloc); every `snapshot_every` warm intervals
+   a snapshot whose top allocation sites by growth since the previous one
+   are kept, so a steady leak shows as a site growing period after period
+ - state file (+ history sidecar) and decision log size
+
+Checks (all configurable, see SoakThresholds):
+
+ - achieved decision rate at least `min_rate_share` of the target (a
+   tuner that cannot keep up is not soaked at the load asked for)
+ - heap growth and per-site growth after warm-up (baseline → final)
+ - steady site growth: a site that grew in every snapshot period (at
+   least three) by more than `max_steady_site_growth_bytes` in total
+ - latency drift: median p99 of the last third of intervals over the
+   first third
+ - state file size cap; log bytes per decision cap (the log is append-only
+   by design, so its growth is judged per decision, not absolutely)
+"""
+
+import os, sys, time, json, random, shutil, tempfile, contextlib
+from dataclasses import dataclass, asdict
+from statistics import median
+from typing import Dict, Any, Optional, List
+
+MIB = 1 << 20
+
+@dataclass
+class SoakThresholds:
+    max_heap_growth_bytes: int = 8 * MIB
+    max_site_growth_bytes: int = 2 * MIB
+    max_p99_drift: float = 3.0
+    max_state_bytes: int = 32 * MIB
+    max_log_bytes_per_decision: float = 1024.0
+    max_steady_site_growth_bytes: int = 512 * 1024
+    min_rate_share: float = 0.9
+
+def _pct(sorted_vals: List[float], q: float) -> float:
+    if not sorted_vals:
+        return 0.0
+    return sorted_vals[min(len(sorted_vals) - 1, int(q * len(sorted_vals)))]
+
+def _size(*paths: str) -> int:
+    total = 0
+    for p in paths:
+        try:
+            total += os.path.getsize(p)
+        except OSError:
+            pass
+    return total
+
+def _site_growth(new, old, filters) -> Dict[str, int]:
+    """Bytes grown (or shrunk) per allocation site between two tracemalloc snapshots."""
+    out = {}
+    for d in new.filter_traces(filters).compare_to(old.filter_traces(filters), "lineno"):
+        if d.size_diff:
+            frame = d.traceback[0]
+            out[f"{frame.filename}:{frame.lineno}"] = d.size_diff
+    return out
+
+def soak(duration: float = 60.0, rate: float = 500.0, interval: float = 5.0, warmup: Optional[float] = None,
+         api: str = "tune", workdir: Optional[str] = None, thresholds: Optional[SoakThresholds] = None,
+         trace: bool = True, top: int = 10, seed: int = 1, progress=None, keep: bool = False,
+         snapshot_every: int = 3, **tuner_kwargs) -> Dict[str, Any]:
+    """Run the soak; returns the report dict with "ok" and "failures".
+
+    Without `workdir`, state and log go to a temporary directory that is
+    removed afterwards unless `keep` is set.
+    """
+    if workdir is not None:
+        os.makedirs(workdir, exist_ok=True)
+        return _soak(duration, rate, interval, warmup, api, workdir, thresholds, trace, top, seed, progress,
+                     snapshot_every, tuner_kwargs)
+    workdir = tempfile.mkdtemp(prefix="paxect_soak_")
+    try:
+        return _soak(duration, rate, interval, warmup, api, workdir, thresholds, trace, top, seed, progress,
+                     snapshot_every, tuner_kwargs)
+    finally:
+        if not keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+def _soak(duration: float, rate: float, interval: float, warmup: Optional[float], api: str, workdir: str,
+          thresholds: Optional[SoakThresholds], trace: bool, top: int, seed: int, progress,
+          snapshot_every: int, tuner_kwargs: Dict[str, Any]) -> Dict[str, Any]:
+    import tracemalloc
+    from . import Autotune, BUCKET_SMALL_THRESHOLD, BUCKET_MEDIUM_THRESHOLD
+    if api not in ("tune", "decide"):
+        raise ValueError("api must be 'tune' or 'decide'")
+    th = thresholds or SoakThresholds()
+    warmup = duration * 0.1 if warmup is None else warmup
+    state_path = os.path.join(workdir, "soak_state.pxst")
+    log_path = os.path.join(workdir, "soak_log.jsonl")
+    tuner = Autotune(state_path=state_path, log_path=log_path, **tuner_kwargs)
+    rnd = random.Random(seed)
+    sizes = (BUCKET_SMALL_THRESHOLD // 2, BUCKET_MEDIUM_THRESHOLD // 2, BUCKET_MEDIUM_THRESHOLD * 2)
+
+    if trace:
+        tracemalloc.start(1)
+    intervals: List[Dict[str, Any]] = []
+    baseline = base_heap = None
+    base_log = decisions_since_base = 0
+    growth: List[Dict[str, Any]] = []
+    filters = [tracemalloc.Filter(False, tracemalloc.__file__)]
+    last_snap = None
+    periods: List[Dict[str, int]] = []  # per-site growth per snapshot period
+    warm_rows = 0
+    lat: List[float] = []
+    n = 0
+    period = 1.0 / rate if rate > 0 else 0.0
+    try:
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):  # tune() prints
+            start = time.perf_counter()
+            interval_start = start
+            next_report = start + interval
+            warm_until = start + warmup
+            while True:
+                now = time.perf_counter()
+                if now - start >= duration:
+                    break
+                target = start + n * period
+                if target > now:
+                    time.sleep(min(target - now, 0.05))
+                    continue
+                n_bytes = sizes[n % 3]
+                exec_time = rnd.uniform(5e-5, 1e-3) * (n_bytes / sizes[0]) ** 0.25
+                overhead = exec_time * rnd.uniform(0.05, 0.5)
+                t0 = time.perf_counter()
+                if api == "tune":
+                    tuner.tune(exec_time=exec_time, overhead=overhead, last_bytes=n_bytes)
+                else:
+                    tuner.decide(n_bytes, exec_time, overhead)
+                lat.append(time.perf_counter() - t0)
+                n += 1
+                if baseline is None and t0 >= warm_until:
+                    if trace:
+                        baseline = last_snap = tracemalloc.take_snapshot()
+                        base_heap = tracemalloc.get_traced_memory()[0]
+                    else:
+                        baseline = True
+                    base_log, decisions_since_base = _size(log_path), n
+                if t0 >= next_report:
+                    lat.sort()
+                    row = {"t": round(t0 - start, 3), "decisions": len(lat),
+                           "rate": round(len(lat) / max(1e-9, t0 - interval_start), 1),
+                           "p50_us": round(_pct(lat, 0.50) * 1e6, 2), "p95_us": round(_pct(lat, 0.95) * 1e6, 2),
+                           "p99_us": round(_pct(lat, 0.99) * 1e6, 2), "max_us": round(lat[-1] * 1e6, 2),
+                           "state_bytes": _size(state_path, state_path + ".history.json"),
+                           "log_bytes": _size(log_path),
+                           "warm": baseline is not None and interval_start >= warm_until}
+                    if trace:
+                        row["heap_bytes"] = tracemalloc.get_traced_memory()[0]
+                        if row["warm"]:
+                            warm_rows += 1
+                            if warm_rows % snapshot_every == 0:
+                                snap = tracemalloc.take_snapshot()
+                                periods.append(_site_growth(snap, last_snap, filters))
+                                last_snap = snap
+                                row["top_growth"] = [{"site": k, "size_diff": v} for k, v in sorted(
+                                    periods[-1].items(), key=lambda kv: kv[1], reverse=True)[:3] if v > 0]
+                    intervals.append(row)
+                    if progress:
+                        progress(json.dumps(row))
+                    lat = []
+                    interval_start = t0
+                    next_report += interval
+                    if next_report <= t0:  # fell behind (a stall): no catch-up rows
+                        next_report = t0 + interval
+        elapsed = time.perf_counter() - start
+        if trace and baseline is not None:
+            final = tracemalloc.take_snapshot()
+            diffs = final.filter_traces(filters).compare_to(baseline.filter_traces(filters), "lineno")
+            for d in sorted(diffs, key=lambda d: d.size_diff, reverse=True)[:top]:
+                if d.size_diff <= 0:
+                    break
+                frame = d.traceback[0]
+                growth.append({"site": f"{frame.filename}:{frame.lineno}", "size_diff": d.size_diff,
+                               "count_diff": d.count_diff})
+        heap_growth = (tracemalloc.get_traced_memory()[0] - base_heap) if trace and base_heap is not None else None
+    finally:
+        if trace:
+            tracemalloc.stop()
+
+    # Trends: per-period growth of the sites that grew most overall
+    trends: List[Dict[str, Any]] = []
+    if periods:
+        totals: Dict[str, int] = {}
+        for per in periods:
+            for site, diff in per.items():
+                totals[site] = totals.get(site, 0) + diff
+        for site, total in sorted(totals.items(), key=lambda kv: kv[1], reverse=True)[:top]:
+            if total <= 0:
+                break
+            series = [per.get(site, 0) for per in periods]
+            trends.append({"site": site, "total": total, "per_period": series,
+                           "steady": len(series) >= 3 and all(x > 0 for x in series)})
+
+    # ---------------- Checks ----------------
+    failures: List[str] = []
+    warm = [r for r in intervals if r["warm"]]
+    if heap_growth is not None and heap_growth > th.max_heap_growth_bytes:
+        failures.append(f"heap grew {heap_growth} B after warm-up (limit {th.max_heap_growth_bytes})")
+    for g in growth:
+        if g["size_diff"] > th.max_site_growth_bytes:
+            failures.append(f"{g['site']} grew {g['size_diff']} B (limit {th.max_site_growth_bytes})")
+    achieved = n / elapsed if elapsed > 0 else 0.0
+    if rate > 0 and achieved < th.min_rate_share * rate:
+        failures.append(f"achieved {achieved:.1f} decisions/s, {achieved / rate:.0%} of the {rate:g}/s target "
+                        f"(limit {th.min_rate_share:.0%})")
+    for t in trends:
+        if t["steady"] and t["total"] > th.max_steady_site_growth_bytes:
+            failures.append(f"{t['site']} grew in each of {len(t['per_period'])} periods, {t['total']} B in total "
+                            f"(limit {th.max_steady_site_growth_bytes})")
+    drift = None
+    if len(warm) >= 3:
+        third = max(1, len(warm) // 3)
+        early = median(r["p99_us"] for r in warm[:third])
+        late = median(r["p99_us"] for r in warm[-third:])
+        drift = late / early if early > 0 else None
+        if drift is not None and drift > th.max_p99_drift:
+            failures.append(f"p99 drifted {drift:.2f}x ({early:.1f} → {late:.1f} µs, limit {th.max_p99_drift}x)")
+    state_bytes = _size(state_path, state_path + ".history.json")
+    if state_bytes > th.max_state_bytes:
+        failures.append(f"state file is {state_bytes} B (limit {th.max_state_bytes})")
+    log_per_decision = None
+    if baseline is not None and n > decisions_since_base:
+        log_per_decision = (_size(log_path) - base_log) / (n - decisions_since_base)
+        if log_per_decision > th.max_log_bytes_per_decision:
+            failures.append(f"log grows {log_per_decision:.0f} B/decision (limit {th.max_log_bytes_per_decision})")
+    if baseline is None:
+        failures.append("soak ended before warm-up completed")
+    if not os.path.isfile(state_path):
+        failures.append(f"state file {state_path} was never written")
+    if tuner.log_to_file and not os.path.isfile(log_path):
+        failures.append(f"decision log {log_path} was never written")
+
+    return {"ok": not failures, "failures": failures, "api": api, "duration_s": round(elapsed, 3),
+            "target_rate": rate, "achieved_rate": round(achieved, 1),
+            "decisions": n, "heap_growth_bytes": heap_growth, "p99_drift": round(drift, 3) if drift else drift,
+            "state_bytes": state_bytes, "log_bytes_per_decision": round(log_per_decision, 1) if log_per_decision else None,
+            "top_growth": growth, "site_trends": trends, "snapshot_periods": len(periods), "intervals": intervals, "thresholds": asdict(th), "workdir": workdir}
+
+# ---------------- CLI ----------------
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+    d = SoakThresholds()
+    parser = argparse.ArgumentParser(prog="paxect_selftune_plugin soak")
+    parser.add_argument("--duration", type=float, default=60.0, help="seconds")
+    parser.add_argument("--rate", type=float, default=500.0, help="target decisions per second")
+    parser.add_argument("--interval", type=float, default=5.0, help="report interval (s)")
+    parser.add_argument("--warmup", type=float, default=None, help="seconds before the baseline (default 10%%)")
+    parser.add_argument("--api", choices=("tune", "decide"), default="tune")
+    parser.add_argument("--workdir", default=None, help="keep state and log here (default: a removed temp dir)")
+    parser.add_argument("--keep", action="store_true", help="keep the temporary workdir")
+    parser.add_argument("--no-trace", action="store_true", help="skip tracemalloc (lower overhead)")
+    parser.add_argument("--snapshot-every", type=int, default=3, help="warm intervals per tracemalloc snapshot")
+    parser.add_argument("--max-heap-growth-mb", type=float, default=d.max_heap_growth_bytes / MIB)
+    parser.add_argument("--max-site-growth-mb", type=float, default=d.max_site_growth_bytes / MIB)
+    parser.add_argument("--max-p99-drift", type=float, default=d.max_p99_drift)
+    parser.add_argument("--max-state-mb", type=float, default=d.max_state_bytes / MIB)
+    parser.add_argument("--max-log-bytes-per-decision", type=float, default=d.max_log_bytes_per_decision)
+    parser.add_argument("--min-rate-share", type=float, default=d.min_rate_share,
+                        help="fail below this share of --rate")
+    parser.add_argument("--max-steady-site-growth-kb", type=float, default=d.max_steady_site_growth_bytes / 1024)
+    parser.add_argument("--out", default=None, help="write the full report as JSON")
+    parser.add_argument("--quiet", action="store_true")
+    args = parser.parse_args(argv)
+
+    th = SoakThresholds(int(args.max_heap_growth_mb * MIB), int(args.max_site_growth_mb * MIB), args.max_p99_drift,
+                        int(args.max_state_mb * MIB), args.max_log_bytes_per_decision,
+                        int(args.max_steady_site_growth_kb * 1024), args.min_rate_share)
+    progress = None if args.quiet else (lambda line: print(line, file=sys.stderr))
+    res = soak(args.duration, args.rate, args.interval, args.warmup, args.api, args.workdir, th,
+               trace=not args.no_trace, progress=progress, keep=args.keep,
+               snapshot_every=max(1, args.snapshot_every))
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(res, f, indent=2)
+    summary = {k: res[k] for k in ("ok", "failures", "api", "decisions", "achieved_rate", "heap_growth_bytes",
+                                   "p99_drift", "state_bytes", "log_bytes_per_decision")}
+    summary["top_growth"] = res["top_growth"][:3]
+    summary["site_trends"] = [t for t in res["site_trends"] if t["steady"]][:3]
+    print(json.dumps(summary))
+    return 0 if res["ok"] else 1
+
+__all__ = ["soak", "SoakThresholds"]
+
+if __name__ == "__main__":
+    raise SystemExit(main())
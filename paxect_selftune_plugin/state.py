@@ -0,0 +1,394 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: Apache-2.0
+# -*- coding: utf-8 -*-
+"""
+PAXECT SelfTune — State Persistence
+-----------------------------------
+Two on-disk formats for the tuner state:
+
+ - binary (default) → compact, versioned, checksummed snapshot ("PXST").
+                      Stats are fixed-width float64 tables and history is a
+                      columnar block; both load with struct/array only and
+                      history is read lazily via the section directory.
+ - json             → audit format (state file + history sidecar), also the
+                      target of the explicit import/export CLI.
+
+Layout (little-endian):
+  header     "<4sHHI"   magic, format version, section count, reserved
+  directory  "<4sQQI"   tag, offset, length, crc32   (one per section)
+  sections   META · NAME · HOST · STAT · HIST · RLUP · HGRM · XTRA
+
+CLI:
+  python3 -m paxect_selftune_plugin state info   STATE
+  python3 -m paxect_selftune_plugin state export STATE OUT.json
+  python3 -m paxect_selftune_plugin state import IN.json STATE
+"""
+
+import os, sys, json, struct, zlib
+from array import array
+from math import inf, isnan, nan
+from typing import Dict, Any, Optional, List, Tuple, Callable
+from .rollup import encode_rollups, decode_rollups
+from .histogram import encode_histograms, decode_histograms
+
+MAGIC = b"PXST"
+FORMAT_VERSION = 1
+STATE_VERSION = "paxect-hybrid-1.3"
+
+_HEADER = struct.Struct("<4sHHI")
+_DIRENT = struct.Struct("<4sQQI")
+_META = struct.Struct("<Qd16s")
+_HOST = struct.Struct("<16sdIQddd")
+_LITTLE = sys.byteorder == "little"
+
+# Columnar history schema: (key, array typecode); None ↔ NaN for float columns
+_HIST_COLUMNS = (
+    ("timestamp", "d"), ("bucket", "B"), ("label", "B"), ("exec_time", "d"),
+    ("overhead", "d"), ("matrix_time", "d"), ("io_time", "d"), ("avg_overhead", "d"),
+    ("fail_safe", "B"), ("throttle_percent", "B"),
+)
+_CORE_KEYS = {"host", "hosts", "step", "epsilon", "version", "history"}
+
+# Extension blocks with a dedicated binary codec: key → (tag, encode, decode).
+# Any other extra key is stored as compact JSON in the XTRA section.
+EXTRA_SECTIONS: Dict[str, Tuple[bytes, Callable[[Any], bytes], Callable[[bytes], Any]]] = {
+    "rollups": (b"RLUP", encode_rollups, decode_rollups),
+    "histograms": (b"HGRM", encode_histograms, decode_histograms),
+}
+
+class StateFormatError(ValueError):
+    pass
+
+# ---------------- Helpers ----------------
+def _arr_bytes(a: array) -> bytes:
+    if not _LITTLE:
+        a = array(a.typecode, a)
+        a.byteswap()
+    return a.tobytes()
+
+def _arr_from(typecode: str, buf, count: int) -> array:
+    a = array(typecode)
+    a.frombytes(bytes(buf[:count * a.itemsize]))
+    if not _LITTLE:
+        a.byteswap()
+    return a
+
+def _pack_str(s: str) -> bytes:
+    b = (s or "").encode("utf-8")
+    return struct.pack("<H", len(b)) + b
+
+def _unpack_str(buf, pos: int) -> Tuple[str, int]:
+    (n,) = struct.unpack_from("<H", buf, pos)
+    pos += 2
+    return bytes(buf[pos:pos + n]).decode("utf-8"), pos + n
+
+def _opt(v) -> float:
+    return nan if v is None else float(v)
+
+def _unopt(v: float):
+    return None if isnan(v) else v
+
+def is_binary_state(path: str) -> bool:
+    try:
+        with open(path, "rb") as f:
+            return f.read(4) == MAGIC
+    except OSError:
+        return False
+
+# ---------------- Binary writer ----------------
+def _names(data: Dict[str, Any], history: List[Dict[str, Any]]) -> Tuple[List[str], List[str]]:
+    buckets, profiles = [], []
+    for entry in data.get("hosts", {}).values():
+        for b, profs in entry.get("stats", {}).items():
+            if b not in buckets:
+                buckets.append(b)
+            for p in profs:
+                if p not in profiles:
+                    profiles.append(p)
+    for row in history:
+        if row.get("bucket") not in buckets:
+            buckets.append(row.get("bucket"))
+        if row.get("label") not in profiles:
+            profiles.append(row.get("label"))
+    return buckets, profiles
+
+def encode_snapshot(data: Dict[str, Any], history: List[Dict[str, Any]]) -> bytes:
+    buckets, profiles = _names(data, history)
+    b_idx = {b: i for i, b in enumerate(buckets)}
+    p_idx = {p: i for i, p in enumerate(profiles)}
+    hosts = data.get("hosts", {})
+    sections: List[Tuple[bytes, bytes]] = []
+
+    sections.append((b"META", _META.pack(int(data.get("step", 0)), float(data.get("epsilon", 0.0)),
+                                         data.get("host", "").encode("ascii")[:16])))
+    sections.append((b"NAME", struct.pack("<HH", len(buckets), len(profiles))
+                     + b"".join(_pack_str(n) for n in buckets + profiles)))
+
+    host_blob, stat = bytearray(), array("d")
+    best = bytearray()
+    for host_id, entry in hosts.items():
+        fp, cal = entry.get("fingerprint", {}), entry.get("calibration") or {}
+        host_blob += _HOST.pack(host_id.encode("ascii")[:16], float(entry.get("updated", 0.0)),
+                                int(fp.get("cpu_count", 0)), int(fp.get("mem_total", 0)),
+                                _opt(cal.get("cpu")), _opt(cal.get("io")), _opt(cal.get("matrix")))
+        for key in ("cpu_model", "blas", "python", "machine"):
+            host_blob += _pack_str(fp.get(key, ""))
+        stats = entry.get("stats", {})
+        for b in buckets:
+            for p in profiles:
+                rec = stats.get(b, {}).get(p, {"ema": inf, "count": 0.0})
+                stat.append(float(rec["ema"]))
+                stat.append(float(rec["count"]))
+            best.append(p_idx.get(entry.get("best", {}).get(b), 255))
+    sections.append((b"HOST", struct.pack("<I", len(hosts)) + bytes(host_blob)))
+    sections.append((b"STAT", _arr_bytes(stat) + bytes(best)))
+
+    cols = {key: array(tc) for key, tc in _HIST_COLUMNS}
+    for row in history:
+        cols["timestamp"].append(float(row.get("timestamp", 0.0)))
+        cols["bucket"].append(b_idx[row.get("bucket")])
+        cols["label"].append(p_idx[row.get("label")])
+        for key in ("exec_time", "overhead", "matrix_time", "io_time", "avg_overhead"):
+            cols[key].append(_opt(row.get(key)))
+        cols["fail_safe"].append(1 if row.get("fail_safe") else 0)
+        cols["throttle_percent"].append(max(0, min(255, int(row.get("throttle_percent", 100)))))
+    sections.append((b"HIST", struct.pack("<I", len(history))
+                     + b"".join(_arr_bytes(cols[key]) for key, _ in _HIST_COLUMNS)))
+
+    for key, (tag, encode, _) in EXTRA_SECTIONS.items():
+        if data.get(key) is not None:
+            sections.append((tag, encode(data[key])))
+    extra = {k: v for k, v in data.items() if k not in _CORE_KEYS and k not in EXTRA_SECTIONS}
+    if extra:
+        sections.append((b"XTRA", json.dumps(extra, separators=(",", ":")).encode("utf-8")))
+
+    offset = _HEADER.size + _DIRENT.size * len(sections)
+    directory, body = bytearray(), bytearray()
+    for tag, payload in sections:
+        directory += _DIRENT.pack(tag, offset, len(payload), zlib.crc32(payload))
+        body += payload
+        offset += len(payload)
+    return _HEADER.pack(MAGIC, FORMAT_VERSION, len(sections), 0) + bytes(directory) + bytes(body)
+
+def _write_atomic(path: str, blob: bytes):
+    """Write to a sibling .tmp file and rename it over `path` (a crash leaves the old file)."""
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(blob)
+    os.replace(tmp, path)
+
+def write_snapshot(path: str, data: Dict[str, Any], history: List[Dict[str, Any]]):
+    _write_atomic(path, encode_snapshot(data, history))
+
+# ---------------- Binary reader ----------------
+class SnapshotReader:
+    """Reads the directory up front; each section is fetched and CRC-checked on demand."""
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            head = f.read(_HEADER.size)
+            if len(head) < _HEADER.size:
+                raise StateFormatError("truncated header")
+            magic, version, count, _ = _HEADER.unpack(head)
+            if magic != MAGIC:
+                raise StateFormatError("not a PXST snapshot")
+            if version > FORMAT_VERSION:
+                raise StateFormatError(f"unsupported snapshot version {version}")
+            raw = f.read(_DIRENT.size * count)
+        if len(raw) < _DIRENT.size * count:
+            raise StateFormatError("truncated directory")
+        self.version = version
+        self.directory = {tag: (off, ln, crc) for tag, off, ln, crc in _DIRENT.iter_unpack(raw)}
+        self._names: Optional[Tuple[List[str], List[str]]] = None
+
+    def section(self, tag: bytes) -> Optional[bytes]:
+        if tag not in self.directory:
+            return None
+        off, ln, crc = self.directory[tag]
+        with open(self.path, "rb") as f:
+            f.seek(off)
+            payload = f.read(ln)
+        if len(payload) != ln or zlib.crc32(payload) != crc:
+            raise StateFormatError(f"checksum mismatch in section {tag.decode()}")
+        return payload
+
+    def names(self) -> Tuple[List[str], List[str]]:
+        if self._names is None:
+            buf = self.section(b"NAME")
+            nb, np_ = struct.unpack_from("<HH", buf, 0)
+            pos, out = 4, []
+            for _ in range(nb + np_):
+                s, pos = _unpack_str(buf, pos)
+                out.append(s)
+            self._names = (out[:nb], out[nb:])
+        return self._names
+
+    def state(self, lazy: bool = False) -> Dict[str, Any]:
+        """Decode the state; with lazy=True extension blocks come back as zero-arg loaders."""
+        step, epsilon, host = _META.unpack(self.section(b"META"))
+        buckets, profiles = self.names()
+        nb, np_ = len(buckets), len(profiles)
+        hbuf, sbuf = self.section(b"HOST"), self.section(b"STAT")
+        (n_hosts,) = struct.unpack_from("<I", hbuf, 0)
+        stat = _arr_from("d", sbuf, n_hosts * nb * np_ * 2)
+        best_raw = sbuf[len(stat) * 8:]
+        hosts, pos = {}, 4
+        for h in range(n_hosts):
+            hid, updated, cpu_count, mem_total, c_cpu, c_io, c_mx = _HOST.unpack_from(hbuf, pos)
+            pos += _HOST.size
+            fp = {"cpu_count": cpu_count, "mem_total": mem_total}
+            for key in ("cpu_model", "blas", "python", "machine"):
+                fp[key], pos = _unpack_str(hbuf, pos)
+            cal = {k: v for k, v in (("cpu", c_cpu), ("io", c_io), ("matrix", c_mx)) if not isnan(v)}
+            stats, best, base = {}, {}, h * nb * np_ * 2
+            for bi, b in enumerate(buckets):
+                stats[b] = {}
+                for pi, p in enumerate(profiles):
+                    i = base + (bi * np_ + pi) * 2
+                    stats[b][p] = {"ema": stat[i], "count": stat[i + 1]}
+                k = best_raw[h * nb + bi]
+                if k != 255:
+                    best[b] = profiles[k]
+            hosts[hid.rstrip(b"\0").decode("ascii")] = {"fingerprint": fp, "calibration": cal or None,
+                                          "stats": stats, "best": best, "updated": updated}
+        data = {"host": host.rstrip(b"\0").decode("ascii"), "hosts": hosts, "step": step,
+                "epsilon": epsilon, "version": STATE_VERSION}
+        for key, (tag, _, decode) in EXTRA_SECTIONS.items():
+            if tag in self.directory:
+                loader = (lambda t=tag, d=decode: d(self.section(t)))
+                data[key] = loader if lazy else loader()
+        xtra = self.section(b"XTRA")
+        if xtra:
+            data.update(json.loads(xtra.decode("utf-8")))
+        return data
+
+    def history(self) -> List[Dict[str, Any]]:
+        buf = self.section(b"HIST")
+        if not buf:
+            return []
+        from datetime import datetime, timezone
+        buckets, profiles = self.names()
+        (n,) = struct.unpack_from("<I", buf, 0)
+        pos, cols = 4, {}
+        for key, tc in _HIST_COLUMNS:
+            cols[key] = _arr_from(tc, memoryview(buf)[pos:], n)
+            pos += n * cols[key].itemsize
+        rows = []
+        for i in range(n):
+            ts = cols["timestamp"][i]
+            rows.append({
+                "timestamp": ts,
+                "bucket": buckets[cols["bucket"][i]],
+                "label": profiles[cols["label"][i]],
+                "exec_time": _unopt(cols["exec_time"][i]),
+                "overhead": _unopt(cols["overhead"][i]),
+                "matrix_time": _unopt(cols["matrix_time"][i]),
+                "io_time": _unopt(cols["io_time"][i]),
+                "avg_overhead": _unopt(cols["avg_overhead"][i]),
+                "fail_safe": bool(cols["fail_safe"][i]),
+                "throttle_percent": cols["throttle_percent"][i],
+                "utc": datetime.fromtimestamp(ts, timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC"),
+            })
+        return rows
+
+# ---------------- JSON format ----------------
+def json_history_path(path: str) -> str:
+    return path + ".history.json"
+
+def _read_json_history(path: str) -> List[Dict[str, Any]]:
+    try:
+        with open(json_history_path(path), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception:
+        return []
+
+def _strict(obj):
+    """inf/nan → None so exports are valid RFC 8259 JSON."""
+    if isinstance(obj, float):
+        return None if obj != obj or obj in (inf, -inf) else obj
+    if isinstance(obj, dict):
+        return {k: _strict(v) for k, v in obj.items()}
+    if isinstance(obj, list):
+        return [_strict(v) for v in obj]
+    return obj
+
+def _unstrict_stats(data: Dict[str, Any]) -> Dict[str, Any]:
+    for entry in list(data.get("hosts", {}).values()) + [data]:
+        for profs in entry.get("stats", {}).values():
+            for rec in profs.values():
+                if rec.get("ema") is None:
+                    rec["ema"] = inf
+    return data
+
+# ---------------- Public load/save ----------------
+def load_state(path: str) -> Tuple[Dict[str, Any], Callable[[], List[Dict[str, Any]]]]:
+    """Returns (state without history, deferred history loader).
+
+    Binary extension blocks (e.g. rollups) are returned as zero-arg loaders."""
+    if is_binary_state(path):
+        reader = SnapshotReader(path)
+        return reader.state(lazy=True), reader.history
+    with open(path, "r", encoding="utf-8") as f:
+        data = _unstrict_stats(json.load(f))
+    if "history" in data:  # legacy inline history
+        history = data.pop("history")
+        return data, lambda: history
+    return data, lambda: _read_json_history(path)
+
+def save_state(path: str, data: Dict[str, Any], history: List[Dict[str, Any]], fmt: str = "binary"):
+    if fmt == "binary":
+        write_snapshot(path, data, history)
+        return
+    _write_atomic(json_history_path(path), json.dumps(_strict(history)).encode("utf-8"))
+    _write_atomic(path, json.dumps(_strict(data), indent=2).encode("utf-8"))
+
+def export_json(src: str, dst: str):
+    data, history = load_state(src)
+    data = {k: v() if callable(v) else v for k, v in data.items()}
+    data["history"] = history()
+    _write_atomic(dst, json.dumps(_strict(data), indent=2, allow_nan=False).encode("utf-8"))
+
+def import_json(src: str, dst: str):
+    with open(src, "r", encoding="utf-8") as f:
+        data = _unstrict_stats(json.load(f))
+    history = data.pop("history", [])
+    if "hosts" not in data:  # paxect-hybrid-1.0 file: stats of unknown origin
+        data["hosts"] = {"legacy": {"fingerprint": {}, "calibration": None,
+                                    "stats": data.pop("stats", {}), "best": data.pop("best", {})}}
+    write_snapshot(dst, data, history)
+
+# ---------------- CLI ----------------
+def main(argv: Optional[List[str]] = None) -> int:
+    import argparse
+    parser = argparse.ArgumentParser(prog="paxect_selftune_plugin state")
+    sub = parser.add_subparsers(dest="cmd", required=True)
+    p_info = sub.add_parser("info", help="print snapshot header and sections")
+    p_info.add_argument("state")
+    p_exp = sub.add_parser("export", help="binary/JSON state → audit JSON")
+    p_exp.add_argument("state"); p_exp.add_argument("out")
+    p_imp = sub.add_parser("import", help="audit JSON → binary state")
+    p_imp.add_argument("src"); p_imp.add_argument("state")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.cmd == "info":
+            if not is_binary_state(args.state):
+                print(json.dumps({"format": "json", "path": args.state}))
+                return 0
+            reader = SnapshotReader(args.state)
+            for tag in reader.directory:
+                reader.section(tag)  # verifies every checksum
+            print(json.dumps({"format": "binary", "version": reader.version,
+                              "sections": {t.decode(): v[1] for t, v in reader.directory.items()}}))
+        elif args.cmd == "export":
+            export_json(args.state, args.out)
+        elif args.cmd == "import":
+            import_json(args.src, args.state)
+    except (OSError, ValueError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: Apache-2.0
+# -*- coding: utf-8 -*-
+"""
+PAXECT SelfTune — Streaming File I/O
+------------------------------------
+Batch file I/O driven by the tuner's `blocksize`, instead of whole-file
+`f.read()` as in io_benchmark:
+
+  engine = StreamEngine(tuner)
+  for chunk in engine.read("input.bin"):   # memoryview, valid until the next chunk
+      consume(chunk)
+  engine.copy("input.bin", "output.bin")
+  engine.write("out.bin", parts, size_hint=n)  # independent buffers, os.writev batches
+
+ - every file gets one decide(n_bytes=file size); its blocksize sizes the
+   buffers. write() only decides (and reports) when given `size_hint`, as
+   the size of a stream is unknown until it ends
+ - reads go through `readinto` into `bytearray`s from a shared BufferPool
+   and are handed out as `memoryview` slices (no copies)
+ - writes are vectored: up to `batch` buffers per os.writev call (plain
+   os.write loop where writev is missing, e.g. Windows)
+ - each transfer is timed: syscall seconds are reported as exec_time, the
+   engine's own time around them as overhead, with the next decision (or
+   report()), so the chosen arm is judged on real files
+
+The blocksize itself is not tuned: arms are profiles, and their blocksize
+is the per-bucket default (or the auto-mode table row). Pass `blocksize=`
+to read()/copy() to override it.
+
+A chunk view is released when the consumer asks for the next one; keep
+`bytes(chunk)` if the data must outlive the iteration. A buffer still
+exported elsewhere (e.g. numpy.frombuffer) is not returned to the pool.
+"""
+
+import os, time, threading
+from typing import Dict, Any, Optional, List, Iterable, Iterator, Union
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+try:
+    _IOV_MAX = max(1, os.sysconf("SC_IOV_MAX"))
+except (AttributeError, ValueError, OSError):
+    _IOV_MAX = 1024
+_writev = getattr(os, "writev", None)
+_WRITE_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_TRUNC | getattr(os, "O_BINARY", 0)
+
+def _write_all(fd: int, bufs: List[Buffer]) -> int:
+    """Write every buffer, retrying partial vectored writes; returns bytes written."""
+    total = 0
+    if _writev is None:
+        for b in bufs:
+            view = memoryview(b)
+            while view:
+                n = os.write(fd, view)
+                total += n
+                view = view[n:]
+        return total
+    i = 0
+    while i < len(bufs):
+        n = _writev(fd, bufs[i:i + _IOV_MAX])
+        total += n
+        while i < len(bufs) and n >= len(bufs[i]):
+            n -= len(bufs[i])
+            i += 1
+        if n:
+            bufs[i] = memoryview(bufs[i])[n:]
+    return total
+
+# ---------------- Buffer pool ----------------
+class BufferPool:
+    """Reusable bytearrays keyed by size; at most `max_buffers` are kept free."""
+
+    def __init__(self, max_buffers: int = 32):
+        self.max_buffers = max_buffers
+        self.created = 0
+        self.reused = 0
+        self._free: Dict[int, List[bytearray]] = {}
+        self._n_free = 0
+        self._lock = threading.Lock()
+
+    def acquire(self, size: int) -> bytearray:
+        with self._lock:
+            free = self._free.get(size)
+            if free:
+                self._n_free -= 1
+                self.reused += 1
+                return free.pop()
+            self.created += 1
+        return bytearray(size)
+
+    def release(self, buf: bytearray):
+        with self._lock:
+            if self._n_free >= self.max_buffers:
+                # make room by evicting a buffer of another size (the blocksize moved on)
+                other = next((v for s, v in self._free.items() if s != len(buf) and v), None)
+                if other is None:
+                    return
+                other.pop()
+                self._n_free -= 1
+            self._free.setdefault(len(buf), []).append(buf)
+            self._n_free += 1
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"created": self.created, "reused": self.reused, "free": self._n_free,
+                    "free_bytes": sum(s * len(v) for s, v in self._free.items())}
+
+# ---------------- Engine ----------------
+class StreamEngine:
+    def __init__(self, tuner=None, pool: Optional[BufferPool] = None, batch: int = 16, feedback: bool = True):
+        self.tuner = tuner
+        self.pool = pool or BufferPool()
+        self.batch = max(1, min(batch, _IOV_MAX))
+        self.feedback = feedback
+        self.stats: Dict[str, Any] = {"files": 0, "bytes_read": 0, "bytes_written": 0,
+                                      "io_seconds": 0.0, "overhead_seconds": 0.0}
+        self._pending: Optional[tuple] = None  # (n_bytes, exec_time, overhead) of the last transfer
+        self._lock = threading.Lock()
+
+    def _get_tuner(self):
+        if self.tuner is None:
+            from . import get_autotune
+            self.tuner = get_autotune()
+        return self.tuner
+
+    def _decide(self, n_bytes: int):
+        with self._lock:
+            pending, self._pending = self._pending, None
+        if pending is None:
+            return self._get_tuner().decide(n_bytes)
+        return self._get_tuner().decide(n_bytes, pending[1], pending[2])
+
+    def _done(self, n_bytes: int, n_read: int, n_written: int, io_s: float, active_s: float,
+              feedback: bool = True):
+        overhead = max(0.0, active_s - io_s)
+        with self._lock:
+            st = self.stats
+            st["files"] += 1
+            st["bytes_read"] += n_read
+            st["bytes_written"] += n_written
+            st["io_seconds"] += io_s
+            st["overhead_seconds"] += overhead
+            if feedback and self.feedback and io_s > 0.0:
+                self._pending = (n_bytes, io_s, overhead)
+
+    def report(self):
+        """Send the last transfer's timing now instead of with the next decision."""
+        with self._lock:
+            pending, self._pending = self._pending, None
+        if pending is not None:
+            self._get_tuner().report(*pending)
+
+    # ---------------- Read ----------------
+    def read(self, path: str, blocksize: Optional[int] = None) -> Iterator[memoryview]:
+        """Chunks of `path` as memoryviews over pooled buffers (each valid until the next)."""
+        clock = time.perf_counter
+        mark = clock()
+        active = io = 0.0
+        total = size = 0
+        with open(path, "rb", buffering=0) as f:
+            size = os.fstat(f.fileno()).st_size
+            bs = blocksize or self._decide(size).blocksize
+            buf = self.pool.acquire(bs)
+            view = memoryview(buf)
+            reusable = True
+            try:
+                while True:
+                    t0 = clock()
+                    n = f.readinto(view)
+                    io += clock() - t0
+                    if not n:
+                        break
+                    total += n
+                    chunk = view[:n]
+                    active += clock() - mark
+                    yield chunk
+                    mark = clock()
+                    try:
+                        chunk.release()
+                    except BufferError:  # consumer exported it: leave that buffer to them
+                        view.release()
+                        buf = bytearray(bs)
+                        view = memoryview(buf)
+            finally:
+                active += clock() - mark
+                try:
+                    view.release()
+                except BufferError:
+                    reusable = False
+                if reusable:
+                    self.pool.release(buf)
+                self._done(size, total, 0, io, active)
+
+    # ---------------- Write ----------------
+    def write(self, path: str, chunks: Iterable[Buffer], size_hint: Optional[int] = None) -> int:
+        """Write independent buffers to `path` in os.writev batches; returns bytes written.
+
+        Without `size_hint` (the expected total) the write is counted in the
+        stats but neither decided on nor reported to the tuner.
+        """
+        clock = time.perf_counter
+        start = clock()
+        if size_hint is not None:
+            self._decide(size_hint)
+        t0 = clock()
+        fd = os.open(path, _WRITE_FLAGS, 0o644)  # truncating a large file is I/O time too
+        io = clock() - t0
+        total = 0
+        waiting = 0.0
+        try:
+            batch: List[Buffer] = []
+            it = iter(chunks)
+            while True:
+                t0 = clock()
+                chunk = next(it, None)
+                waiting += clock() - t0  # producer time is not ours
+                if chunk is not None and len(chunk):
+                    batch.append(chunk)
+                if batch and (chunk is None or len(batch) >= self.batch):
+                    t0 = clock()
+                    total += _write_all(fd, batch)
+                    io += clock() - t0
+                    batch = []
+                if chunk is None:
+                    break
+        finally:
+            t0 = clock()
+            os.close(fd)
+            io += clock() - t0
+            self._done(total, 0, total, io, clock() - start - waiting, size_hint is not None)
+        return total
+
+    # ---------------- Copy ----------------
+    def copy(self, src: str, dst: str, blocksize: Optional[int] = None) -> int:
+        """Stream `src` to `dst`: readinto `batch` pooled buffers, then one vectored write."""
+        clock = time.perf_counter
+        start = clock()
+        io = 0.0
+        total = 0
+        with open(src, "rb", buffering=0) as f:
+            size = os.fstat(f.fileno()).st_size
+            bs = blocksize or self._decide(size).blocksize
+            bufs = [self.pool.acquire(bs) for _ in range(self.batch)]
+            views = [memoryview(b) for b in bufs]
+            t0 = clock()
+            fd = os.open(dst, _WRITE_FLAGS, 0o644)
+            io += clock() - t0
+            try:
+                eof = False
+                while not eof:
+                    filled: List[memoryview] = []
+                    t0 = clock()
+                    for v in views:
+                        n = f.readinto(v)
+                        if not n:
+                            eof = True
+                            break
+                        filled.append(v[:n] if n < len(v) else v)
+                    if filled:
+                        total += _write_all(fd, filled)
+                    io += clock() - t0
+            finally:
+                t0 = clock()
+                os.close(fd)
+                io += clock() - t0
+                for v in views:
+                    v.release()
+                for b in bufs:
+                    self.pool.release(b)
+                self._done(size, total, total, io, clock() - start)
+        return total
+
+    def throughput(self) -> float:
+        """MiB/s of syscall time over everything moved so far."""
+        st = self.stats
+        moved = st["bytes_read"] + st["bytes_written"]
+        return moved / st["io_seconds"] / (1 << 20) if st["io_seconds"] > 0 else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        with self._lock:
+            out = dict(self.stats)
+        out["mib_per_s"] = round(self.throughput(), 1)
+        out["batch"] = self.batch
+        out["pool"] = self.pool.to_dict()
+        return out
+
+__all__ = ["StreamEngine", "BufferPool"]
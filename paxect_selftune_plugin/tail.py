@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: Apache-2.0
+# -*- coding: utf-8 -*-
+"""
+PAXECT SelfTune — Tail-Latency Sketches
+---------------------------------------
+Streaming per bucket/arm latency sketches for SLO-driven arm selection
+(`Autotune(objective="quantile" | "mean_std")`), where a slightly faster
+mean with a bad tail must lose:
+
+ - P² quantile estimator (Jain & Chlamtac): five markers, O(1) update and
+   memory, no stored samples; exact below five observations
+ - exponentially weighted mean and variance (`alpha`), for
+   mean + k·stddev scoring that follows drift faster than the quantile
+ - confidence: an estimate of the q-quantile is only trusted after
+   `per_tail / (1 − q)` samples (i.e. `per_tail` observations expected in
+   the tail: 500 for p99, 100 for p95 with the default of 5)
+
+Unlike the mergeable histograms, sketches are per process and never merge;
+they are persisted with the tuner state.
+"""
+
+from math import inf, ceil, sqrt
+from typing import Dict, Any, List, Tuple
+
+OBJECTIVES = ("mean", "quantile", "mean_std")
+PER_TAIL = 5
+MIN_SAMPLES = 5
+
+def min_samples(q: float, per_tail: int = PER_TAIL) -> int:
+    """Observations before a q-quantile estimate counts as confident."""
+    return max(MIN_SAMPLES, int(ceil(per_tail / max(1e-9, 1.0 - q))))
+
+class P2Quantile:
+    __slots__ = ("q", "n", "h", "pos", "want", "dn")
+
+    def __init__(self, q: float = 0.99):
+        if not 0.0 < q < 1.0:
+            raise ValueError("quantile must be in (0, 1)")
+        self.q = q
+        self.n = 0
+        self.h: List[float] = []  # marker heights (the first five samples until initialized)
+        self.pos = [0, 1, 2, 3, 4]
+        self.want = [0.0, 2 * q, 4 * q, 2 + 2 * q, 4.0]
+        self.dn = (0.0, q / 2, q, (1 + q) / 2, 1.0)
+
+    def update(self, x: float):
+        self.n += 1
+        h = self.h
+        if self.n <= 5:
+            h.append(x)
+            if self.n == 5:
+                h.sort()
+            return
+        pos, want = self.pos, self.want
+        if x < h[0]:
+            h[0] = x
+            k = 0
+        elif x >= h[4]:
+            h[4] = x
+            k = 3
+        else:
+            k = 0
+            while x >= h[k + 1]:
+                k += 1
+        for i in range(k + 1, 5):
+            pos[i] += 1
+        for i in range(5):
+            want[i] += self.dn[i]
+        for i in (1, 2, 3):
+            d = want[i] - pos[i]
+            if (d >= 1.0 and pos[i + 1] - pos[i] > 1) or (d <= -1.0 and pos[i - 1] - pos[i] < -1):
+                s = 1 if d > 0 else -1
+                hp = h[i] + s / (pos[i + 1] - pos[i - 1]) * (
+                    (pos[i] - pos[i - 1] + s) * (h[i + 1] - h[i]) / (pos[i + 1] - pos[i])
+                    + (pos[i + 1] - pos[i] - s) * (h[i] - h[i - 1]) / (pos[i] - pos[i - 1]))
+                if not h[i - 1] < hp < h[i + 1]:  # parabola overshoots: linear step
+                    hp = h[i] + s * (h[i + s] - h[i]) / (pos[i + s] - pos[i])
+                h[i] = hp
+                pos[i] += s
+
+    def value(self) -> float:
+        if self.n == 0:
+            return inf
+        if self.n < 5:
+            s = sorted(self.h)
+            return s[min(len(s) - 1, int(self.q * len(s)))]
+        return self.h[2]
+
+    def to_list(self) -> List[float]:
+        return [self.n] + list(self.h) + list(self.pos) + list(self.want)
+
+    @classmethod
+    def from_list(cls, q: float, v: List[float]) -> "P2Quantile":
+        p = cls(q)
+        p.n = int(v[0])
+        k = min(p.n, 5)
+        p.h = [float(x) for x in v[1:1 + k]]
+        if p.n >= 5:
+            p.pos = [int(x) for x in v[6:11]]
+            p.want = [float(x) for x in v[11:16]]
+        return p
+
+class TailSketch:
+    __slots__ = ("p2", "mean", "var", "n", "alpha")
+
+    def __init__(self, q: float = 0.99, alpha: float = 0.05):
+        self.p2 = P2Quantile(q)
+        self.mean = self.var = 0.0
+        self.n = 0
+        self.alpha = alpha
+
+    def update(self, x: float):
+        self.p2.update(x)
+        if self.n == 0:
+            self.mean = x
+        else:
+            a, d = self.alpha, x - self.mean
+            self.mean += a * d
+            self.var = (1.0 - a) * (self.var + a * d * d)
+        self.n += 1
+
+    def score(self, objective: str, k: float = 3.0) -> float:
+        if self.n == 0:
+            return inf
+        if objective == "quantile":
+            return self.p2.value()
+        return self.mean + k * sqrt(self.var)
+
+# ---------------- Per bucket/arm set ----------------
+class TailSketches:
+    def __init__(self, q: float = 0.99, alpha: float = 0.05, per_tail: int = PER_TAIL):
+        self.q, self.alpha = q, alpha
+        self.min_n = min_samples(q, per_tail)
+        self.sketches: Dict[Tuple[str, str], TailSketch] = {}
+
+    def update(self, bucket: str, label: str, seconds: float):
+        s = self.sketches.get((bucket, label))
+        if s is None:
+            s = self.sketches[(bucket, label)] = TailSketch(self.q, self.alpha)
+        s.update(seconds)
+
+    def score(self, bucket: str, label: str, objective: str, k: float = 3.0) -> float:
+        s = self.sketches.get((bucket, label))
+        return s.score(objective, k) if s is not None else inf
+
+    def samples(self, bucket: str, label: str, objective: str = "quantile") -> int:
+        s = self.sketches.get((bucket, label))
+        if s is None:
+            return 0
+        return s.p2.n if objective == "quantile" else s.n
+
+    def confidence(self, bucket: str, label: str, objective: str = "quantile") -> float:
+        """Samples over the confident minimum, capped at 1."""
+        return min(1.0, self.samples(bucket, label, objective) / self.min_n)
+
+    def summary(self) -> Dict[str, Dict[str, Dict[str, float]]]:
+        out: Dict[str, Dict[str, Dict[str, float]]] = {}
+        for (b, l), s in sorted(self.sketches.items()):
+            out.setdefault(b, {})[l] = {"quantile": s.p2.value(), "mean": s.mean, "stddev": sqrt(s.var),
+                                        "samples": s.n, "quantile_samples": s.p2.n,
+                                        "confident": s.p2.n >= self.min_n}
+        return out
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"q": self.q, "alpha": self.alpha, "min_n": self.min_n,
+                "sketches": {f"{b}|{l}": [s.mean, s.var, s.n] + s.p2.to_list()
+                             for (b, l), s in self.sketches.items()}}
+
+    @classmethod
+    def from_dict(cls, d: Dict[str, Any], q: float, alpha: float, per_tail: int = PER_TAIL) -> "TailSketches":
+        """Restore sketches; a different stored quantile keeps only the mean/variance part."""
+        out = cls(q, alpha, per_tail)
+        same_q = d.get("q") == q
+        for key, v in d.get("sketches", {}).items():
+            b, l = key.split("|", 1)
+            s = TailSketch(q, alpha)
+            s.mean, s.var, s.n = float(v[0]), float(v[1]), int(v[2])
+            if same_q:
+                s.p2 = P2Quantile.from_list(q, v[3:])
+            out.sketches[(b, l)] = s
+        return out
+
+__all__ = ["P2Quantile", "TailSketch", "TailSketches", "OBJECTIVES", "min_samples"]
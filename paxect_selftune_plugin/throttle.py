@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: Apache-2.0
+# -*- coding: utf-8 -*-
+"""
+PAXECT SelfTune — Graduated Throttle Recovery
+---------------------------------------------
+Fail-safe throttle with hysteresis and a stepped ramp back to full load,
+instead of holding 25% for 60 s and jumping straight to 100%:
+
+ - normal      → 100%; trips when avg overhead ≥ `trip`
+ - tripped     → fail-safe at schedule[0] for at least `hold` seconds; the
+                 hold restarts while overhead stays ≥ trip; leaves only once
+                 overhead < `release` (release < trip: hysteresis band)
+ - recovering  → one schedule step (e.g. 50 → 75 → 100) per `step` seconds
+                 of healthy overhead (< release); inside the band the step
+                 is held and its timer restarts; ≥ trip falls back to
+                 tripped (multiplicative decrease, additive increase)
+
+Time spent in each state and at each percent is accumulated so recovery
+settings can be weighed against lost throughput.
+"""
+
+import time
+from typing import Dict, Any, Optional, Sequence, Tuple
+
+DEFAULT_SCHEDULE = (25, 50, 75, 100)
+STATES = ("normal", "tripped", "recovering")
+
+class ThrottleController:
+    def __init__(self, trip: float = 0.75, release: Optional[float] = None,
+                 schedule: Sequence[int] = DEFAULT_SCHEDULE, hold: float = 60.0, step: float = 30.0):
+        schedule = tuple(int(p) for p in schedule)
+        if not schedule or schedule[-1] != 100 or list(schedule) != sorted(set(schedule)):
+            raise ValueError("schedule must be strictly increasing and end at 100")
+        self.trip = trip
+        self.release = release if release is not None else 0.8 * trip
+        if self.release > self.trip:
+            raise ValueError("release threshold must not exceed trip threshold")
+        self.schedule = schedule
+        self.hold, self.step = hold, step
+        self.state = "normal"
+        self.percent = 100
+        self.trips = 0
+        self._idx = len(schedule) - 1
+        self._until = 0.0
+        self._last: Optional[float] = None
+        self._state_s: Dict[str, float] = dict.fromkeys(STATES, 0.0)
+        self._percent_s: Dict[int, float] = dict.fromkeys(schedule, 0.0)
+
+    @property
+    def fail_safe(self) -> bool:
+        return self.state == "tripped"
+
+    def update(self, avg_overhead: float, now: Optional[float] = None) -> Tuple[bool, int]:
+        """Feed the current average overhead ratio; returns (fail_safe, percent)."""
+        now = time.monotonic() if now is None else now
+        if self._last is not None and now > self._last:
+            dt = now - self._last
+            self._state_s[self.state] += dt
+            self._percent_s[self.percent] += dt
+        self._last = now
+
+        if avg_overhead >= self.trip:
+            if self.state != "tripped":
+                self.trips += 1
+            self._set("tripped", 0)
+            self._until = now + self.hold
+        elif self.state == "tripped":
+            if avg_overhead < self.release and now >= self._until:
+                self._advance(now)
+        elif self.state == "recovering":
+            if avg_overhead >= self.release:
+                self._until = now + self.step  # in the band: hold this step, restart its timer
+            elif now >= self._until:
+                self._advance(now)
+        return self.fail_safe, self.percent
+
+    def _set(self, state: str, idx: int):
+        self.state, self._idx, self.percent = state, idx, self.schedule[idx]
+
+    def _advance(self, now: float):
+        idx = self._idx + 1
+        if idx >= len(self.schedule) - 1:
+            self._set("normal", len(self.schedule) - 1)
+        else:
+            self._set("recovering", idx)
+            self._until = now + self.step
+
+    def time_in_state(self, now: Optional[float] = None) -> Dict[str, Dict[Any, float]]:
+        """Seconds per state and per throttle percent, including the current interval."""
+        now = time.monotonic() if now is None else now
+        states, percents = dict(self._state_s), dict(self._percent_s)
+        if self._last is not None and now > self._last:
+            states[self.state] += now - self._last
+            percents[self.percent] += now - self._last
+        return {"state": states, "percent": percents}
+
+    def to_dict(self, now: Optional[float] = None) -> Dict[str, Any]:
+        """Current state and time spent; pass `now` from the clock that drives update()."""
+        now = time.monotonic() if now is None else now
+        spent = self.time_in_state(now)
+        return {"state": self.state, "percent": self.percent, "trips": self.trips,
+                "trip": self.trip, "release": self.release, "schedule": list(self.schedule),
+                "hold": self.hold, "step": self.step,
+                "next_change_in": round(max(0.0, self._until - now), 3) if self.state != "normal" else None,
+                "seconds_in_state": {k: round(v, 3) for k, v in spent["state"].items()},
+                "seconds_at_percent": {str(k): round(v, 3) for k, v in spent["percent"].items()}}
+
+__all__ = ["ThrottleController", "DEFAULT_SCHEDULE", "STATES"]
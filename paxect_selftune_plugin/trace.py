@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+# SPDX-License-Identifier: Apache-2.0
+# -*- coding: utf-8 -*-
+"""
+PAXECT SelfTune — Trace Spans (Chrome trace / Perfetto JSON)
+------------------------------------------------------------
+Hook subscriber that writes tuner activity as Chrome trace events, loadable
+in chrome://tracing, ui.perfetto.dev or speedscope:
+
+ - one complete ("X") span per tune() call, args = decision
+ - one "X" span per state save
+ - instant ("i") events for feedback
+ - an async ("b"/"e") range while the fail-safe is active
+ - a counter ("C") track for throttle_percent and average overhead
+
+Timestamps are epoch microseconds (time.time()), so spans line up with any
+other trace recorded against the wall clock. Events are streamed to disk as
+a JSON array; an unterminated file (process killed before close()) still
+loads, as the format allows a missing closing bracket.
+
+    from paxect_selftune_plugin.trace import TraceEmitter
+    emitter = TraceEmitter("selftune.trace.json").attach(tuner)
+    ...
+    emitter.close()
+"""
+
+import os, json, threading
+from typing import Dict, Any, Optional, List
+
+CATEGORY = "selftune"
+
+def _us(ts: float) -> int:
+    return int(ts * 1e6)
+
+class TraceEmitter:
+    def __init__(self, path: Optional[str] = None, process_name: str = "paxect-selftune"):
+        """path=None keeps events in memory (see .events / to_json())."""
+        self.path = path
+        self.pid = os.getpid()
+        self.events: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._file = open(path, "w", encoding="utf-8") if path else None
+        self._first = True
+        self._tuners = []
+        self._fs_id = 0
+        self._write({"name": "process_name", "ph": "M", "pid": self.pid, "tid": 0, "args": {"name": process_name}})
+
+    # ---- output ----
+    def _write(self, ev: Dict[str, Any]):
+        with self._lock:
+            if self._file is None:
+                if self.path is None:
+                    self.events.append(ev)
+                return
+            self._file.write(("[\n" if self._first else ",\n") + json.dumps(ev, separators=(",", ":")))
+            self._first = False
+
+    def flush(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+
+    def close(self):
+        for tuner in list(self._tuners):
+            self.detach(tuner)
+        with self._lock:
+            if self._file is not None:
+                self._file.write("[\n]\n" if self._first else "\n]\n")
+                self._file.close()
+                self._file = None
+
+    def to_json(self) -> str:
+        return json.dumps(self.events)
+
+    # ---- hook wiring ----
+    def attach(self, tuner) -> "TraceEmitter":
+        tuner.hooks.subscribe("*", self)
+        self._tuners.append(tuner)
+        return self
+
+    def detach(self, tuner):
+        tuner.hooks.unsubscribe(self)
+        if tuner in self._tuners:
+            self._tuners.remove(tuner)
+
+    def __call__(self, event: str, info: Dict[str, Any]):
+        tid = threading.get_ident()
+        if event == "post_decision":
+            d = info["decision"]
+            self._write({"name": f"tune:{d['label']}", "cat": CATEGORY, "ph": "X", "pid": self.pid, "tid": tid,
+                         "ts": _us(info["start"]), "dur": max(0, _us(info["end"]) - _us(info["start"])),
+                         "args": dict(d, bucket=info["bucket"], step=info["step"])})
+            self._write({"name": "throttle", "cat": CATEGORY, "ph": "C", "pid": self.pid, "ts": _us(info["end"]),
+                         "args": {"throttle_percent": d.get("throttle_percent"),
+                                  "avg_overhead": info.get("avg_overhead")}})
+        elif event == "feedback":
+            self._write({"name": f"feedback:{info['label']}", "cat": CATEGORY, "ph": "i", "s": "t",
+                         "pid": self.pid, "tid": tid, "ts": _us(info["ts"]),
+                         "args": {k: info[k] for k in ("bucket", "label", "exec_time", "overhead", "ema")}})
+        elif event == "fail_safe_enter":
+            self._fs_id += 1
+            self._write({"name": "fail-safe", "cat": CATEGORY, "ph": "b", "id": self._fs_id, "pid": self.pid,
+                         "tid": tid, "ts": _us(info["ts"]), "args": {"avg_overhead": info["avg_overhead"]}})
+        elif event == "fail_safe_exit":
+            self._write({"name": "fail-safe", "cat": CATEGORY, "ph": "e", "id": self._fs_id, "pid": self.pid,
+                         "tid": tid, "ts": _us(info["ts"]), "args": {"avg_overhead": info["avg_overhead"]}})
+        elif event == "state_saved":
+            self._write({"name": "save_state", "cat": CATEGORY, "ph": "X", "pid": self.pid, "tid": tid,
+                         "ts": _us(info["ts"]), "dur": _us(info["duration"]),
+                         "args": {"path": info["path"], "format": info["format"]}})
+
+def trace_to(path: Optional[str], tuner) -> TraceEmitter:
+    return TraceEmitter(path).attach(tuner)
+
+__all__ = ["TraceEmitter", "trace_to"]